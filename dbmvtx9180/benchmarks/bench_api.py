@@ -0,0 +1,169 @@
+#!/usr/bin/env python
+
+"""
+Benchmarks every Chassis/Fan/Thermal/Psu/Component/Watchdog API method
+against the fake platform. For each method it records the latency
+distribution and the I/O operations and process spawns per call.
+
+Usage:
+    bench_api.py [-n ITERATIONS] [--cold] [-o BASELINE]
+    bench_api.py --compare BASELINE [--threshold PERCENT]
+
+--cold drops the shared FPGA register cache before every call.
+--compare exits non-zero if a method got slower than the threshold, or
+now does more I/O or spawns more processes per call than the baseline.
+"""
+
+import argparse
+import json
+import sys
+import time
+
+from fakes import FakePlatform, IoCounter
+
+from sonic_platform import fpga
+
+# Timeout the watchdog is armed with
+WATCHDOG_TIMEOUT = 180
+
+
+def _percentile(samples, fraction):
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+
+
+def _methods(chassis, wdt):
+    fan = chassis.get_all_fans()[0]
+    psu = chassis.get_all_psus()[0]
+    psu_fan = psu.get_all_fans()[0]
+    thermal = chassis.get_all_thermals()[0]
+    components = chassis.get_all_components()
+
+    yield 'Chassis.get_transceiver_change_event', chassis.get_transceiver_change_event
+    yield 'Chassis.get_change_event(10ms)', lambda: chassis.get_change_event(10)
+    yield 'Chassis.get_reboot_cause', chassis.get_reboot_cause
+    yield 'Chassis.get_status_led', chassis.get_status_led
+    yield 'Chassis.get_platform_snapshot', chassis.get_platform_snapshot
+
+    for name in ('get_presence', 'get_speed_rpm', 'get_speed', 'get_max_speed', 'get_direction',
+                 'get_status', 'get_target_speed'):
+        yield 'Fan.' + name, getattr(fan, name)
+    for name in ('get_speed_rpm', 'get_speed', 'get_max_speed', 'get_direction'):
+        yield 'PsuFan.' + name, getattr(psu_fan, name)
+
+    for name in ('get_temperature', 'get_high_threshold', 'get_high_critical_threshold',
+                 'get_minimum_recorded', 'get_maximum_recorded'):
+        yield 'Thermal.' + name, getattr(thermal, name)
+
+    for name in ('get_presence', 'get_voltage', 'get_current', 'get_power', 'get_temperature',
+                 'get_mfr_id', 'get_model', 'get_serial', 'get_type', 'get_capacity'):
+        yield 'Psu.' + name, getattr(psu, name)
+
+    for component in components:
+        yield 'Component[{}].get_firmware_version'.format(component.get_name()), \
+            component.get_firmware_version
+
+    yield 'Watchdog.is_armed', wdt.is_armed
+    yield 'Watchdog.get_remaining_time', wdt.get_remaining_time
+
+    # Against the fake device node, with no keepalive thread touching it
+    wdt.stop_keepalive()
+    yield 'Watchdog.arm', lambda: wdt.arm(WATCHDOG_TIMEOUT)
+    wdt.arm(WATCHDOG_TIMEOUT)
+    yield 'Watchdog.get_remaining_time(armed)', wdt.get_remaining_time
+    yield 'Watchdog.disarm', wdt.disarm
+
+
+def measure(func, platform, iterations, cold):
+    samples = []
+    counter = IoCounter(platform.fpga_device)
+    error = None
+    for _ in range(iterations):
+        if cold:
+            fpga.cache.invalidate()
+        with counter:
+            start = time.perf_counter()
+            try:
+                func()
+            except Exception as e:
+                error = repr(e)
+            samples.append(time.perf_counter() - start)
+
+    samples.sort()
+    result = {
+        'mean_us': sum(samples) / len(samples) * 1e6,
+        'p50_us': _percentile(samples, 0.50) * 1e6,
+        'p90_us': _percentile(samples, 0.90) * 1e6,
+        'p99_us': _percentile(samples, 0.99) * 1e6,
+        'max_us': samples[-1] * 1e6,
+    }
+    for name, value in counter.as_dict().items():
+        result[name + '_per_call'] = value / float(iterations)
+    if error:
+        result['error'] = error
+    return result
+
+
+def run(iterations, cold):
+    results = {}
+    with FakePlatform() as platform:
+        chassis = platform.create_chassis()
+        wdt = platform.create_watchdog()
+        for name, func in _methods(chassis, wdt):
+            results[name] = measure(func, platform, iterations, cold)
+    return results
+
+
+def compare(results, baseline, threshold):
+    """
+    @return list of human readable regressions against <baseline>
+    """
+    regressions = []
+    for name, base in sorted(baseline.items()):
+        current = results.get(name)
+        if current is None:
+            regressions.append("{}: missing".format(name))
+            continue
+        if current['p50_us'] > base['p50_us'] * (1 + threshold / 100.0):
+            regressions.append("{}: p50 {:.1f}us -> {:.1f}us".format(name, base['p50_us'], current['p50_us']))
+        for key in ('io_ops_per_call', 'spawns_per_call'):
+            if current[key] > base[key]:
+                regressions.append("{}: {} {} -> {}".format(name, key, base[key], current[key]))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('-n', '--iterations', type=int, default=200)
+    parser.add_argument('--cold', action='store_true', help='drop the register cache before every call')
+    parser.add_argument('-o', '--output', help='write the results as a JSON baseline to FILE')
+    parser.add_argument('--compare', metavar='BASELINE', help='compare against a JSON baseline')
+    parser.add_argument('--threshold', type=float, default=25.0,
+                        help='allowed p50 latency increase in percent (default 25)')
+    args = parser.parse_args()
+
+    results = run(args.iterations, args.cold)
+    document = {'iterations': args.iterations, 'cold': args.cold, 'methods': results}
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(document, f, indent=4, sort_keys=True)
+            f.write('\n')
+
+    for name in sorted(results):
+        r = results[name]
+        print("{:<48} p50 {:>9.1f}us  p99 {:>9.1f}us  io {:>6.2f}  spawns {:>4.1f}{}".format(
+            name, r['p50_us'], r['p99_us'], r['io_ops_per_call'], r['spawns_per_call'],
+            "  ERROR " + r['error'] if 'error' in r else ""))
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)['methods']
+        regressions = compare(results, baseline, args.threshold)
+        for line in regressions:
+            print("REGRESSION " + line)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,149 @@
+#!/usr/bin/env python
+
+"""
+Compares transceiver change detection by fixed 1 second polling with the
+adaptive, debounced poller of Chassis.get_change_event, on a simulated
+timeline: a clean insertion with contact bounce, a port flapping for a few
+seconds and a clean removal, separated by long idle periods.
+
+Usage: bench_change_event.py [--duration SECONDS] [--min-interval SECONDS]
+                             [--max-interval SECONDS] [--debounce SECONDS]
+                             [-o FILE]
+
+Reported are the presence scans (bus load), the scans per minute of a
+switch with no port activity at all, the events delivered to xcvrd,
+suppressed flaps and the detection latency of the real changes. Time is
+simulated, so the run takes no wall time and needs no hardware.
+"""
+
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from sonic_platform.xcvr_poller import AdaptivePoller, XCVR_POLL_MIN_INTERVAL, \
+    XCVR_POLL_MAX_INTERVAL, XCVR_POLL_DEBOUNCE
+from sonic_platform.xcvr_presence import iter_changed
+
+FIXED_POLL_INTERVAL = 1.0
+
+
+def build_timeline(duration):
+    """
+    @return sorted list of (time, port index, present) raw transitions and
+            the list of (time, port index, present) real changes
+    """
+    transitions = []
+    real = []
+
+    # Port 3 inserted with contact bounce
+    t = duration * 0.2 + 0.37
+    for i, dt in enumerate((0.0, 0.04, 0.09, 0.15, 0.2)):
+        transitions.append((t + dt, 3, i % 2 == 0))
+    real.append((t, 3, True))
+
+    # Port 7 flaps for 5 seconds and ends up present, as it started
+    t = duration * 0.5 + 0.61
+    for i in range(1, 41):
+        transitions.append((t + i * 0.13, 7, i % 2 == 0))
+
+    # Port 10 removed cleanly
+    t = duration * 0.75 + 0.83
+    transitions.append((t, 10, False))
+    real.append((t, 10, False))
+
+    return sorted(transitions), real
+
+
+def _raw_bitmap(initial, transitions, now):
+    bitmap = initial
+    for t, index, present in transitions:
+        if t > now:
+            break
+        bitmap = bitmap | (1 << index) if present else bitmap & ~(1 << index)
+    return bitmap
+
+
+def _latencies(real, reported):
+    latencies = []
+    for t, index, present in real:
+        times = [rt for rt, ri, rp in reported if ri == index and rp == present and rt >= t]
+        latencies.append(min(times) - t if times else None)
+    return latencies
+
+
+def run_fixed(duration, initial, transitions, real):
+    reported = []
+    polls = 0
+    last = None
+    now = 0.0
+    while now <= duration:
+        bitmap = _raw_bitmap(initial, transitions, now)
+        polls += 1
+        if last is not None:
+            reported.extend((now, index, present) for index, present in iter_changed(last, bitmap))
+        last = bitmap
+        now += FIXED_POLL_INTERVAL
+    return {'polls': polls, 'events': len(reported), 'suppressed_flaps': 0,
+            'latencies': _latencies(real, reported)}
+
+
+def run_adaptive(duration, initial, transitions, real, min_interval, max_interval, debounce):
+    poller = AdaptivePoller(min_interval, max_interval, debounce)
+    reported = []
+    now = 0.0
+    while now <= duration:
+        bitmap = _raw_bitmap(initial, transitions, now)
+        reported.extend((now, index, present) for index, present in poller.update(bitmap, now))
+        now += poller.next_wait(now)
+    stats = poller.get_stats()
+    return {'polls': stats['polls'], 'events': stats['events'],
+            'suppressed_flaps': stats['suppressed_flaps'], 'latencies': _latencies(real, reported)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--duration', type=float, default=600.0, help='simulated seconds (default 600)')
+    parser.add_argument('--min-interval', type=float, default=XCVR_POLL_MIN_INTERVAL)
+    parser.add_argument('--max-interval', type=float, default=XCVR_POLL_MAX_INTERVAL)
+    parser.add_argument('--debounce', type=float, default=XCVR_POLL_DEBOUNCE)
+    parser.add_argument('-o', '--output', help='write the results as JSON to FILE')
+    args = parser.parse_args()
+
+    # Ports 7 and 10 start out present
+    initial = (1 << 7) | (1 << 10)
+    transitions, real = build_timeline(args.duration)
+    results = {
+        'fixed': run_fixed(args.duration, initial, transitions, real),
+        'adaptive': run_adaptive(args.duration, initial, transitions, real,
+                                 args.min_interval, args.max_interval, args.debounce),
+    }
+    idle = {
+        'fixed': run_fixed(args.duration, initial, [], []),
+        'adaptive': run_adaptive(args.duration, initial, [], [],
+                                 args.min_interval, args.max_interval, args.debounce),
+    }
+    for name in ('fixed', 'adaptive'):
+        results[name]['idle_scans_per_minute'] = idle[name]['polls'] * 60.0 / args.duration
+    results['real_events'] = len(real)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=4, sort_keys=True)
+            f.write('\n')
+
+    print("{:<9} {:>7} {:>11} {:>7} {:>17} {:>16}".format('strategy', 'polls', 'idle/min', 'events',
+                                                           'suppressed flaps', 'max latency'))
+    for name in ('fixed', 'adaptive'):
+        r = results[name]
+        latencies = r['latencies']
+        latency = 'missed' if None in latencies else "{:.2f}s".format(max(latencies))
+        print("{:<9} {:>7} {:>11.1f} {:>7} {:>17} {:>16}".format(name, r['polls'], r['idle_scans_per_minute'],
+                                                                  r['events'], r['suppressed_flaps'], latency))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
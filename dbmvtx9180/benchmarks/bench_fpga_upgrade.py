@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+
+"""
+Measures SysFPGA firmware install throughput through
+Component.install_firmware against a fake FPGA flash, optionally
+interrupting the first attempt to exercise resume.
+
+Usage:
+    bench_fpga_upgrade.py [--size KIB] [--fpga-latency SECONDS]
+                          [--program-latency SECONDS] [--interrupt-at FRACTION]
+                          [--min-throughput KIB_PER_S] [-o FILE]
+
+Exits non-zero if the flash does not match the image afterwards, or the
+throughput is below --min-throughput.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+from fakes import FakePlatform, IoCounter, FakeFlashFpga, FAKE_REGISTER_MAP
+
+from sonic_platform import fpga
+
+
+def _install(component, image_path, device):
+    counter = IoCounter(device)
+    pages_before = device.pages_programmed
+    start = time.perf_counter()
+    with counter:
+        ok = component.install_firmware(image_path)
+    return {
+        'ok': ok,
+        'seconds': time.perf_counter() - start,
+        'pages': device.pages_programmed - pages_before,
+        'fpga_transactions': counter.fpga_transactions,
+    }
+
+
+def run(size_kib, fpga_latency, program_latency, interrupt_at):
+    image = os.urandom(size_kib * 1024)
+    page_size = FAKE_REGISTER_MAP['page_size']
+    num_pages = (len(image) + page_size - 1) // page_size
+
+    with FakePlatform() as platform:
+        device = FakeFlashFpga(len(image) + page_size, latency=fpga_latency,
+                               program_latency=program_latency)
+        saved = fpga.set_device(device)
+        try:
+            image_path = os.path.join(platform.root, 'fpga.bin')
+            with open(image_path, 'wb') as f:
+                f.write(image)
+            component = [c for c in platform.create_chassis().get_all_components()
+                         if c.get_name() == 'SysFPGA'][0]
+
+            interrupted = None
+            if interrupt_at:
+                device.fail_after_pages = int(num_pages * interrupt_at)
+                interrupted = _install(component, image_path, device)
+                device.fail_after_pages = None
+
+            result = _install(component, image_path, device)
+            result['verified'] = bytes(device.flash[:len(image)]) == image
+        finally:
+            fpga.set_device(saved)
+
+    result['size_kib'] = size_kib
+    result['total_pages'] = num_pages
+    result['throughput_kib_s'] = size_kib * result['pages'] / float(num_pages) / result['seconds']
+    result['transactions_per_page'] = result['fpga_transactions'] / float(max(result['pages'], 1))
+    if interrupted is not None:
+        result['interrupted_run'] = interrupted
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--size', type=int, default=1024, help='image size in KiB (default 1024)')
+    parser.add_argument('--fpga-latency', type=float, default=0.0,
+                        help='seconds per fake FPGA transaction')
+    parser.add_argument('--program-latency', type=float, default=0.0,
+                        help='seconds per fake flash page program')
+    parser.add_argument('--interrupt-at', type=float, default=0.0,
+                        help='interrupt the first attempt after this fraction of the pages')
+    parser.add_argument('--min-throughput', type=float, default=0.0,
+                        help='fail below this many KiB/s')
+    parser.add_argument('-o', '--output', help='write the result as JSON to FILE')
+    args = parser.parse_args()
+
+    result = run(args.size, args.fpga_latency, args.program_latency, args.interrupt_at)
+    text = json.dumps({'fpga_upgrade': result}, indent=4, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    print(text)
+
+    if not (result['ok'] and result['verified']):
+        print("FAILED: flash does not hold the image")
+        return 1
+    if result['throughput_kib_s'] < args.min_throughput:
+        print("REGRESSION: {:.1f} KiB/s below {:.1f} KiB/s".format(result['throughput_kib_s'],
+                                                                  args.min_throughput))
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
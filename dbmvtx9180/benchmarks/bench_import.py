@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+
+"""
+Profiles the import time of the sonic_platform package with
+`python -X importtime`, in fresh interpreters, as paid by every pmon
+daemon and CLI command on startup.
+
+Usage:
+    bench_import.py [-n RUNS] [-m MODULE ...] [--top N] [-o BASELINE]
+    bench_import.py --compare BASELINE [--threshold PERCENT] [--max-ms MS]
+
+Each module is imported in its own interpreter; the median over the runs
+is reported along with the heaviest modules it pulled in. --compare exits
+non-zero if a module got slower than the threshold, --max-ms if one
+exceeds an absolute budget.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+REPO_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+DEFAULT_MODULES = ['sonic_platform', 'sonic_platform.platform', 'sonic_platform.chassis']
+
+
+def profile_once(module=None):
+    """
+    Import <module> in a fresh interpreter, or nothing if None
+    @return dict of imported module name to (self us, cumulative us)
+    """
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(p for p in (REPO_DIR, env.get('PYTHONPATH')) if p)
+    code = 'import ' + module if module else 'pass'
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                          env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                          universal_newlines=True)
+    if proc.returncode != 0:
+        raise RuntimeError("import {} failed: {}".format(module, proc.stderr.strip().splitlines()[-1]))
+
+    # "import time:  self [us] | cumulative | imported package"
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        fields = line[len('import time:'):].split('|')
+        try:
+            self_us, cumulative_us = int(fields[0]), int(fields[1])
+        except ValueError:
+            continue  # the header line
+        times[fields[2].strip()] = (self_us, cumulative_us)
+    return times
+
+
+def _median(values):
+    values = sorted(values)
+    return values[len(values) // 2]
+
+
+def profile(module, runs, top, startup_modules):
+    samples = [profile_once(module) for _ in range(runs)]
+    names = set(samples[0])
+    for sample in samples[1:]:
+        names &= set(sample)
+    # Modules every interpreter loads anyway are not charged to <module>
+    names -= startup_modules
+
+    self_us = dict((name, _median([s[name][0] for s in samples])) for name in names)
+    total_us = _median([s[module][1] for s in samples])
+    heaviest = sorted(names, key=lambda name: self_us[name], reverse=True)[:top]
+    return {
+        'total_ms': total_us / 1000.0,
+        'modules_imported': len(names),
+        'heaviest_ms': [[name, self_us[name] / 1000.0] for name in heaviest],
+    }
+
+
+def compare(results, baseline, threshold, max_ms):
+    """
+    @return list of human readable regressions
+    """
+    regressions = []
+    for module, result in sorted(results.items()):
+        if max_ms and result['total_ms'] > max_ms:
+            regressions.append("{}: {:.1f}ms over the {:.1f}ms budget".format(module, result['total_ms'], max_ms))
+        base = baseline.get(module)
+        if base and result['total_ms'] > base['total_ms'] * (1 + threshold / 100.0):
+            regressions.append("{}: {:.1f}ms -> {:.1f}ms".format(module, base['total_ms'], result['total_ms']))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('-n', '--runs', type=int, default=7)
+    parser.add_argument('-m', '--module', action='append', help='module to profile (repeatable)')
+    parser.add_argument('--top', type=int, default=10, help='heaviest modules to list (default 10)')
+    parser.add_argument('-o', '--output', help='write the results as a JSON baseline to FILE')
+    parser.add_argument('--compare', metavar='BASELINE', help='compare against a JSON baseline')
+    parser.add_argument('--threshold', type=float, default=25.0,
+                        help='allowed import time increase in percent (default 25)')
+    parser.add_argument('--max-ms', type=float, default=0.0, help='absolute import time budget per module')
+    args = parser.parse_args()
+
+    startup_modules = set(profile_once())
+    results = dict((module, profile(module, args.runs, args.top, startup_modules))
+                   for module in args.module or DEFAULT_MODULES)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'runs': args.runs, 'modules': results}, f, indent=4, sort_keys=True)
+            f.write('\n')
+
+    for module in sorted(results):
+        r = results[module]
+        print("{:<32} {:>8.1f}ms  {:>4} modules".format(module, r['total_ms'], r['modules_imported']))
+        for name, ms in r['heaviest_ms']:
+            print("    {:<44} {:>8.1f}ms".format(name, ms))
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)['modules']
+    regressions = compare(results, baseline, args.threshold, args.max_ms)
+    for line in regressions:
+        print("REGRESSION " + line)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+
+"""
+Shows that hardware reads stay constant as sensor consumers are added
+when a shared-memory snapshot publisher runs. Every consumer is a forked
+process with its own Chassis polling all fan, thermal and PSU getters,
+like thermalctld or psud would.
+
+Usage: bench_shm_snapshot.py [-c CONSUMERS ...] [--duration SECONDS]
+                             [--poll-interval SECONDS] [-o FILE]
+
+For each consumer count the platform is polled once without and once with
+a publisher; the hardware operations (FPGA transactions plus file opens)
+of all consumers and of the publisher are added up.
+"""
+
+import argparse
+import json
+import multiprocessing
+import sys
+import time
+
+from fakes import FakePlatform, IoCounter
+
+PUBLISH_INTERVAL = 0.5
+
+
+def _poll(chassis):
+    for fan in chassis.get_all_fans():
+        fan.get_presence()
+        fan.get_speed_rpm()
+    for thermal in chassis.get_all_thermals():
+        thermal.get_temperature()
+        thermal.get_high_threshold()
+    for psu in chassis.get_all_psus():
+        psu.get_voltage()
+        psu.get_current()
+        psu.get_power()
+        psu.get_temperature()
+        for fan in psu.get_all_fans():
+            fan.get_speed_rpm()
+
+
+def _consumer(platform, duration, poll_interval, start_event, results):
+    chassis = platform.create_chassis()
+    _poll(chassis)  # Warm up outside of the measurement
+    start_event.wait()
+    counter = IoCounter(platform.fpga_device)
+    polls = 0
+    deadline = time.monotonic() + duration
+    with counter:
+        while time.monotonic() < deadline:
+            _poll(chassis)
+            polls += 1
+            time.sleep(poll_interval)
+    results.put((counter.io_ops, polls))
+
+
+def run_scenario(consumers, duration, poll_interval, publish):
+    ctx = multiprocessing.get_context('fork')
+    with FakePlatform() as platform:
+        publisher = None
+        if publish:
+            publisher = platform.create_chassis().start_snapshot_publisher(PUBLISH_INTERVAL)
+            time.sleep(PUBLISH_INTERVAL / 10.0)
+
+        start_event = ctx.Event()
+        results = ctx.Queue()
+        procs = [ctx.Process(target=_consumer, args=(platform, duration, poll_interval, start_event, results))
+                 for _ in range(consumers)]
+        for proc in procs:
+            proc.start()
+
+        counter = IoCounter(platform.fpga_device)
+        with counter:
+            start_event.set()
+            outcomes = [results.get() for _ in procs]
+        for proc in procs:
+            proc.join()
+        if publisher is not None:
+            publisher.stop()
+
+    consumer_ops = sum(ops for ops, _ in outcomes)
+    return {
+        'consumers': consumers,
+        'publisher': publish,
+        'polls': sum(polls for _, polls in outcomes),
+        'consumer_io_ops': consumer_ops,
+        'publisher_io_ops': counter.io_ops if publish else 0,
+        'total_io_ops': consumer_ops + (counter.io_ops if publish else 0),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('-c', '--consumers', type=int, action='append',
+                        help='number of consumer processes (repeatable, default 1 2 4 8)')
+    parser.add_argument('--duration', type=float, default=3.0, help='seconds every consumer polls')
+    parser.add_argument('--poll-interval', type=float, default=0.1)
+    parser.add_argument('-o', '--output', help='write the results as JSON to FILE')
+    args = parser.parse_args()
+
+    results = []
+    for consumers in args.consumers or [1, 2, 4, 8]:
+        for publish in (False, True):
+            results.append(run_scenario(consumers, args.duration, args.poll_interval, publish))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'duration': args.duration, 'scenarios': results}, f, indent=4, sort_keys=True)
+            f.write('\n')
+
+    print("{:>9} {:>9} {:>8} {:>12} {:>12} {:>10}".format(
+        'consumers', 'publisher', 'polls', 'consumer io', 'publisher io', 'total io'))
+    for r in results:
+        print("{:>9} {:>9} {:>8} {:>12} {:>12} {:>10}".format(
+            r['consumers'], 'yes' if r['publisher'] else 'no', r['polls'],
+            r['consumer_io_ops'], r['publisher_io_ops'], r['total_io_ops']))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+
+"""
+Measures the cost of building a Chassis, as paid by every pmon daemon and
+CLI command on startup: wall time and the number of I/O operations.
+
+Usage: bench_startup.py [-n ITERATIONS] [--fpga-latency SECONDS] [-o FILE]
+"""
+
+import argparse
+import json
+import sys
+import time
+
+from fakes import FakePlatform, IoCounter
+
+
+def run(iterations, fpga_latency):
+    samples = []
+    with FakePlatform(fpga_latency=fpga_latency) as platform:
+        # Pay module import cost outside of the measurement
+        platform.create_chassis()
+        counter = IoCounter(platform.fpga_device)
+        with counter:
+            for _ in range(iterations):
+                start = time.perf_counter()
+                platform.create_chassis()
+                samples.append(time.perf_counter() - start)
+
+    samples.sort()
+    result = {
+        'iterations': iterations,
+        'wall_time_min_ms': samples[0] * 1000,
+        'wall_time_median_ms': samples[len(samples) // 2] * 1000,
+        'wall_time_max_ms': samples[-1] * 1000,
+    }
+    for name, value in counter.as_dict().items():
+        result[name + '_per_chassis'] = value / float(iterations)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('-n', '--iterations', type=int, default=50)
+    parser.add_argument('--fpga-latency', type=float, default=0.0005,
+                        help='seconds per fake FPGA transaction')
+    parser.add_argument('-o', '--output', help='write the result as JSON to FILE')
+    args = parser.parse_args()
+
+    result = run(args.iterations, args.fpga_latency)
+    text = json.dumps({'chassis_startup': result}, indent=4, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    print(text)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
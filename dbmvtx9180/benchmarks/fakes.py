@@ -0,0 +1,397 @@
+"""
+Hardware-free environment for the sonic_platform benchmarks.
+
+Provides a fake system FPGA (with a model of its upgrade flash), a fake
+sysfs tree, fake PDDF device and plugin data, and an I/O counter built
+on audit hooks. The PDDF base
+classes (sonic_platform_pddf_base, sonic_platform_base, sonic_py_common)
+must be importable; only the hardware underneath them is faked.
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from sonic_platform import fpga
+from sonic_platform import psu_fru
+from sonic_platform import component
+from sonic_platform import watchdog
+from sonic_platform import fpga_upgrade
+from sonic_platform import shm_snapshot
+from sonic_platform.i2c_dev import FakeSmbusDevice
+
+NUM_FANTRAYS = 4
+NUM_FANS_PERTRAY = 2
+NUM_PSUS = 2
+NUM_PORTS = 32
+NUM_TEMPS = 3
+
+PSU_MFR = "DELTA"
+PSU_MODEL = "DPS-1300AB-6"
+
+""" FPGA upgrade register map of FakeFlashFpga, in the plugin data format """
+FAKE_REGISTER_MAP = {
+    'page_reg': 0x60,
+    'ctrl_reg': 0x62,
+    'status_reg': 0x63,
+    'window_base': 0x80,
+    'page_size': 128,
+    'ctrl_program': 0x01,
+    'ctrl_readback': 0x02,
+    'ctrl_start': 0x10,
+    'ctrl_finish': 0x20,
+    'busy_mask': 0x01,
+}
+
+PLUGIN_DATA = {
+    'XCVR': {
+        'plug_status': {'inserted': '1', 'removed': '0'},
+    },
+    'PSU': {
+        'valmap': {'PSU_FAN_MAX_SPEED': '18000', 'DEFAULT_TYPE': 'AC'},
+        'psu_support_list': [
+            {'Manufacturer': PSU_MFR, 'Name': PSU_MODEL, 'MaxSpd': 'PSU_FAN_MAX_SPEED',
+             'Dir': 'exhaust', 'Type': 'AC'},
+        ],
+    },
+    'FAN': {
+        'FAN_INLET_MAX_SPEED': '23000',
+        'FAN_EXHAUST_MAX_SPEED': '20500',
+        'FAN_MAX_SPEED_TOLERANCE': '10',
+        'present': {'i2c': {'valmap': {'1': True, '0': False}}},
+        'direction': {'i2c': {'valmap': {'0': 'intake', '1': 'exhaust'}}},
+    },
+    'REBOOT_CAUSE': {'reboot_cause_file': '/dev/null'},
+    'FPGA': {'upgrade': FAKE_REGISTER_MAP},
+}
+
+""" FPGA register contents: version, fan fault bitmap (clear), fan tachometers, temperatures, threshold """
+FPGA_REGISTERS = dict(
+    [(0x00, 0x12)] +
+    [(0x20 + i, v) for i, v in enumerate([0x2e, 0xe0] * 7)] +
+    [(0x40, 38), (0x41, 41), (0x42, 44), (0x50, 95)]
+)
+
+PSU_ATTRS = {
+    'psu_present': '1',
+    'psu_power_good': '1',
+    'psu_v_out': '12050',
+    'psu_i_out': '42500',
+    'psu_p_out': '512000000',
+    'psu_p_out_max': '1300000000',
+    'psu_temp1_input': '35000',
+    'psu_fan1_speed_rpm': '9100',
+}
+
+
+def build_fru_image(mfr=PSU_MFR, model=PSU_MODEL, serial="SN0001", capacity=1300, size=256):
+    """
+    Build an IPMI FRU image with a product area and a power supply record
+    """
+    def checksum(data):
+        return (-sum(data)) & 0xff
+
+    def field(text):
+        return bytes([0xc0 | len(text)]) + text.encode()
+
+    product = bytearray([0x01, 0x00, 0x00])
+    for text in (mfr, "PSU", model, "A0", serial, "", ""):
+        product += field(text)
+    product += b'\xc1'
+    while (len(product) + 1) % 8:
+        product += b'\x00'
+    product[1] = (len(product) + 1) // 8
+    product.append(checksum(product))
+
+    record = bytearray(24)
+    record[0:2] = capacity.to_bytes(2, 'little')
+    record[15] = 63
+    record_header = bytearray([0x00, 0x82, len(record), checksum(record), 0x00])
+    record_header[4] = checksum(record_header[:4])
+
+    header = bytearray([0x01, 0x00, 0x00, 0x00, 0x01, 1 + len(product) // 8, 0x00, 0x00])
+    header[7] = checksum(header[:7])
+
+    image = bytes(header) + bytes(product) + bytes(record_header) + bytes(record)
+    return image + b'\xff' * (size - len(image))
+
+
+class FakeFlashFpga(FakeSmbusDevice):
+    """
+    FakeSmbusDevice that also models the FPGA flash behind the upgrade
+    register window. Used to benchmark and regression-test upgrades.
+    """
+
+    def __init__(self, flash_size, register_map=FAKE_REGISTER_MAP, registers=None, latency=0,
+                 program_latency=0, fail_after_pages=None):
+        """
+        @param flash_size flash capacity in bytes
+        @param program_latency seconds a page program takes
+        @param fail_after_pages raise IOError on the program command after
+               this many pages, to simulate an interrupted upgrade
+        """
+        FakeSmbusDevice.__init__(self, registers, latency=latency)
+        self.map = dict((key, int(value, 0) if isinstance(value, str) else value)
+                        for key, value in register_map.items())
+        self.flash = bytearray(b'\xff' * flash_size)
+        self.program_latency = program_latency
+        self.fail_after_pages = fail_after_pages
+        self.pages_programmed = 0
+        self.upgrade_mode = False
+
+    def _page_span(self):
+        page = self.regs[self.map['page_reg']] | (self.regs[self.map['page_reg'] + 1] << 8)
+        start = page * self.map['page_size']
+        if start + self.map['page_size'] > len(self.flash):
+            raise IOError("Flash page {} out of range".format(page))
+        return start, start + self.map['page_size']
+
+    def write_byte_data(self, reg, value):
+        FakeSmbusDevice.write_byte_data(self, reg, value)
+        if reg != self.map['ctrl_reg']:
+            return
+
+        window = self.map['window_base']
+        if value == self.map.get('ctrl_start'):
+            self.upgrade_mode = True
+        elif value == self.map.get('ctrl_finish'):
+            self.upgrade_mode = False
+        elif value == self.map['ctrl_program']:
+            if self.fail_after_pages is not None and self.pages_programmed >= self.fail_after_pages:
+                raise IOError("Simulated interruption after {} pages".format(self.pages_programmed))
+            if self.program_latency:
+                time.sleep(self.program_latency)
+            start, end = self._page_span()
+            self.flash[start:end] = self.regs[window:window + self.map['page_size']]
+            self.pages_programmed += 1
+        elif value == self.map['ctrl_readback']:
+            start, end = self._page_span()
+            self.regs[window:window + self.map['page_size']] = self.flash[start:end]
+
+
+class FakePddfApi(object):
+    """
+    Stand-in for PddfApi backed by a directory of attribute files
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.data = {}
+        for i in range(1, NUM_TEMPS + 1):
+            self.data['TEMP{}'.format(i)] = {'dev_info': {'device_type': 'TEMP_SENSOR'}}
+        for i in range(1, NUM_PORTS + 1):
+            self.data['PORT{}'.format(i)] = {'dev_attr': {'device_type': 'QSFP28'}}
+
+    def get_platform(self):
+        return {
+            'num_psus': NUM_PSUS,
+            'num_fantrays': NUM_FANTRAYS,
+            'num_fans_pertray': NUM_FANS_PERTRAY,
+            'num_ports': NUM_PORTS,
+            'num_temps': NUM_TEMPS,
+        }
+
+    def get_num_psu_fans(self, device):
+        return 1
+
+    def get_path(self, device, attr):
+        path = os.path.join(self.root, device, attr)
+        return path if os.path.exists(path) else None
+
+    def get_attr_name_output(self, device, attr):
+        path = self.get_path(device, attr)
+        if path is None:
+            return None
+        with open(path, 'r') as f:
+            return {'mode': 'i2c', 'status': f.read()}
+
+
+class FakeWatchdog(watchdog.WatchdogImplBase):
+    """
+    Watchdog whose device node is a plain file of the fake tree. The node
+    is opened as on hardware; the ioctls issued on it are modelled in
+    memory, the way the driver would answer them.
+    """
+
+    def _open_device(self):
+        # Every ioctl is issued on the open device node
+        return self.watchdog
+
+    def _settimeout(self, seconds):
+        self._open_device()
+        self._expiry = time.monotonic() + seconds
+        return seconds
+
+    def _enablewatchdog(self):
+        self._open_device()
+        self._expiry = time.monotonic() + self.timeout
+
+    def _disablewatchdog(self):
+        self._open_device()
+        self._expiry = None
+
+    def _keepalive(self):
+        self._open_device()
+        self._expiry = time.monotonic() + self.timeout
+
+    def _gettimeleft(self):
+        if self._watchdog is None:
+            return watchdog.WatchdogImplBase._gettimeleft(self)
+        return max(0, int(self._expiry - time.monotonic()))
+
+
+class FakePlatform(object):
+    """
+    Creates the fake sysfs tree and installs the fake FPGA. Use as a
+    context manager; everything is torn down on exit.
+    """
+
+    def __init__(self, fpga_latency=0, present_ports=None):
+        self.fpga_latency = fpga_latency
+        self.present_ports = set(range(1, NUM_PORTS + 1, 2)) if present_ports is None else present_ports
+        self.root = None
+        self.fpga_device = None
+        self.pddf_data = None
+        self.plugin_data = PLUGIN_DATA
+        self._saved = {}
+
+    def _write(self, path, value):
+        path = os.path.join(self.root, path)
+        if not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        mode = 'wb' if isinstance(value, bytes) else 'w'
+        with open(path, mode) as f:
+            f.write(value)
+
+    def __enter__(self):
+        self.root = tempfile.mkdtemp(prefix='sonic-platform-fake-')
+        for psu in range(1, NUM_PSUS + 1):
+            for attr, value in PSU_ATTRS.items():
+                self._write('PSU{}/{}'.format(psu, attr), value)
+            self._write('eeprom/2-00{}'.format(49 + psu), build_fru_image(serial="SN000{}".format(psu)))
+        for port in range(1, NUM_PORTS + 1):
+            self._write('PORT{}/xcvr_present'.format(port), '1' if port in self.present_ports else '0')
+        self._write('dmi/bios_version', '5.19\n')
+        for attr, value in (('timeout', '180'), ('timeleft', '170'), ('state', 'inactive'), ('dev', '')):
+            self._write('watchdog/' + attr, value)
+
+        self._saved['bios'] = component.BIOS_VERSION_PATH
+        component.BIOS_VERSION_PATH = os.path.join(self.root, 'dmi', 'bios_version')
+        self._saved['fw_version_cache'] = component.FW_VERSION_CACHE_PATH
+        component.FW_VERSION_CACHE_PATH = os.path.join(self.root, 'run', 'firmware-versions.json')
+        component.invalidate_fw_version_cache()
+        self._saved['fpga_upgrade_state'] = fpga_upgrade.UPGRADE_STATE_PATH
+        fpga_upgrade.UPGRADE_STATE_PATH = os.path.join(self.root, 'cache', 'fpga-upgrade.json')
+        # Never serve from, or publish to, a snapshot of the real platform
+        self._saved['shm_snapshot'] = shm_snapshot.SNAPSHOT_PATH
+        shm_snapshot.SNAPSHOT_PATH = os.path.join(self.root, 'shm', 'snapshot')
+        os.makedirs(os.path.dirname(shm_snapshot.SNAPSHOT_PATH))
+        shm_snapshot.detach_reader()
+        self._saved['watchdog'] = watchdog.WD_SYSFS_PATH
+        watchdog.WD_SYSFS_PATH = os.path.join(self.root, 'watchdog') + '/'
+
+        self._saved['psu_eeprom'] = psu_fru.PSU_EEPROM_PATH
+        psu_fru.PSU_EEPROM_PATH = os.path.join(self.root, 'eeprom', '2-00{}')
+        psu_fru.invalidate_psu_fru_cache()
+
+        self.fpga_device = FakeSmbusDevice(FPGA_REGISTERS, latency=self.fpga_latency)
+        self._saved['fpga'] = fpga.set_device(self.fpga_device)
+        self.pddf_data = FakePddfApi(self.root)
+        return self
+
+    def set_port_presence(self, port, present):
+        self._write('PORT{}/xcvr_present'.format(port), '1' if present else '0')
+
+    def set_psu_presence(self, psu, present):
+        self._write('PSU{}/psu_present'.format(psu), '1' if present else '0')
+
+    def set_psu_fru(self, psu, **fields):
+        """
+        Replace the FRU EEPROM of PSU <psu>, e.g. to model a swap; <fields>
+        are passed to build_fru_image()
+        """
+        self._write('eeprom/2-00{}'.format(49 + psu), build_fru_image(**fields))
+
+    def __exit__(self, *exc):
+        fpga.set_device(self._saved['fpga'])
+        psu_fru.PSU_EEPROM_PATH = self._saved['psu_eeprom']
+        component.BIOS_VERSION_PATH = self._saved['bios']
+        component.FW_VERSION_CACHE_PATH = self._saved['fw_version_cache']
+        component.invalidate_fw_version_cache()
+        watchdog.WD_SYSFS_PATH = self._saved['watchdog']
+        fpga_upgrade.UPGRADE_STATE_PATH = self._saved['fpga_upgrade_state']
+        shm_snapshot.detach_reader()
+        shm_snapshot.SNAPSHOT_PATH = self._saved['shm_snapshot']
+        psu_fru.invalidate_psu_fru_cache()
+        shutil.rmtree(self.root, ignore_errors=True)
+        return False
+
+    def create_chassis(self):
+        from sonic_platform.chassis import Chassis
+        return Chassis(self.pddf_data, self.plugin_data)
+
+    def create_watchdog(self):
+        # The device node is only opened once the watchdog is armed or disarmed
+        return FakeWatchdog(os.path.join(self.root, 'watchdog', 'dev'))
+
+
+class IoCounter(object):
+    """
+    Counts file opens, ioctls and process spawns through audit hooks, plus
+    transactions on the fake FPGA. Only one counter is active at a time.
+    """
+
+    SPAWN_EVENTS = ('subprocess.Popen', 'os.system', 'os.posix_spawn', 'os.exec', 'os.fork')
+
+    _installed = False
+    _active = None
+
+    def __init__(self, fpga_device=None):
+        self.fpga_device = fpga_device
+        self.opens = 0
+        self.ioctls = 0
+        self.spawns = 0
+        self.fpga_transactions = 0
+        if not IoCounter._installed:
+            sys.addaudithook(IoCounter._hook)
+            IoCounter._installed = True
+
+    @staticmethod
+    def _hook(event, args):
+        counter = IoCounter._active
+        if counter is None:
+            return
+        if event == 'open':
+            counter.opens += 1
+        elif event == 'fcntl.ioctl':
+            counter.ioctls += 1
+        elif event in IoCounter.SPAWN_EVENTS:
+            counter.spawns += 1
+
+    def __enter__(self):
+        self._fpga_start = self.fpga_device.transactions if self.fpga_device else 0
+        IoCounter._active = self
+        return self
+
+    def __exit__(self, *exc):
+        IoCounter._active = None
+        if self.fpga_device:
+            self.fpga_transactions += self.fpga_device.transactions - self._fpga_start
+        return False
+
+    @property
+    def io_ops(self):
+        return self.opens + self.ioctls + self.fpga_transactions
+
+    def as_dict(self):
+        return {
+            'opens': self.opens,
+            'ioctls': self.ioctls,
+            'fpga_transactions': self.fpga_transactions,
+            'spawns': self.spawns,
+            'io_ops': self.io_ops,
+        }
@@ -1,4 +1,12 @@
 # All the derived classes for PDDF
 __all__ = ["platform", "chassis", "sfp", "psu", "thermal", "fan"]
-from . import platform
 
+import importlib
+
+
+def __getattr__(name):
+    # Submodules are imported on first access, so that loading a single
+    # helper module (e.g. sonic_platform.fpga) does not pull in all of PDDF
+    if name in __all__:
+        return importlib.import_module("." + name, __name__)
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
@@ -0,0 +1,130 @@
+"""
+Module contains an asyncio facade over Chassis that collects fan, thermal,
+PSU and transceiver readings concurrently, with a bound on the number of
+reads in flight on each physical I2C bus
+"""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from . import fpga
+from .xcvr_presence import resolve_presence_register
+
+""" Bus carrying the PSU PMBus devices and FRU EEPROMs """
+PSU_I2C_BUS_NUM = 2
+
+DEFAULT_PER_BUS_LIMIT = 1
+DEFAULT_MAX_WORKERS = 8
+
+
+def _read_fan(fan):
+    return {
+        'name': fan.get_name(),
+        'presence': fan.get_presence(),
+        'speed_rpm': fan.get_speed_rpm(),
+        'speed': fan.get_speed(),
+        'direction': fan.get_direction(),
+        'status': fan.get_status(),
+    }
+
+
+def _read_thermal(thermal):
+    return {
+        'name': thermal.get_name(),
+        'temperature': thermal.get_temperature(),
+        'high_threshold': thermal.get_high_threshold(),
+    }
+
+
+def _read_psu(psu):
+    return {
+        'name': psu.get_name(),
+        'presence': psu.get_presence(),
+        'status': psu.get_powergood_status(),
+        'voltage': psu.get_voltage(),
+        'current': psu.get_current(),
+        'power': psu.get_power(),
+        'temperature': psu.get_temperature(),
+        'fans': [_read_fan(fan) for fan in psu.get_all_fans()],
+    }
+
+
+def _read_sfp(sfp):
+    return {
+        'name': sfp.get_name(),
+        'presence': sfp.get_presence(),
+    }
+
+
+class AsyncChassis(object):
+    """
+    Concurrent reader of a Chassis. Blocking platform calls run on a thread
+    pool; each physical bus admits at most <per_bus_limit> of them at once.
+    """
+
+    def __init__(self, chassis, per_bus_limit=DEFAULT_PER_BUS_LIMIT, max_workers=DEFAULT_MAX_WORKERS):
+        self._chassis = chassis
+        self.per_bus_limit = per_bus_limit
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._sfp_buses = None
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+    def _get_sfp_bus(self, index):
+        if self._sfp_buses is None:
+            self._sfp_buses = {}
+            for i in range(len(self._chassis.get_all_sfps())):
+                reg = resolve_presence_register(self._chassis.pddf_obj, i)
+                # Undescribed ports are assumed to share one bus
+                self._sfp_buses[i] = reg[0] if reg else 'xcvr'
+        return self._sfp_buses.get(index, 'xcvr')
+
+    async def _read(self, semaphores, bus, func, obj):
+        semaphore = semaphores.get(bus)
+        if semaphore is None:
+            semaphore = semaphores[bus] = asyncio.Semaphore(self.per_bus_limit)
+        async with semaphore:
+            loop = asyncio.get_running_loop()
+            try:
+                return await loop.run_in_executor(self._executor, func, obj)
+            except Exception as e:
+                return {'error': repr(e)}
+
+    async def collect(self):
+        """
+        Read every fan, thermal, PSU and transceiver concurrently
+
+        Returns:
+            A dict with 'fans', 'thermals', 'psus' and 'sfps' lists of
+            per-device readings, and the 'timestamp' of the sweep
+        """
+        # Semaphores belong to the loop running this sweep
+        semaphores = {}
+        chassis = self._chassis
+        fans = [self._read(semaphores, fpga.FPGA_I2C_BUS_NUM, _read_fan, fan)
+                for fan in chassis.get_all_fans()]
+        thermals = [self._read(semaphores, fpga.FPGA_I2C_BUS_NUM, _read_thermal, thermal)
+                    for thermal in chassis.get_all_thermals()]
+        psus = [self._read(semaphores, PSU_I2C_BUS_NUM, _read_psu, psu)
+                for psu in chassis.get_all_psus()]
+        sfps = [self._read(semaphores, self._get_sfp_bus(index), _read_sfp, sfp)
+                for index, sfp in enumerate(chassis.get_all_sfps())]
+
+        timestamp = time.time()
+        results = await asyncio.gather(*(fans + thermals + psus + sfps))
+        n_fans, n_thermals, n_psus = len(fans), len(thermals), len(psus)
+        return {
+            'timestamp': timestamp,
+            'fans': results[:n_fans],
+            'thermals': results[n_fans:n_fans + n_thermals],
+            'psus': results[n_fans + n_thermals:n_fans + n_thermals + n_psus],
+            'sfps': results[n_fans + n_thermals + n_psus:],
+        }
+
+    def collect_sync(self):
+        """
+        Blocking wrapper of collect() for callers without an event loop
+        """
+        return asyncio.run(self.collect())
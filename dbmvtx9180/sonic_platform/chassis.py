@@ -10,31 +10,68 @@ try:
     import time
     import sys
     from sonic_platform_pddf_base.pddf_chassis import PddfChassis
-    from sonic_py_common import device_info
-    from sonic_py_common import logger
+    from sonic_platform import instrumentation
 except ImportError as e:
     raise ImportError(str(e) + "- required module not found")
 
 NUM_COMPONENT = 2
 SYSLOG_IDENTIFIER = "chassis"
-sonic_logger=logger.Logger(SYSLOG_IDENTIFIER)
+# Created on first use, most processes never log from here
+sonic_logger = None
+
+
+def _get_logger():
+    global sonic_logger
+    if sonic_logger is None:
+        from sonic_py_common import logger
+        sonic_logger = logger.Logger(SYSLOG_IDENTIFIER)
+    return sonic_logger
+
+
 class Chassis(PddfChassis):
     """
     PDDF Platform-specific Chassis class
     """
 
-    port_dict = {}
-
     def __init__(self, pddf_data=None, pddf_plugin_data=None):
         PddfChassis.__init__(self, pddf_data, pddf_plugin_data)
-        self._initialize_components()
+        # Every platform object shares this pddf_obj, so its attribute reads are counted too
+        instrumentation.instrument_pddf(self.pddf_obj)
+        # Registers to read if the FPGA driver holds its address
+        from sonic_platform import fpga
+        fpga.sysfs_registers = fpga.resolve_sysfs_registers(self.pddf_obj)
+        # Serve sensors from another process's snapshot when one is published
+        from sonic_platform import shm_snapshot
+        shm_snapshot.attach_reader()
+        self._thermal_sampler = None
+        self._snapshot_publisher = None
+        self._components_initialized = False
+        self._xcvr_event_source = None
+        self._presence_scanner = None
+        self._xcvr_poller = None
 
     def _initialize_components(self):
+        # Deferred until the components are first asked for
+        if self._components_initialized:
+            return
+        self._components_initialized = True
         from sonic_platform.component import Component
         for index in range(NUM_COMPONENT):
-            component = Component(index)
+            component = Component(index, self.plugin_data)
             self._component_list.append(component)
-            
+
+    def get_num_components(self):
+        self._initialize_components()
+        return PddfChassis.get_num_components(self)
+
+    def get_all_components(self):
+        self._initialize_components()
+        return PddfChassis.get_all_components(self)
+
+    def get_component(self, index):
+        self._initialize_components()
+        return PddfChassis.get_component(self, index)
+
     # Provide the functions/variables below for which implementation is to be overwritten
     def get_name(self):
         """
@@ -70,6 +107,100 @@ class Chassis(PddfChassis):
     def get_status_led(self):
         return self.get_system_led("SYS_LED")
 
+    def start_thermal_sampler(self, interval=None, window=None):
+        """
+        Start sampling every chassis and PSU thermal in the background.
+        Once running, get_minimum_recorded()/get_maximum_recorded() are
+        served from the sampled statistics without hardware access.
+
+        Args:
+            interval: seconds between two samples (optional)
+            window: number of samples kept per sensor (optional)
+        Returns:
+            The ThermalSampler object
+        """
+        from sonic_platform.thermal_sampler import ThermalSampler, \
+            DEFAULT_SAMPLE_INTERVAL, DEFAULT_SAMPLE_WINDOW
+
+        if self._thermal_sampler is None:
+            thermals = list(self.get_all_thermals())
+            for psu in self.get_all_psus():
+                thermals.extend(psu.get_all_thermals())
+            self._thermal_sampler = ThermalSampler(
+                thermals,
+                interval or DEFAULT_SAMPLE_INTERVAL,
+                window or DEFAULT_SAMPLE_WINDOW)
+            self._thermal_sampler.start()
+        return self._thermal_sampler
+
+    def stop_thermal_sampler(self):
+        if self._thermal_sampler is not None:
+            self._thermal_sampler.stop()
+            self._thermal_sampler = None
+
+    def get_thermal_sampler(self):
+        """
+        Retrieves the running ThermalSampler, or None if not started
+        """
+        return self._thermal_sampler
+
+    def start_snapshot_publisher(self, interval=None):
+        """
+        Publish fan, thermal and PSU readings for the other processes of
+        the system, see sonic_platform.shm_snapshot
+
+        Args:
+            interval: seconds between two publications (optional)
+        Returns:
+            The SnapshotPublisher object, or None if another process is
+            already publishing
+        """
+        from sonic_platform.shm_snapshot import SnapshotPublisher, DEFAULT_PUBLISH_INTERVAL
+
+        if self._snapshot_publisher is None:
+            publisher = SnapshotPublisher(self, interval or DEFAULT_PUBLISH_INTERVAL)
+            if not publisher.start():
+                return None
+            self._snapshot_publisher = publisher
+        return self._snapshot_publisher
+
+    def stop_snapshot_publisher(self):
+        if self._snapshot_publisher is not None:
+            self._snapshot_publisher.stop()
+            self._snapshot_publisher = None
+
+    def set_xcvr_event_source(self, event_source):
+        """
+        Replace the source get_change_event waits on between presence
+        checks. See sonic_platform.xcvr_event for the available sources.
+        """
+        if self._xcvr_event_source is not None:
+            self._xcvr_event_source.close()
+        self._xcvr_event_source = event_source
+
+    def _get_xcvr_event_source(self):
+        if self._xcvr_event_source is None:
+            from sonic_platform.xcvr_event import create_event_source
+            self._xcvr_event_source = create_event_source(self.plugin_data.get('XCVR', {}))
+        return self._xcvr_event_source
+
+    def _get_xcvr_poller(self):
+        if self._xcvr_poller is None:
+            from sonic_platform.xcvr_poller import create_poller
+            self._xcvr_poller = create_poller(self.plugin_data.get('XCVR', {}))
+        return self._xcvr_poller
+
+    def get_change_event_stats(self):
+        """
+        Retrieves the counters of transceiver change detection
+
+        Returns:
+            A dict with 'polls', 'events', 'suppressed_flaps', the current
+            polling 'interval' in seconds and the number of 'pending' ports
+            still within their debounce window
+        """
+        return self._get_xcvr_poller().get_stats()
+
     def get_change_event(self, timeout=0):
         """
         Returns a nested dictionary containing all devices which have
@@ -124,6 +255,8 @@ class Chassis(PddfChassis):
             )
             return False, change_event_dict  # Time wrap or possibly incorrect timeout
         try:
+            event_source = self._get_xcvr_event_source()
+            poller = self._get_xcvr_poller()
             while timeout >= 0:
                 # check for sfp
                 sfp_change_dict = self.get_transceiver_change_event()
@@ -131,49 +264,58 @@ class Chassis(PddfChassis):
                 if sfp_change_dict:
                     change_event_dict["sfp"] = sfp_change_dict
                     return True, change_event_dict
-                if forever:
-                    time.sleep(1)
-                else:
+                # Short while ports are settling, longer the longer they stay idle
+                wait_time = poller.next_wait()
+                if not forever:
                     timeout = end_time - time.time()
-                    if timeout >= 1:
-                        time.sleep(1)  # We poll at 1 second granularity
-                    else:
-                        if timeout > 0:
-                            time.sleep(timeout)
+                    if timeout <= 0:
                         return True, change_event_dict
+                    wait_time = min(timeout, wait_time)
+                # Wakes up early when the event source reports a possible change
+                event_source.wait(wait_time)
         except Exception as e:
             print(e)
         print("get_change_event: Should not reach here.")
         return False, change_event_dict
 
+    def _get_presence_scanner(self):
+        if self._presence_scanner is None:
+            from sonic_platform.xcvr_presence import PresenceScanner
+            self._presence_scanner = PresenceScanner(
+                self._sfp_list[:self.platform_inventory['num_ports']], self.pddf_obj,
+                source=self.plugin_data.get('XCVR', {}).get('presence_source'))
+        return self._presence_scanner
+
+    def get_presence_bitmap(self):
+        """
+        Retrieves the presence of every transceiver in one scan
+
+        Returns:
+            An integer bitmap, bit N set when the port at index N is present
+        """
+        return self._get_presence_scanner().scan()
+
+    def get_platform_snapshot(self):
+        """
+        Retrieves the state of all fans, thermals, PSUs, transceivers and the
+        system LED, read with the fewest hardware transactions possible
+
+        Returns:
+            An immutable PlatformSnapshot, see sonic_platform.platform_snapshot
+        """
+        from sonic_platform.platform_snapshot import take_snapshot
+        return take_snapshot(self)
+
     def get_transceiver_change_event(self, timeout=0):
-        current_port_dict = {}
         ret_dict = {}
+        plug_status = self.plugin_data['XCVR']['plug_status']
+
+        # Check for OIR events and return ret_dict; changes are reported
+        # once they outlast the debounce window, the first scan is the baseline
+        bitmap = self.get_presence_bitmap()
 
-        # Check for OIR events and return ret_dict
-        for index in range(self.platform_inventory['num_ports']):
-            if self._sfp_list[index].get_presence():
-                current_port_dict[index] = self.plugin_data['XCVR']['plug_status']['inserted']
-            else:
-                current_port_dict[index] = self.plugin_data['XCVR']['plug_status']['removed']
-
-        if len(self.port_dict) == 0:       # first time
-            self.port_dict = current_port_dict
-            return {}
-
-        if current_port_dict == self.port_dict:
-            return {}
-
-        # Update reg value
-        for index, status in current_port_dict.items():
-            if self.port_dict[index] != status:
-                ret_dict[index] = status
-                #ret_dict[str(index)] = status
-        self.port_dict = current_port_dict
-        for index, status in ret_dict.items():
-            if int(status) == 1:
-                pass
-                #self._sfp_list[int(index)].check_sfp_optoe_type()
+        for index, present in self._get_xcvr_poller().update(bitmap):
+            ret_dict[index] = plug_status['inserted'] if present else plug_status['removed']
         return ret_dict
 
     def get_sfp(self, index):
@@ -248,6 +390,6 @@ class Chassis(PddfChassis):
                 watchdog_device_path = "/dev/watchdog1"
                 self._watchdog = WatchdogImplBase(watchdog_device_path)
         except Exception as e:
-            sonic_logger.log_warning(" Fail to load watchdog {}".format(repr(e)))
+            _get_logger().log_warning(" Fail to load watchdog {}".format(repr(e)))
 
         return self._watchdog
@@ -6,40 +6,133 @@
 #############################################################################
 
 try:
-    import subprocess
+    import os
+    import json
     from sonic_platform_base.component_base import ComponentBase
-    from sonic_py_common.general import getstatusoutput_noshell, getstatusoutput_noshell_pipe
+    from sonic_platform import fpga
 except ImportError as e:
     raise ImportError(str(e) + "- required module not found")
 
-FPGA_I2C_BUS_NUM=1
-FPGA_DEV_ADDR=0x32
 FPGA_FW_VERSION_REG_OFFSET=0x00
+# The version register only changes across an FPGA upgrade
+FPGA_FW_VERSION_CACHE_TTL=3600
 
 BIOS_VERSION_PATH = "/sys/class/dmi/id/bios_version"
+# Versions only change across a firmware install and reboot, so they are
+# kept for the lifetime of the boot identified by BOOT_ID_PATH
+BOOT_ID_PATH = "/proc/sys/kernel/random/boot_id"
+FW_VERSION_CACHE_PATH = "/run/sonic-platform/firmware-versions.json"
+
+_boot_id = None
+_fw_version_cache = None
+
 COMPONENT_LIST= [
    ("BIOS", "Basic Input/Output System"),
    ("SysFPGA", "System FPGA"),
 ]
 
+def _get_boot_id():
+    # A process never outlives the boot it started in
+    global _boot_id
+    if _boot_id is None:
+        try:
+            with open(BOOT_ID_PATH, 'r') as fd:
+                _boot_id = fd.read().strip() or None
+        except IOError:
+            pass
+    return _boot_id
+
+
+def _fw_version_cache_stamp():
+    # Identifies the current contents of FW_VERSION_CACHE_PATH, None if absent
+    try:
+        st = os.stat(FW_VERSION_CACHE_PATH)
+    except OSError:
+        return None
+    return (st.st_ino, st.st_mtime_ns)
+
+
+def _load_fw_version_cache():
+    """
+    Retrieves the firmware versions recorded during this boot
+    @return dict of component name to version string
+    """
+    global _fw_version_cache
+    stamp = _fw_version_cache_stamp()
+    if _fw_version_cache is not None:
+        if _fw_version_cache['stamp'] == stamp:
+            return _fw_version_cache['versions']
+        # Another process installed firmware or recorded versions: forget
+        # what this process read, including the cached version register
+        fpga.cache.invalidate(FPGA_FW_VERSION_REG_OFFSET)
+
+    boot_id = _get_boot_id()
+    versions = {}
+    try:
+        with open(FW_VERSION_CACHE_PATH, 'r') as fd:
+            data = json.load(fd)
+        if boot_id is not None and data.get('boot_id') == boot_id:
+            versions = data.get('versions', {})
+    except (IOError, ValueError, AttributeError):
+        pass
+    _fw_version_cache = {'boot_id': boot_id, 'versions': versions, 'stamp': stamp}
+    return versions
+
+
+def _store_fw_version(name, version):
+    versions = _load_fw_version_cache()
+    versions[name] = version
+    boot_id = _fw_version_cache['boot_id']
+    if boot_id is None:
+        # Without a boot id the file could outlive a firmware upgrade
+        return
+    try:
+        directory = os.path.dirname(FW_VERSION_CACHE_PATH)
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        tmp_path = "{}.{}".format(FW_VERSION_CACHE_PATH, os.getpid())
+        with open(tmp_path, 'w') as fd:
+            json.dump({'boot_id': boot_id, 'versions': versions}, fd)
+        os.rename(tmp_path, FW_VERSION_CACHE_PATH)
+    except (IOError, OSError):
+        # Not persisted, still cached in this process
+        return
+    _fw_version_cache['stamp'] = _fw_version_cache_stamp()
+
+
+def invalidate_fw_version_cache():
+    """
+    Drop the recorded firmware versions, in this process and under /run
+    """
+    global _fw_version_cache
+    _fw_version_cache = None
+    try:
+        os.remove(FW_VERSION_CACHE_PATH)
+    except OSError:
+        pass
+
+
 class Component(ComponentBase):
     """Platform-specific Component class"""
 
     DEVICE_TYPE = "component"
 
-    def __init__(self, component_index=0):
+    def __init__(self, component_index=0, pddf_plugin_data=None):
         self.index = component_index
+        self.plugin_data = pddf_plugin_data
         self.name = self.get_name()
+        if self.name == "SysFPGA" and \
+                fpga.cache.get_ttl(FPGA_FW_VERSION_REG_OFFSET) != FPGA_FW_VERSION_CACHE_TTL:
+            fpga.cache.set_ttl(FPGA_FW_VERSION_REG_OFFSET, FPGA_FW_VERSION_CACHE_TTL)
 
     def _run_command(self, command):
         # Run bash command and print output to stdout
+        import shlex
+        import subprocess
         try:
             process = subprocess.Popen(
                 shlex.split(command), stdout=subprocess.PIPE)
-            while True:
-                output = process.stdout.readline()
-                if output == '' and process.poll() is not None:
-                    break
+            process.communicate()
             rc = process.poll()
             if rc != 0:
                 return False
@@ -59,12 +152,14 @@ class Component(ComponentBase):
     def _get_fpga_version(self):
         # Retrieves the CPLD firmware version
         fpga_version = dict()
-        cmdstatus, fpga_fw_version = getstatusoutput_noshell(['i2cget', '-f', '-y', str(FPGA_I2C_BUS_NUM), str(FPGA_DEV_ADDR), str(FPGA_FW_VERSION_REG_OFFSET)])
-        if cmdstatus != 0:
-            print("Error reading reg {}".format(hex(reg_offset)))
+        try:
+            fpga_fw_version = fpga.read_byte(FPGA_FW_VERSION_REG_OFFSET)
+        except IOError:
+            print("Error reading reg {}".format(hex(FPGA_FW_VERSION_REG_OFFSET)))
             fpga_version["SysFPGA"] = 'N/A'
         else:
-            fpga_version["SysFPGA"] = str(fpga_fw_version)
+            # Same rendering as the i2cget output this used to report
+            fpga_version["SysFPGA"] = "0x{:02x}".format(fpga_fw_version)
 
         return fpga_version
 
@@ -90,13 +185,18 @@ class Component(ComponentBase):
         Returns:
             string: The firmware versions of the module
         """
-        fw_version = None
+        fw_version = _load_fw_version_cache().get(self.name)
+        if fw_version is not None:
+            return fw_version
 
         if self.name == "BIOS":
             fw_version = self._get_bios_version()
         elif "SysFPGA" in self.name:
             fpga_version = self._get_fpga_version()
             fw_version = fpga_version.get(self.name)
+
+        if fw_version not in (None, 'N/A'):
+            _store_fw_version(self.name, fw_version)
         return fw_version
 
     def install_firmware(self, image_path):
@@ -107,4 +207,43 @@ class Component(ComponentBase):
         Returns:
             A boolean, True if install successfully, False if not
         """
-        raise NotImplementedError
+        # Whatever the outcome, the running version may no longer be the cached one
+        invalidate_fw_version_cache()
+        fpga.cache.invalidate(FPGA_FW_VERSION_REG_OFFSET)
+
+        if self.name != "SysFPGA":
+            raise NotImplementedError
+
+        from sonic_platform.fpga_upgrade import FpgaProgrammer, FpgaUpgradeError, get_register_map
+        try:
+            register_map = get_register_map(self.plugin_data)
+        except ValueError as e:
+            print("SysFPGA upgrade: {}".format(e))
+            return False
+        if register_map is None:
+            print("SysFPGA upgrade is not supported on this platform: the plugin data has no "
+                  "'FPGA' 'upgrade' register map")
+            return False
+
+        if not os.path.isfile(image_path):
+            print("SysFPGA upgrade: image {} not found".format(image_path))
+            return False
+
+        programmer = FpgaProgrammer(register_map, progress=self._print_progress)
+        self._reported_percent = -1
+        try:
+            programmer.program(image_path)
+        except (FpgaUpgradeError, IOError, OSError) as e:
+            print("SysFPGA upgrade failed: {}, rerun to resume".format(e))
+            return False
+        finally:
+            # Versions read while programming are not those of the new image
+            invalidate_fw_version_cache()
+            fpga.cache.invalidate(FPGA_FW_VERSION_REG_OFFSET)
+        return True
+
+    def _print_progress(self, done, total):
+        percent = done * 100 // total
+        if percent // 10 > self._reported_percent // 10 or done == total:
+            self._reported_percent = percent
+            print("SysFPGA upgrade: {}% ({}/{} bytes)".format(percent, done, total))
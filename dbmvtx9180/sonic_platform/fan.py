@@ -1,16 +1,17 @@
 #!/usr/bin/env python
 
 import os
+from collections import namedtuple
 
 try:
     from sonic_platform_pddf_base.pddf_fan import PddfFan
-    from sonic_platform.psu_fru import PsuFru
-    from sonic_py_common.general import getstatusoutput_noshell, getstatusoutput_noshell_pipe
+    from sonic_platform.psu_fru import get_psu_fru
+    from sonic_platform.psu_models import get_model_table, lookup_psu_model
+    from sonic_platform import fpga
 except ImportError as e:
     raise ImportError(str(e) + "- required module not found")
 
-FPGA_I2C_BUS_NUM=1
-FPGA_DEV_ADDR=0x32
+# One fault bit per fan, bit (n-1) % 8 of register FPGA_FAN_FAULT_REG_BASE + (n-1) // 8
 FPGA_FAN_FAULT_REG_BASE=0x04
 
 fan_to_rpm_reg_offset_map={'fan1_input': 0x20, 'fan2_input': 0x22,
@@ -18,12 +19,22 @@ fan_to_rpm_reg_offset_map={'fan1_input': 0x20, 'fan2_input': 0x22,
                            'fan5_input': 0x28, 'fan6_input': 0x2a,
                            'fan7_input': 0x2b, 'fan8_input': 0x2c}
 
+""" State of one fan, decoded from a single read of fpga.FAN_STATUS_BANK """
+FanStatus = namedtuple('FanStatus', ['presence', 'speed_rpm', 'fault', 'direction'])
+
 class Fan(PddfFan):
     """PDDF Platform-Specific Fan class"""
 
     def __init__(self, tray_idx, fan_idx=0, pddf_data=None, pddf_plugin_data=None, is_psu_fan=False, psu_index=0):
         # idx is 0-based
         PddfFan.__init__(self, tray_idx, fan_idx, pddf_data, pddf_plugin_data, is_psu_fan, psu_index)
+        self._psu = None
+
+    def attach_psu(self, psu):
+        """
+        Serve the speed of this PSU fan from the snapshots of <psu>
+        """
+        self._psu = psu
 
     # Provide the functions/variables below for which implementation is to be overwritten
     # Since psu_fan airflow direction cant be read from sysfs, it is fixed as 'F2B' or 'intake'
@@ -53,12 +64,11 @@ class Fan(PddfFan):
             An Integer, the max speed
         """
         if self.is_psu_fan:
-            psu_fru = PsuFru(self.fans_psu_index)
-            max_speed = int(self.plugin_data['PSU']['valmap']['PSU_FAN_MAX_SPEED'])
-            for dev in self.plugin_data['PSU']['psu_support_list']:
-                if dev['Manufacturer'] == psu_fru.mfr_id and dev['Name'] == psu_fru.model:
-                    max_speed = int(self.plugin_data['PSU']['valmap'][dev['MaxSpd']])
-                    break           
+            model = lookup_psu_model(self.plugin_data, get_psu_fru(self.fans_psu_index))
+            if model is not None:
+                max_speed = model.max_speed
+            else:
+                max_speed = get_model_table(self.plugin_data).default_max_speed
         else:
             if self.fan_index % 2 == 0:
                 max_speed = int(self.plugin_data['FAN']['FAN_INLET_MAX_SPEED']) + int((int(self.plugin_data['FAN']['FAN_INLET_MAX_SPEED']) * self.get_speed_tolerance())/100)
@@ -104,25 +114,60 @@ class Fan(PddfFan):
         """
         if self.is_psu_fan:
             return True
-        else:
-            attr = "fan{}_input".format(self.fan_index)
-            reg_offset = fan_to_rpm_reg_offset_map.get(attr, 'Not Found')
-            if reg_offset is None:
-                return False
-
-            rpm_speed = self.get_fan_rpm_from_fpga(attr, reg_offset)
-            if int(rpm_speed) != 0:
-                val="1"
-            else:
-                val+"0"
+        try:
+            return self.get_status_record().presence
+        except IOError:
+            print("Error reading fan status of fan {}".format(self.fan_index))
+            return False
 
-            vmap = self.plugin_data['FAN']['present']['i2c']['valmap']
-            if val in vmap:
-                status = vmap[val]
-            else:
-                status = False
+    def get_status(self):
+        """
+        Retrieves the operational status of the fan
+
+        Returns:
+            A boolean, True if the fan is present, spinning and its fault
+            bit is clear
+        """
+        if self.is_psu_fan:
+            return self.get_speed_rpm() != 0
+        try:
+            record = self.get_status_record()
+        except IOError:
+            print("Error reading fan status of fan {}".format(self.fan_index))
+            return False
+        return record.presence and not record.fault and record.speed_rpm != 0
+
+    def get_status_record(self, bank=None):
+        """
+        Retrieves presence, speed, fault bit and direction of a fan tray fan
+        from one read of the fan status bank
+
+        Args:
+            bank: contents of fpga.FAN_STATUS_BANK to decode, read (or
+                  served from the register cache) if None
+        Returns:
+            A FanStatus
+        Raises:
+            IOError if the bank cannot be read
+        """
+        if bank is None:
+            bank = fpga.read_bank(fpga.FAN_STATUS_BANK)
+
+        rpm = 0
+        reg_offset = fan_to_rpm_reg_offset_map.get("fan{}_input".format(self.fan_index))
+        if reg_offset is not None:
+            # Both halves come from the same transaction, so the value cannot tear
+            i = fpga.FAN_STATUS_BANK.offset(reg_offset)
+            rpm = (bank[i] << 8) + bank[i+1]
+
+        fault_reg = FPGA_FAN_FAULT_REG_BASE + (self.fan_index - 1) // 8
+        fault = bool(bank[fpga.FAN_STATUS_BANK.offset(fault_reg)] >> ((self.fan_index - 1) % 8) & 1)
 
-        return status
+        val = "1" if rpm != 0 else "0"
+        vmap = self.plugin_data['FAN']['present']['i2c']['valmap']
+        presence = vmap[val] if val in vmap else False
+
+        return FanStatus(presence, rpm, fault, self.get_direction())
 
     def get_fan_rpm_from_fpga(self, attr, reg_offset):
         """
@@ -131,19 +176,14 @@ class Fan(PddfFan):
         Returns:
             An integer, speed of fan in RPM
         """
-
-        cmdstatus, rpm_0 = getstatusoutput_noshell(['i2cget', '-f', '-y', str(FPGA_I2C_BUS_NUM), str(FPGA_DEV_ADDR), str(reg_offset)])
-        if cmdstatus != 0:
+        try:
+            bank = fpga.read_bank(fpga.FAN_STATUS_BANK)
+        except IOError:
             print("Error reading reg {}".format(hex(reg_offset)))
             return 0
 
-        reg_offset = reg_offset+1
-        cmdstatus, rpm_1 = getstatusoutput_noshell(['i2cget', '-f', '-y', str(FPGA_I2C_BUS_NUM), str(FPGA_DEV_ADDR), str(reg_offset)])
-        if cmdstatus != 0:
-            print("Error reading reg {}".format(hex(reg_offset)))
-            return 0
-
-        rpm = (int(rpm_0, 16) << 8) + int(rpm_1, 16)
+        i = fpga.FAN_STATUS_BANK.offset(reg_offset)
+        rpm = (bank[i] << 8) + bank[i+1]
 
         return rpm
 
@@ -156,6 +196,13 @@ class Fan(PddfFan):
         """
         rpm_speed = 0
         if self.is_psu_fan:
+            if self._psu is not None:
+                from sonic_platform.psu import PSU_SNAPSHOT_MAX_AGE
+                fan_rpm = self._psu.get_snapshot(PSU_SNAPSHOT_MAX_AGE).fan_rpm
+                if 0 < self.fan_index <= len(fan_rpm):
+                    rpm = fan_rpm[self.fan_index - 1]
+                    return rpm if rpm is not None else rpm_speed
+
             attr = "psu_fan{}_speed_rpm".format(self.fan_index)
             device = "PSU{}".format(self.fans_psu_index)
             output = self.pddf_obj.get_attr_name_output(device, attr)
@@ -168,12 +215,10 @@ class Fan(PddfFan):
             else:
                 rpm_speed = int(float(output['status']))
         else:
-            attr = "fan{}_input".format(self.fan_index)
-            reg_offset = fan_to_rpm_reg_offset_map.get(attr, 'Not Found')
-            if reg_offset is None:
-                return 0
-
-            rpm_speed = self.get_fan_rpm_from_fpga(attr, reg_offset)
+            try:
+                rpm_speed = self.get_status_record().speed_rpm
+            except IOError:
+                print("Error reading fan status of fan {}".format(self.fan_index))
 
         return rpm_speed
 
@@ -186,13 +231,10 @@ class Fan(PddfFan):
         """
         direction = self.FAN_DIRECTION_NOT_APPLICABLE
         if self.is_psu_fan:
-            psu_fru = PsuFru(self.fans_psu_index)
-            if psu_fru.mfr_id == "not available":
+            model = lookup_psu_model(self.plugin_data, get_psu_fru(self.fans_psu_index))
+            if model is None:
                 return direction
-            for dev in self.plugin_data['PSU']['psu_support_list']:
-                if dev['Manufacturer'] == psu_fru.mfr_id and dev['Name'] == psu_fru.model:
-                    dir = dev['Dir']
-                    break
+            direction = model.direction
         else:
             if self.fan_index % 2 == 0:
                 val = "0"
@@ -201,8 +243,8 @@ class Fan(PddfFan):
 
             vmap = self.plugin_data['FAN']['direction']['i2c']['valmap']
             if val in vmap:
-                dir = vmap[val]
-        return dir
+                direction = vmap[val]
+        return direction
 
     def get_target_speed(self):
         """
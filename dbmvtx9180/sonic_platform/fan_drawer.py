@@ -3,6 +3,7 @@
 
 try:
     from sonic_platform_pddf_base.pddf_fan_drawer import PddfFanDrawer
+    from sonic_platform import fpga
 except ImportError as e:
     raise ImportError(str(e) + "- required module not found")
 
@@ -32,3 +33,46 @@ class FanDrawer(PddfFanDrawer):
             string: Serial number of Fan Drawer
         """
         return 'NA'
+
+    def get_status_records(self):
+        """
+        Retrieves the FanStatus of every fan in the drawer, all decoded
+        from one read of the fan status bank
+
+        Returns:
+            A list of FanStatus, in fan order
+        Raises:
+            IOError if the bank cannot be read
+        """
+        bank = fpga.read_bank(fpga.FAN_STATUS_BANK)
+        return [fan.get_status_record(bank) for fan in self.get_all_fans()]
+
+    def get_presence(self):
+        """
+        Retrieves the presence of the Fan Drawer
+
+        Returns:
+            bool: True if any fan of the drawer is present
+        """
+        try:
+            records = self.get_status_records()
+        except IOError:
+            print("Error reading fan status of fan drawer {}".format(self.fantray_index))
+            return False
+        return any(record.presence for record in records)
+
+    def get_status(self):
+        """
+        Retrieves the operational status of the Fan Drawer
+
+        Returns:
+            bool: True if every fan of the drawer is present, spinning and
+            not faulted
+        """
+        try:
+            records = self.get_status_records()
+        except IOError:
+            print("Error reading fan status of fan drawer {}".format(self.fantray_index))
+            return False
+        return bool(records) and all(record.presence and not record.fault and record.speed_rpm != 0
+                                     for record in records)
@@ -0,0 +1,242 @@
+"""
+Module contains the shared register accessor for the system FPGA.
+All platform objects go through this module instead of spawning i2cget.
+
+The FPGA address is claimed normally, never forced. If a kernel driver
+is bound to it, registers are read through the driver's PDDF SYSSTATUS
+attributes instead and cannot be written.
+"""
+
+import errno
+
+from .i2c_dev import SmbusDevice, SysfsRegisterDevice, I2C_SMBUS_BLOCK_MAX
+from .regcache import RegisterCache
+from .i2c_scheduler import get_scheduler, PRIORITY_THERMAL, PRIORITY_INVENTORY
+from . import instrumentation
+
+FPGA_I2C_BUS_NUM = 1
+FPGA_DEV_ADDR = 0x32
+
+PDDF_SYSSTATUS_PATH = "/sys/kernel/pddf/devices/sysstatus/sysstatus_data/{}"
+
+_fpga_device = None
+
+""" Register values shared by all Fan/Thermal/Component objects in the process """
+cache = RegisterCache()
+
+""" Optional callable(bank) returning bank contents published by another
+process, or None; consulted by cached bank reads before the hardware """
+bank_source = None
+
+""" FPGA register -> sysfs attribute of the bound driver exposing it, read
+when the driver holds the address; see resolve_sysfs_registers() """
+sysfs_registers = {}
+
+
+class FpgaBank(object):
+    """
+    Window of consecutive FPGA registers that is fetched in one read, so
+    that related registers are sampled together
+    """
+
+    def __init__(self, name, base, length, priority=PRIORITY_INVENTORY):
+        self.name = name
+        self.base = base
+        self.length = length
+        self.priority = priority
+
+    def __contains__(self, reg):
+        return self.base <= reg < self.base + self.length
+
+    def offset(self, reg):
+        """
+        Retrieves the position of register <reg> within a bank view
+        """
+        if reg not in self:
+            raise ValueError("Register {} is outside bank {}".format(hex(reg), self.name))
+        return reg - self.base
+
+
+""" Fan fault bitmap at 0x04 through the last tachometer register; the
+tachometers at 0x20-0x2d hold two registers (MSB first) per fan """
+FAN_STATUS_BANK = FpgaBank("fan_status", 0x04, 0x2a, PRIORITY_THERMAL)
+""" Temperature sensors at 0x40-0x42 """
+THERMAL_BANK = FpgaBank("thermal", 0x40, 0x03, PRIORITY_THERMAL)
+""" High temperature threshold at 0x50, apart from the sensors as
+0x43-0x4f are reserved """
+THERMAL_THRESHOLD_BANK = FpgaBank("thermal_threshold", 0x50, 0x01, PRIORITY_THERMAL)
+
+
+def get_device():
+    """
+    Retrieves the device object used to reach the FPGA, creating the
+    persistent /dev/i2c-1 handle on first use
+    """
+    global _fpga_device
+    if _fpga_device is None:
+        device = SmbusDevice(FPGA_I2C_BUS_NUM, FPGA_DEV_ADDR, force=False)
+        try:
+            device.fd
+        except IOError as e:
+            # Other errors are retried by the next transaction
+            if e.errno == errno.EBUSY:
+                print("FPGA {} is held by its driver, reading registers through sysfs".format(
+                    hex(FPGA_DEV_ADDR)))
+                device = SysfsRegisterDevice(sysfs_registers)
+        _fpga_device = device
+    return _fpga_device
+
+
+def resolve_sysfs_registers(pddf_obj):
+    """
+    Look up the FPGA registers exposed whole by 'SYSSTATUS' attributes in
+    the PDDF device data
+    @return dict of register offset to sysfs attribute path
+    """
+    registers = {}
+    try:
+        for attr in pddf_obj.data['SYSSTATUS']['attr_list']:
+            if int(attr['attr_devaddr'], 0) != FPGA_DEV_ADDR or int(attr.get('attr_mask', '0xff'), 0) != 0xff:
+                continue
+            registers[int(attr['attr_offset'], 0)] = PDDF_SYSSTATUS_PATH.format(attr['attr_name'])
+    except (KeyError, TypeError, ValueError, AttributeError):
+        pass
+    return registers
+
+
+def set_device(device):
+    """
+    Replace the device object used to reach the FPGA, e.g. with a
+    FakeSmbusDevice. Passing None restores the hardware device.
+    @return the previously installed device
+    """
+    global _fpga_device
+    previous = _fpga_device
+    _fpga_device = device
+    cache.invalidate()
+    return previous
+
+
+def _instrumentation_key(key):
+    # ('byte', 0x40) -> "0x40", ('block', 0x20, 14) -> "0x20+14", writes get a "w" prefix
+    prefix = 'w' if key[0].startswith('write') else ''
+    if len(key) > 2:
+        return "{}{}+{}".format(prefix, hex(key[1]), key[2])
+    return prefix + hex(key[1])
+
+
+def _run(func, priority, key, coalesce=True):
+    # Writes pass coalesce=False: their key only labels the instrumentation
+    scheduler = get_scheduler(FPGA_I2C_BUS_NUM)
+    bus_key = key if coalesce else None
+    if not instrumentation.is_enabled():
+        return scheduler.run(func, priority, bus_key)
+    return instrumentation.timed(instrumentation.KIND_FPGA, _instrumentation_key(key),
+                                 scheduler.run, func, priority, bus_key)
+
+
+def read_byte(reg, cached=True, priority=PRIORITY_INVENTORY):
+    """
+    Read a single FPGA register
+    @param cached serve the value from the register cache while fresh
+    @param priority bus scheduling priority of the read
+    @return integer in the range 0-255
+    """
+    if cached:
+        value = cache.lookup(reg)
+        if value is not None:
+            return value
+    device = get_device()
+    value = _run(lambda: device.read_byte_data(reg), priority, ('byte', reg))
+    cache.store(reg, 1, value)
+    return value
+
+
+def read_word(reg, priority=PRIORITY_INVENTORY):
+    """
+    Read a 16-bit word at <reg> in SMBus (little-endian) byte order
+    @return integer in the range 0-65535
+    """
+    device = get_device()
+    return _run(lambda: device.read_word_data(reg), priority, ('word', reg))
+
+
+def _read_block(device, reg, length):
+    if length <= I2C_SMBUS_BLOCK_MAX:
+        return device.read_i2c_block_data(reg, length)
+    if device.supports_i2c():
+        # One combined transfer, so the whole range is sampled together
+        return device.read_i2c_data(reg, length)
+
+    data = bytearray()
+    while length > 0:
+        chunk = min(length, I2C_SMBUS_BLOCK_MAX)
+        data += device.read_i2c_block_data(reg, chunk)
+        reg += chunk
+        length -= chunk
+    return bytes(data)
+
+
+def read_block(reg, length, priority=PRIORITY_INVENTORY):
+    """
+    Read <length> consecutive FPGA registers starting at <reg>, in one
+    transaction if the adapter supports plain I2C transfers. Otherwise a
+    range longer than I2C_SMBUS_BLOCK_MAX takes several block transactions
+    and its chunks are sampled at slightly different times.
+    @return bytes of the requested length
+    """
+    device = get_device()
+    return _run(lambda: _read_block(device, reg, length), priority, ('block', reg, length))
+
+
+def read_bank(bank, cached=True):
+    """
+    Read every register of <bank>, see read_block() for atomicity
+    @param cached serve the values from bank_source or the register cache
+           while fresh
+    @return memoryview over the register values, indexed by bank.offset()
+    """
+    if cached:
+        if bank_source is not None:
+            data = bank_source(bank)
+            if data is not None:
+                return memoryview(data)
+        data = cache.lookup(bank.base, bank.length)
+        if data is not None:
+            return memoryview(data)
+    data = read_block(bank.base, bank.length, bank.priority)
+    cache.store(bank.base, bank.length, data)
+    return memoryview(data)
+
+
+def write_byte(reg, value, priority=PRIORITY_INVENTORY):
+    """
+    Write byte <value> to FPGA register <reg>
+    """
+    device = get_device()
+    try:
+        _run(lambda: device.write_byte_data(reg, value), priority, ('write', reg), coalesce=False)
+    finally:
+        cache.invalidate(reg)
+
+
+def _write_block(device, reg, data):
+    view = memoryview(data)
+    offset = 0
+    while offset < len(view):
+        chunk = view[offset:offset + I2C_SMBUS_BLOCK_MAX]
+        device.write_i2c_block_data(reg + offset, chunk)
+        offset += len(chunk)
+
+
+def write_block(reg, data, priority=PRIORITY_INVENTORY):
+    """
+    Write <data> to consecutive FPGA registers starting at <reg>, in block
+    transactions of up to I2C_SMBUS_BLOCK_MAX bytes
+    """
+    device = get_device()
+    try:
+        _run(lambda: _write_block(device, reg, data), priority, ('write_block', reg, len(data)),
+             coalesce=False)
+    finally:
+        cache.invalidate(reg, len(data))
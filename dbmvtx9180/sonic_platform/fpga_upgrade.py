@@ -0,0 +1,220 @@
+"""
+Module contains the SysFPGA firmware programmer. The image is memory
+mapped and streamed to the FPGA flash one page at a time through the
+register window described by the 'upgrade' section of the FPGA plugin
+data:
+
+    page_reg       two registers (LSB first) selecting the flash page
+    window_base    first register of the page-sized data window
+    page_size      bytes per flash page
+    ctrl_reg       command register
+    ctrl_program   command writing the window to the selected page
+    ctrl_readback  command loading the selected page into the window
+    status_reg     status register, polled while busy_mask is set
+    busy_mask      busy bit(s) of status_reg
+    ctrl_start     optional command entering upgrade mode
+    ctrl_finish    optional command leaving upgrade mode
+
+There is no built-in register map: platforms without an 'upgrade'
+section do not support SysFPGA upgrades.
+
+Every page is verified by reading the whole window back before the next
+one is written. The last verified page is recorded in a state file, so
+an interrupted upgrade of the same image resumes from there.
+"""
+
+import os
+import json
+import mmap
+import time
+import hashlib
+
+from . import fpga
+
+UPGRADE_STATE_PATH = "/var/cache/sonic-platform/fpga-upgrade.json"
+# The state file is rewritten after this many verified pages
+STATE_SYNC_PAGES = 16
+
+""" Seconds to wait for a page program or read-back to complete """
+BUSY_TIMEOUT = 2.0
+BUSY_POLL_INTERVAL = 0.001
+
+REGISTER_MAP_KEYS = ('page_reg', 'window_base', 'page_size', 'ctrl_reg', 'ctrl_program',
+                     'ctrl_readback', 'status_reg', 'busy_mask')
+REGISTER_MAP_OPTIONAL_KEYS = ('ctrl_start', 'ctrl_finish')
+
+
+class FpgaUpgradeError(Exception):
+    pass
+
+
+def _to_int(value):
+    return int(value, 0) if isinstance(value, str) else int(value)
+
+
+def get_register_map(plugin_data):
+    """
+    Retrieves the flash programming registers from the plugin data
+
+    Returns:
+        A dict of register map key to integer, or None if the plugin data
+        has no FPGA upgrade section. Raises ValueError if it is incomplete.
+    """
+    upgrade = (plugin_data or {}).get('FPGA', {}).get('upgrade')
+    if upgrade is None:
+        return None
+
+    missing = [key for key in REGISTER_MAP_KEYS if key not in upgrade]
+    if missing:
+        raise ValueError("FPGA upgrade register map lacks {}".format(", ".join(missing)))
+    return dict((key, _to_int(upgrade[key]))
+                for key in REGISTER_MAP_KEYS + REGISTER_MAP_OPTIONAL_KEYS if key in upgrade)
+
+
+class FpgaProgrammer(object):
+    """
+    Writes and verifies an FPGA image through the flash window
+    """
+
+    def __init__(self, register_map, state_path=None, progress=None):
+        """
+        @param register_map dict as returned by get_register_map()
+        @param state_path file recording the progress of an upgrade,
+               UPGRADE_STATE_PATH by default
+        @param progress callable(bytes_done, bytes_total) invoked after
+               every verified page
+        """
+        self.regs = register_map
+        self.page_size = register_map['page_size']
+        self.state_path = state_path or UPGRADE_STATE_PATH
+        self.progress = progress
+
+    def _wait_ready(self):
+        deadline = time.monotonic() + BUSY_TIMEOUT
+        while fpga.read_byte(self.regs['status_reg'], cached=False) & self.regs['busy_mask']:
+            if time.monotonic() > deadline:
+                raise FpgaUpgradeError("FPGA flash busy for more than {}s".format(BUSY_TIMEOUT))
+            time.sleep(BUSY_POLL_INTERVAL)
+
+    def _command(self, name):
+        fpga.write_byte(self.regs['ctrl_reg'], self.regs[name])
+        self._wait_ready()
+
+    def _select_page(self, page):
+        fpga.write_block(self.regs['page_reg'], bytes((page & 0xff, (page >> 8) & 0xff)))
+
+    def _read_page(self, page):
+        self._select_page(page)
+        self._command('ctrl_readback')
+        return fpga.read_block(self.regs['window_base'], self.page_size)
+
+    def _program_page(self, page, data):
+        self._select_page(page)
+        fpga.write_block(self.regs['window_base'], data)
+        self._command('ctrl_program')
+        if self._read_page(page) != data:
+            raise FpgaUpgradeError("Verification of page {} failed".format(page))
+
+    def _page_data(self, image, page):
+        data = image[page * self.page_size:(page + 1) * self.page_size].tobytes()
+        # Pad the tail of the last page as erased flash
+        return data + b'\xff' * (self.page_size - len(data))
+
+    def _load_state(self, digest):
+        try:
+            with open(self.state_path, 'r') as f:
+                state = json.load(f)
+        except (IOError, ValueError):
+            return 0
+        if state.get('digest') != digest or state.get('page_size') != self.page_size:
+            return 0
+        return int(state.get('next_page', 0))
+
+    def _save_state(self, digest, next_page):
+        directory = os.path.dirname(self.state_path)
+        if directory and not os.path.isdir(directory):
+            os.makedirs(directory)
+        tmp_path = self.state_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'digest': digest, 'page_size': self.page_size, 'next_page': next_page}, f)
+        os.rename(tmp_path, self.state_path)
+
+    def _clear_state(self):
+        try:
+            os.remove(self.state_path)
+        except OSError:
+            pass
+
+    def _resume_point(self, image, digest, num_pages):
+        next_page = min(self._load_state(digest), num_pages)
+        if next_page == 0:
+            return 0
+        # Trust the record only if the last page it claims still reads back
+        last = next_page - 1
+        if self._read_page(last) != self._page_data(image, last):
+            return 0
+        return next_page
+
+    def program(self, image_path, resume=True):
+        """
+        Write <image_path> to the FPGA flash
+
+        Args:
+            image_path: path of the raw flash image
+            resume: continue an interrupted upgrade of the same image
+        Returns:
+            The number of pages written in this run. Raises FpgaUpgradeError
+            or IOError on failure; the state file then records the last
+            verified page.
+        """
+        with open(image_path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size == 0:
+                raise FpgaUpgradeError("Image {} is empty".format(image_path))
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            image = memoryview(mapped)
+            try:
+                return self._program_image(image, hashlib.sha256(image).hexdigest(), size, resume)
+            finally:
+                image.release()
+        finally:
+            mapped.close()
+            # Nothing cached from before the upgrade is trustworthy anymore
+            fpga.cache.invalidate()
+
+    def _program_image(self, image, digest, size, resume):
+        num_pages = (size + self.page_size - 1) // self.page_size
+
+        if 'ctrl_start' in self.regs:
+            self._command('ctrl_start')
+
+        failed = True
+        try:
+            start = self._resume_point(image, digest, num_pages) if resume else 0
+            next_page = start
+            try:
+                for page in range(start, num_pages):
+                    self._program_page(page, self._page_data(image, page))
+                    next_page = page + 1
+                    if next_page % STATE_SYNC_PAGES == 0:
+                        self._save_state(digest, next_page)
+                    if self.progress:
+                        self.progress(min(next_page * self.page_size, size), size)
+            except Exception:
+                if next_page > start:
+                    self._save_state(digest, next_page)
+                raise
+            failed = False
+        finally:
+            # Never leave the FPGA in upgrade mode, whatever happened
+            if 'ctrl_finish' in self.regs:
+                try:
+                    self._command('ctrl_finish')
+                except (FpgaUpgradeError, IOError):
+                    if not failed:
+                        raise
+
+        self._clear_state()
+        return num_pages - start
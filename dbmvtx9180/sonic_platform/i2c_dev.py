@@ -0,0 +1,328 @@
+"""
+Module contains in-process SMBus access to devices on an I2C bus through
+the i2c-dev character device, a read-only sysfs fallback for devices
+held by a kernel driver, and a fake device that can be used in place of
+real hardware
+"""
+
+import os
+import errno
+import fcntl
+import array
+import struct
+import weakref
+import threading
+
+from .utils import fread_bulk
+
+""" i2c-dev ioctl commands """
+I2C_SLAVE = 0x0703
+I2C_SLAVE_FORCE = 0x0706
+I2C_FUNCS = 0x0705
+I2C_RDWR = 0x0707
+I2C_SMBUS = 0x0720
+
+""" Adapter functionality bit for plain I2C (I2C_RDWR) transfers """
+I2C_FUNC_I2C = 0x00000001
+""" i2c_msg flag of a read message """
+I2C_M_RD = 0x0001
+
+""" SMBus transaction types """
+I2C_SMBUS_READ = 1
+I2C_SMBUS_WRITE = 0
+I2C_SMBUS_BYTE_DATA = 2
+I2C_SMBUS_WORD_DATA = 3
+I2C_SMBUS_I2C_BLOCK_DATA = 8
+
+""" Maximum payload of a single SMBus block transaction """
+I2C_SMBUS_BLOCK_MAX = 32
+
+I2C_DEV_PATH = "/dev/i2c-{}"
+
+# struct i2c_smbus_ioctl_data { u8 read_write; u8 command; u32 size; void *data; }
+_SMBUS_IOCTL_DATA = '@BBIP'
+# struct i2c_msg { u16 addr; u16 flags; u16 len; u8 *buf; }
+_I2C_MSG = '@HHHP'
+# struct i2c_rdwr_ioctl_data { struct i2c_msg *msgs; u32 nmsgs; }
+_RDWR_IOCTL_DATA = '@PI'
+
+# Every SmbusDevice, so that a forked child can release their locks
+_devices = weakref.WeakSet()
+
+
+def _after_fork_in_child():
+    # A bus worker of the parent may have held the lock at fork time
+    for device in list(_devices):
+        device._lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+class SmbusDevice(object):
+    """
+    SMBus client at a fixed address on an I2C bus. The bus handle is opened
+    on first use and kept open for the lifetime of the object.
+    """
+
+    def __init__(self, bus, addr, force=True):
+        """
+        @param bus I2C bus number
+        @param addr 7-bit slave address
+        @param force claim the address even if a kernel driver is bound to
+               it; without it, opening fails with EBUSY in that case
+        """
+        self.bus = bus
+        self.addr = addr
+        self.force = force
+        self._fd = None
+        self._funcs = None
+        # union i2c_smbus_data, large enough for a block transfer
+        self._data = array.array('B', [0] * (I2C_SMBUS_BLOCK_MAX + 2))
+        # Serializes users of the shared data buffer across threads
+        self._lock = threading.Lock()
+        _devices.add(self)
+
+    @property
+    def fd(self):
+        if self._fd is None:
+            self._fd = self.open_handle()
+        return self._fd
+
+    def open_handle(self):
+        fd = os.open(I2C_DEV_PATH.format(self.bus), os.O_RDWR)
+        try:
+            fcntl.ioctl(fd, I2C_SLAVE_FORCE if self.force else I2C_SLAVE, self.addr)
+        except IOError:
+            os.close(fd)
+            raise
+        return fd
+
+    def close(self):
+        """
+        Close the bus handle
+        """
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def __del__(self):
+        self.close()
+
+    def _transfer(self, read_write, command, size):
+        req = struct.pack(_SMBUS_IOCTL_DATA, read_write, command, size,
+                          self._data.buffer_info()[0])
+        try:
+            fcntl.ioctl(self.fd, I2C_SMBUS, req)
+        except IOError:
+            # Drop the handle so that the next transaction starts afresh
+            self.close()
+            raise
+
+    def supports_i2c(self):
+        """
+        Retrieves whether the adapter can do plain I2C transfers, i.e.
+        read_i2c_data()
+        """
+        if self._funcs is None:
+            funcs = array.array('L', [0])
+            try:
+                fcntl.ioctl(self.fd, I2C_FUNCS, funcs, True)
+            except IOError:
+                # Without the query, stay with the SMBus transfers that are known to work
+                funcs[0] = 0
+            self._funcs = funcs[0]
+        return bool(self._funcs & I2C_FUNC_I2C)
+
+    def read_i2c_data(self, reg, length):
+        """
+        Read <length> consecutive registers starting at <reg> in a single
+        combined write/read I2C transfer, which is not bound by the SMBus
+        block size. Requires supports_i2c().
+        @return bytes of the requested length
+        """
+        if length < 1:
+            raise ValueError("Invalid block length {}".format(length))
+        command = array.array('B', [reg])
+        data = array.array('B', [0] * length)
+        msgs = struct.pack(_I2C_MSG, self.addr, 0, 1, command.buffer_info()[0]) + \
+            struct.pack(_I2C_MSG, self.addr, I2C_M_RD, length, data.buffer_info()[0])
+        msgs_buf = array.array('B', msgs)
+        req = struct.pack(_RDWR_IOCTL_DATA, msgs_buf.buffer_info()[0], 2)
+        with self._lock:
+            try:
+                fcntl.ioctl(self.fd, I2C_RDWR, req)
+            except IOError:
+                self.close()
+                raise
+        return data.tobytes()
+
+    def read_byte_data(self, reg):
+        """
+        Read a byte from register <reg>
+        @return integer in the range 0-255
+        """
+        with self._lock:
+            self._transfer(I2C_SMBUS_READ, reg, I2C_SMBUS_BYTE_DATA)
+            return self._data[0]
+
+    def read_word_data(self, reg):
+        """
+        Read a 16-bit word starting at register <reg> (SMBus little-endian order)
+        @return integer in the range 0-65535
+        """
+        with self._lock:
+            self._transfer(I2C_SMBUS_READ, reg, I2C_SMBUS_WORD_DATA)
+            return self._data[0] | (self._data[1] << 8)
+
+    def read_i2c_block_data(self, reg, length):
+        """
+        Read up to I2C_SMBUS_BLOCK_MAX consecutive registers starting at <reg>
+        @return bytes of the requested length
+        """
+        if length < 1 or length > I2C_SMBUS_BLOCK_MAX:
+            raise ValueError("Invalid block length {}".format(length))
+        with self._lock:
+            self._data[0] = length
+            self._transfer(I2C_SMBUS_READ, reg, I2C_SMBUS_I2C_BLOCK_DATA)
+            return self._data[1:length + 1].tobytes()
+
+    def write_byte_data(self, reg, value):
+        """
+        Write byte <value> to register <reg>
+        """
+        with self._lock:
+            self._data[0] = value & 0xff
+            self._transfer(I2C_SMBUS_WRITE, reg, I2C_SMBUS_BYTE_DATA)
+
+    def write_i2c_block_data(self, reg, data):
+        """
+        Write up to I2C_SMBUS_BLOCK_MAX bytes to consecutive registers
+        starting at <reg>
+        """
+        length = len(data)
+        if length < 1 or length > I2C_SMBUS_BLOCK_MAX:
+            raise ValueError("Invalid block length {}".format(length))
+        with self._lock:
+            self._data[0] = length
+            self._data[1:length + 1] = array.array('B', bytes(data))
+            self._transfer(I2C_SMBUS_WRITE, reg, I2C_SMBUS_I2C_BLOCK_DATA)
+
+
+class SysfsRegisterDevice(object):
+    """
+    Read-only stand-in for SmbusDevice when a kernel driver holds the
+    address. Registers are read from the driver's sysfs attributes, one
+    attribute per register; registers it does not expose cannot be read.
+    """
+
+    def __init__(self, registers):
+        """
+        @param registers dict of {reg: sysfs path of its attribute}
+        """
+        self.registers = dict(registers)
+
+    def close(self):
+        pass
+
+    def supports_i2c(self):
+        return True
+
+    def read_i2c_data(self, reg, length):
+        if length < 1:
+            raise ValueError("Invalid block length {}".format(length))
+        paths = []
+        for offset in range(reg, reg + length):
+            path = self.registers.get(offset)
+            if path is None:
+                raise IOError(errno.EBUSY, "Register {} is not exposed by the driver".format(hex(offset)))
+            paths.append(path)
+        values, errors = fread_bulk((path, lambda value: int(value, 0) & 0xff) for path in set(paths))
+        if errors:
+            raise IOError("Failed to read {}".format(", ".join(sorted(errors))))
+        return bytes(values[path] for path in paths)
+
+    def read_byte_data(self, reg):
+        return self.read_i2c_data(reg, 1)[0]
+
+    def read_word_data(self, reg):
+        data = self.read_i2c_data(reg, 2)
+        return data[0] | (data[1] << 8)
+
+    def read_i2c_block_data(self, reg, length):
+        if length < 1 or length > I2C_SMBUS_BLOCK_MAX:
+            raise ValueError("Invalid block length {}".format(length))
+        return self.read_i2c_data(reg, length)
+
+    def write_byte_data(self, reg, value):
+        raise IOError(errno.EBUSY, "Register {} is held by its driver".format(hex(reg)))
+
+    def write_i2c_block_data(self, reg, data):
+        raise IOError(errno.EBUSY, "Register {} is held by its driver".format(hex(reg)))
+
+
+class FakeSmbusDevice(object):
+    """
+    Register-file backed stand-in for SmbusDevice. Used to exercise and
+    benchmark the platform API without hardware.
+    """
+
+    def __init__(self, registers=None, size=256, latency=0, fail_regs=None):
+        """
+        @param registers dict of {reg: value} used to seed the register file
+        @param size number of addressable registers
+        @param latency seconds added to every transaction, to model bus time
+        @param fail_regs registers whose access raises IOError
+        """
+        self.regs = bytearray(size)
+        for reg, value in (registers or {}).items():
+            self.regs[reg] = value & 0xff
+        self.latency = latency
+        self.fail_regs = set(fail_regs or ())
+        self.transactions = 0
+
+    def _access(self, reg, length):
+        self.transactions += 1
+        if self.latency:
+            import time
+            time.sleep(self.latency)
+        if reg < 0 or reg + length > len(self.regs):
+            raise IOError("Register {} out of range".format(hex(reg)))
+        if self.fail_regs.intersection(range(reg, reg + length)):
+            raise IOError("Simulated failure accessing register {}".format(hex(reg)))
+
+    def close(self):
+        pass
+
+    def supports_i2c(self):
+        return True
+
+    def read_i2c_data(self, reg, length):
+        if length < 1:
+            raise ValueError("Invalid block length {}".format(length))
+        self._access(reg, length)
+        return bytes(self.regs[reg:reg + length])
+
+    def read_byte_data(self, reg):
+        self._access(reg, 1)
+        return self.regs[reg]
+
+    def read_word_data(self, reg):
+        self._access(reg, 2)
+        return self.regs[reg] | (self.regs[reg + 1] << 8)
+
+    def read_i2c_block_data(self, reg, length):
+        if length < 1 or length > I2C_SMBUS_BLOCK_MAX:
+            raise ValueError("Invalid block length {}".format(length))
+        self._access(reg, length)
+        return bytes(self.regs[reg:reg + length])
+
+    def write_byte_data(self, reg, value):
+        self._access(reg, 1)
+        self.regs[reg] = value & 0xff
+
+    def write_i2c_block_data(self, reg, data):
+        if len(data) < 1 or len(data) > I2C_SMBUS_BLOCK_MAX:
+            raise ValueError("Invalid block length {}".format(len(data)))
+        self._access(reg, len(data))
+        self.regs[reg:reg + len(data)] = bytes(data)
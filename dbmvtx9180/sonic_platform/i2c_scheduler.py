@@ -0,0 +1,239 @@
+"""
+Module contains the per-bus I2C transaction scheduler. Every transaction
+on a bus runs on that bus's worker thread, one at a time, in priority
+order; identical reads pending at the same time are coalesced into one.
+Transactions are also serialized against other processes with a lock
+file per bus.
+"""
+
+import os
+import time
+import fcntl
+import heapq
+import threading
+
+""" Transaction priorities, lower is served first """
+PRIORITY_PRESENCE = 0
+PRIORITY_THERMAL = 1
+PRIORITY_INVENTORY = 2
+
+PRIORITY_NAMES = {
+    PRIORITY_PRESENCE: 'presence',
+    PRIORITY_THERMAL: 'thermal',
+    PRIORITY_INVENTORY: 'inventory',
+}
+
+BUS_LOCK_PATH = "/run/lock/sonic-platform-i2c-{}.lock"
+
+
+class _Request(object):
+
+    __slots__ = ('func', 'key', 'priority', 'future', 'enqueued')
+
+    def __init__(self, func, key, priority):
+        # concurrent.futures pulls in logging, keep it off the import path
+        from concurrent.futures import Future
+        self.func = func
+        self.key = key
+        self.priority = priority
+        self.future = Future()
+        self.enqueued = time.monotonic()
+
+
+class BusScheduler(object):
+    """
+    Serializes and orders the transactions of one I2C bus
+    """
+
+    def __init__(self, bus, lock_path=BUS_LOCK_PATH):
+        self.bus = bus
+        self._lock_path = lock_path.format(bus) if lock_path else None
+        self._lock_fd = None
+        self._heap = []
+        self._pending = {}
+        self._seq = 0
+        self._cond = threading.Condition()
+        self._thread = None
+        self._reset_metrics()
+
+    def _reset_metrics(self):
+        self._metrics = {
+            'submitted': 0,
+            'executed': 0,
+            'coalesced': 0,
+            'errors': 0,
+            'max_queue_depth': 0,
+        }
+        # per priority: [count, total wait, max wait]
+        self._wait = dict((p, [0, 0.0, 0.0]) for p in PRIORITY_NAMES)
+
+    def _start(self):
+        self._thread = threading.Thread(target=self._run, name="i2c-bus{}".format(self.bus))
+        self._thread.daemon = True
+        self._thread.start()
+
+    def submit(self, func, priority=PRIORITY_INVENTORY, key=None):
+        """
+        Queue <func> to run on the bus
+
+        Args:
+            func: callable performing the transaction
+            priority: one of the PRIORITY_* constants
+            key: hashable identity of a read; a pending request with the
+                 same key is shared instead of queueing a new one
+        Returns:
+            A concurrent.futures.Future holding the result of func
+        """
+        with self._cond:
+            self._metrics['submitted'] += 1
+            if key is not None:
+                request = self._pending.get(key)
+                if request is not None:
+                    self._metrics['coalesced'] += 1
+                    if priority < request.priority:
+                        # Re-queue at the higher priority, the stale heap entry is skipped
+                        request.priority = priority
+                        self._push(request)
+                    return request.future
+
+            request = _Request(func, key, priority)
+            if key is not None:
+                self._pending[key] = request
+            self._push(request)
+            if self._thread is None:
+                self._start()
+            self._cond.notify()
+            return request.future
+
+    def _push(self, request):
+        self._seq += 1
+        heapq.heappush(self._heap, (request.priority, self._seq, request))
+        depth = len(self._heap)
+        if depth > self._metrics['max_queue_depth']:
+            self._metrics['max_queue_depth'] = depth
+
+    def run(self, func, priority=PRIORITY_INVENTORY, key=None):
+        """
+        Run <func> on the bus and wait for its result. Exceptions raised by
+        func are re-raised in the caller.
+        """
+        if threading.current_thread() is self._thread:
+            # Already on the bus worker, e.g. a transaction issuing another
+            return func()
+        return self.submit(func, priority, key).result()
+
+    def _bus_lock(self, operation):
+        if self._lock_path is None:
+            return
+        try:
+            if self._lock_fd is None:
+                self._lock_fd = os.open(self._lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+            fcntl.flock(self._lock_fd, operation)
+        except (IOError, OSError):
+            # Cross-process locking is best effort
+            self._lock_path = None
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._heap:
+                    self._cond.wait()
+                priority, _, request = heapq.heappop(self._heap)
+                if request.future.done() or priority != request.priority:
+                    continue
+                if request.key is not None:
+                    self._pending.pop(request.key, None)
+
+            waited = time.monotonic() - request.enqueued
+            self._bus_lock(fcntl.LOCK_EX)
+            try:
+                request.future.set_result(request.func())
+            except Exception as e:
+                self._metrics['errors'] += 1
+                request.future.set_exception(e)
+            finally:
+                self._bus_lock(fcntl.LOCK_UN)
+
+            with self._cond:
+                self._metrics['executed'] += 1
+                wait = self._wait[request.priority]
+                wait[0] += 1
+                wait[1] += waited
+                wait[2] = max(wait[2], waited)
+
+    def get_queue_depth(self):
+        with self._cond:
+            return len(self._heap)
+
+    def get_metrics(self):
+        """
+        Retrieves the scheduler counters
+
+        Returns:
+            A dict with the current and maximum queue depth, submitted,
+            executed, coalesced and failed transaction counts, and
+            per-priority wait times in seconds under 'wait'
+        """
+        with self._cond:
+            metrics = dict(self._metrics)
+            metrics['queue_depth'] = len(self._heap)
+            metrics['wait'] = dict(
+                (PRIORITY_NAMES[p], {'count': w[0],
+                                     'avg': w[1] / w[0] if w[0] else 0.0,
+                                     'max': w[2]})
+                for p, w in self._wait.items())
+            return metrics
+
+    def reset_metrics(self):
+        with self._cond:
+            self._reset_metrics()
+
+    def _after_fork(self):
+        # Only the forking thread survives in the child: the worker is gone,
+        # the condition may be held by it and queued requests belong to
+        # waiters of the parent. The child also opens its own lock file, as
+        # a flock shared with the parent would not exclude it.
+        self._cond = threading.Condition()
+        self._heap = []
+        self._pending = {}
+        self._thread = None
+        if self._lock_fd is not None:
+            try:
+                os.close(self._lock_fd)
+            except OSError:
+                pass
+            self._lock_fd = None
+
+
+_schedulers = {}
+_schedulers_lock = threading.Lock()
+
+
+def _after_fork_in_child():
+    global _schedulers_lock
+    _schedulers_lock = threading.Lock()
+    for scheduler in list(_schedulers.values()):
+        scheduler._after_fork()
+
+
+os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+def get_scheduler(bus):
+    """
+    Retrieves the process-wide scheduler of I2C bus <bus>
+    """
+    scheduler = _schedulers.get(bus)
+    if scheduler is None:
+        with _schedulers_lock:
+            scheduler = _schedulers.get(bus)
+            if scheduler is None:
+                scheduler = _schedulers[bus] = BusScheduler(bus)
+    return scheduler
+
+
+def get_all_metrics():
+    """
+    Retrieves the metrics of every bus scheduler, keyed by bus number
+    """
+    return dict((bus, scheduler.get_metrics()) for bus, scheduler in list(_schedulers.items()))
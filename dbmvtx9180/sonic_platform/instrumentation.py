@@ -0,0 +1,277 @@
+"""
+Module contains the hot-path instrumentation of FPGA register, sysfs and
+PDDF attribute reads: call and error counts and a latency histogram per
+register or path.
+
+Instrumentation is off by default and costs one clock read per call while
+off. It is switched on at runtime, without restarting any daemon, by
+creating CONTROL_PATH (or by calling enable()). While on, a background
+thread of every process publishes its statistics to DUMP_PATH about once
+per CHECK_INTERVAL; dumps of processes that are gone are removed.
+"""
+
+import os
+import sys
+import time
+import threading
+
+CONTROL_PATH = "/run/sonic-platform/instrumentation"
+DUMP_PATH = "/run/sonic-platform/instrumentation-{pid}.json"
+""" Seconds between two checks of the control file """
+CHECK_INTERVAL = 1.0
+
+""" Latency histogram bucket upper bounds, in microseconds """
+HISTOGRAM_BUCKETS_US = (10, 50, 100, 500, 1000, 5000, 10000, 50000, 100000, 1000000)
+
+KIND_FPGA = 'fpga'
+KIND_SYSFS = 'sysfs'
+KIND_PDDF = 'pddf'
+
+_enabled = False
+_forced = None
+_next_check = 0.0
+_stats = {}
+_lock = threading.Lock()
+_dump_thread = None
+_dump_lock = threading.Lock()
+
+
+def _after_fork_in_child():
+    # The dump thread of the parent is gone and the statistics are its own
+    global _lock, _dump_lock, _dump_thread
+    _lock = threading.Lock()
+    _dump_lock = threading.Lock()
+    _dump_thread = None
+    _stats.clear()
+
+
+os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+class _Stat(object):
+
+    __slots__ = ('count', 'errors', 'total', 'max', 'histogram')
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.histogram = [0] * (len(HISTOGRAM_BUCKETS_US) + 1)
+
+    def add(self, elapsed, error):
+        self.count += 1
+        if error:
+            self.errors += 1
+        self.total += elapsed
+        if elapsed > self.max:
+            self.max = elapsed
+        elapsed_us = elapsed * 1e6
+        for i, bound in enumerate(HISTOGRAM_BUCKETS_US):
+            if elapsed_us <= bound:
+                self.histogram[i] += 1
+                return
+        self.histogram[-1] += 1
+
+    def as_dict(self):
+        bounds = list(HISTOGRAM_BUCKETS_US) + [None]
+        return {
+            'count': self.count,
+            'errors': self.errors,
+            'avg_us': self.total / self.count * 1e6 if self.count else 0.0,
+            'max_us': self.max * 1e6,
+            'histogram_us': [[b, n] for b, n in zip(bounds, self.histogram) if n],
+        }
+
+
+def is_enabled():
+    """
+    Retrieves whether instrumentation is on, re-checking the control file
+    at most once per CHECK_INTERVAL
+    """
+    global _enabled, _next_check
+    now = time.monotonic()
+    if now < _next_check:
+        return _enabled
+    _next_check = now + CHECK_INTERVAL
+    _enabled = os.path.exists(CONTROL_PATH) if _forced is None else _forced
+    if _enabled and _dump_thread is None:
+        _start_dump_thread()
+    return _enabled
+
+
+def _start_dump_thread():
+    global _dump_thread
+    with _dump_lock:
+        if _dump_thread is None:
+            _dump_thread = threading.Thread(target=_dump_loop, name="instrumentation-dump")
+            _dump_thread.daemon = True
+            _dump_thread.start()
+
+
+def _dump_loop():
+    global _dump_thread
+    while True:
+        time.sleep(CHECK_INTERVAL)
+        # Publish what was gathered during the last interval
+        try:
+            dump_json()
+        except (IOError, OSError):
+            pass
+        with _dump_lock:
+            if not is_enabled():
+                _dump_thread = None
+                return
+
+
+def enable():
+    """
+    Turn instrumentation on in this process regardless of the control file
+    """
+    _set_forced(True)
+
+
+def disable():
+    """
+    Turn instrumentation off in this process regardless of the control file
+    """
+    _set_forced(False)
+
+
+def follow_control_file():
+    """
+    Go back to following the control file
+    """
+    _set_forced(None)
+
+
+def _set_forced(value):
+    global _forced, _next_check
+    _forced = value
+    _next_check = 0.0
+
+
+def record(kind, key, elapsed, error=False):
+    """
+    Record one call of <kind> on <key> that took <elapsed> seconds
+    """
+    with _lock:
+        stat = _stats.get((kind, key))
+        if stat is None:
+            stat = _stats[(kind, key)] = _Stat()
+        stat.add(elapsed, error)
+
+
+def timed(kind, key, func, *args):
+    """
+    Call func(*args), recording its latency and failure under (kind, key)
+    while instrumentation is on
+    """
+    if not is_enabled():
+        return func(*args)
+    start = time.perf_counter()
+    try:
+        result = func(*args)
+    except Exception:
+        record(kind, key, time.perf_counter() - start, True)
+        raise
+    record(kind, key, time.perf_counter() - start)
+    return result
+
+
+def instrument_pddf(pddf_obj):
+    """
+    Route the PDDF attribute reads of <pddf_obj>, shared by every platform
+    object, through the instrumentation. A missing attribute value counts
+    as an error.
+    """
+    if getattr(pddf_obj, '_instrumented', False):
+        return
+    get_attr_name_output = pddf_obj.get_attr_name_output
+
+    def instrumented(device_name, attr_name):
+        if not is_enabled():
+            return get_attr_name_output(device_name, attr_name)
+        key = "{}/{}".format(device_name, attr_name)
+        start = time.perf_counter()
+        try:
+            output = get_attr_name_output(device_name, attr_name)
+        except Exception:
+            record(KIND_PDDF, key, time.perf_counter() - start, True)
+            raise
+        record(KIND_PDDF, key, time.perf_counter() - start, output is None)
+        return output
+
+    pddf_obj.get_attr_name_output = instrumented
+    pddf_obj._instrumented = True
+
+
+def dump():
+    """
+    Retrieves the statistics gathered so far
+
+    Returns:
+        A dict of kind to a dict of register/path to its counters
+    """
+    result = {}
+    with _lock:
+        for (kind, key), stat in _stats.items():
+            result.setdefault(kind, {})[key] = stat.as_dict()
+    return result
+
+
+def dump_json(path=None):
+    """
+    Write the statistics of this process as JSON, by default to DUMP_PATH
+    after removing the dumps of processes that have exited
+    """
+    import json
+    if path is None:
+        path = DUMP_PATH.format(pid=os.getpid())
+        prune_dumps()
+    directory = os.path.dirname(path)
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+    tmp_path = path + '.tmp'
+    name = os.path.basename(sys.argv[0]) if sys.argv and sys.argv[0] else None
+    with open(tmp_path, 'w') as f:
+        json.dump({'pid': os.getpid(), 'name': name, 'timestamp': time.time(), 'stats': dump()}, f)
+    os.rename(tmp_path, path)
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def prune_dumps():
+    """
+    Remove the DUMP_PATH files of processes that no longer exist
+    """
+    directory = os.path.dirname(DUMP_PATH)
+    prefix, suffix = os.path.basename(DUMP_PATH).split('{pid}')
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return
+    for name in names:
+        # Also the temporary file of a process that died while dumping
+        base = name[:-len('.tmp')] if name.endswith('.tmp') else name
+        if not base.startswith(prefix) or not base.endswith(suffix):
+            continue
+        pid = base[len(prefix):len(base) - len(suffix)]
+        if pid.isdigit() and not _pid_alive(int(pid)):
+            try:
+                os.remove(os.path.join(directory, name))
+            except OSError:
+                pass
+
+
+def reset():
+    with _lock:
+        _stats.clear()
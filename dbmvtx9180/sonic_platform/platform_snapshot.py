@@ -0,0 +1,99 @@
+"""
+Module contains the immutable whole-platform snapshot returned by
+Chassis.get_platform_snapshot(). Hardware is read grouped by device: the
+FPGA fan status and thermal banks in one block transaction each, every PSU
+in one batched pass and all transceiver presence in one bitmap scan. The
+getters of the individual objects are then served from those reads.
+
+Timestamps are time.monotonic() values taken when the underlying read was
+issued; unreadable values are None.
+"""
+
+import time
+from collections import namedtuple
+
+from . import fpga
+
+FanState = namedtuple('FanState', ['name', 'presence', 'speed_rpm', 'speed', 'direction', 'status', 'timestamp'])
+ThermalState = namedtuple('ThermalState', ['name', 'temperature', 'high_threshold', 'high_critical_threshold',
+                                           'timestamp'])
+PsuState = namedtuple('PsuState', ['name', 'presence', 'status', 'voltage', 'current', 'power', 'temperature',
+                                   'fans', 'timestamp'])
+PlatformSnapshot = namedtuple('PlatformSnapshot', ['timestamp', 'wall_time', 'fans', 'thermals', 'psus',
+                                                   'sfp_presence', 'sfp_timestamp', 'system_led'])
+
+
+def _safe(func, *args):
+    try:
+        return func(*args)
+    except Exception:
+        return None
+
+
+def _prefetch_bank(bank):
+    """
+    Refresh <bank> in the register cache with one transaction
+    @return the time of the read
+    """
+    timestamp = time.monotonic()
+    try:
+        fpga.read_bank(bank, cached=False)
+    except IOError:
+        # The getters retry and report the failure themselves
+        pass
+    return timestamp
+
+
+def _fan_state(fan, timestamp):
+    return FanState(_safe(fan.get_name), _safe(fan.get_presence), _safe(fan.get_speed_rpm),
+                    _safe(fan.get_speed), _safe(fan.get_direction), _safe(fan.get_status), timestamp)
+
+
+def _thermal_state(thermal, timestamp):
+    return ThermalState(_safe(thermal.get_name), _safe(thermal.get_temperature),
+                        _safe(thermal.get_high_threshold), _safe(thermal.get_high_critical_threshold),
+                        timestamp)
+
+
+def _psu_state(psu):
+    snapshot = _safe(psu.get_snapshot)
+    if snapshot is None:
+        return PsuState(_safe(psu.get_name), _safe(psu.get_presence), None, None, None, None, None, (),
+                        time.monotonic())
+
+    # The getters below, PSU fans included, are served from this snapshot
+    fans = tuple(_fan_state(fan, snapshot.timestamp) for fan in psu.get_all_fans())
+    return PsuState(_safe(psu.get_name), _safe(psu.get_presence), snapshot.status,
+                    _safe(psu.get_voltage), _safe(psu.get_current), _safe(psu.get_power),
+                    _safe(psu.get_temperature), fans, snapshot.timestamp)
+
+
+def take_snapshot(chassis):
+    """
+    Read the state of every fan, thermal, PSU and transceiver of <chassis>
+
+    Returns:
+        A PlatformSnapshot
+    """
+    wall_time = time.time()
+    timestamp = time.monotonic()
+
+    fan_timestamp = _prefetch_bank(fpga.FAN_STATUS_BANK)
+    fans = tuple(_fan_state(fan, fan_timestamp) for fan in chassis.get_all_fans())
+
+    thermal_timestamp = _prefetch_bank(fpga.THERMAL_BANK)
+    _prefetch_bank(fpga.THERMAL_THRESHOLD_BANK)
+    thermals = tuple(_thermal_state(thermal, thermal_timestamp) for thermal in chassis.get_all_thermals())
+
+    psus = tuple(_psu_state(psu) for psu in chassis.get_all_psus())
+
+    sfp_timestamp = time.monotonic()
+    num_ports = chassis.platform_inventory['num_ports']
+    bitmap = _safe(chassis.get_presence_bitmap)
+    if bitmap is None:
+        sfp_presence = (None,) * num_ports
+    else:
+        sfp_presence = tuple(bool(bitmap >> index & 1) for index in range(num_ports))
+
+    return PlatformSnapshot(timestamp, wall_time, fans, thermals, psus, sfp_presence, sfp_timestamp,
+                            _safe(chassis.get_status_led))
@@ -2,19 +2,53 @@
 
 
 try:
+    import time
+    from collections import namedtuple
     from sonic_platform_pddf_base.pddf_psu import PddfPsu
-    from sonic_platform.psu_fru import PsuFru
+    from sonic_platform.psu_fru import get_psu_fru, update_psu_presence
+    from sonic_platform.psu_models import get_model_table, lookup_psu_model
+    from sonic_platform.utils import fread_bulk
+    from sonic_platform import shm_snapshot
 except ImportError as e:
     raise ImportError(str(e) + "- required module not found")
 
+# Getters serve from a snapshot younger than this many seconds
+PSU_SNAPSHOT_MAX_AGE = 1.0
+
+""" PMBus attributes in a snapshot and the divisor to their unit """
+PSU_VOLTAGE_ATTR = ('psu_v_out', 1000.0)
+PSU_CURRENT_ATTR = ('psu_i_out', 1000.0)
+PSU_POWER_ATTR = ('psu_p_out', 1000000.0)
+PSU_TEMPERATURE_ATTR = ('psu_temp1_input', 1000.0)
+PSU_FAN_RPM_ATTR = "psu_fan{}_speed_rpm"
+
+# Readings of one PSU taken in a single pass. timestamp is time.monotonic()
+# at the start of the pass, unreadable values are None and fan_rpm holds
+# the speed of PSU fan 1..n in order.
+PsuSnapshot = namedtuple('PsuSnapshot',
+                         ['timestamp', 'voltage', 'current', 'power', 'temperature', 'fan_rpm', 'status'])
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
 
 class Psu(PddfPsu):
     """PDDF Platform-Specific PSU class"""
 
     def __init__(self, index, pddf_data=None, pddf_plugin_data=None):
         PddfPsu.__init__(self, index, pddf_data, pddf_plugin_data)
-        self.psu_fru = PsuFru(self.psu_index)
-               
+        self._snapshot = None
+        for fan in self._fan_list:
+            fan.attach_psu(self)
+
+    @property
+    def psu_fru(self):
+        return get_psu_fru(self.psu_index)
+
     # Provide the functions/variables below for which implementation is to be overwritten
     def get_presence(self):
         """
@@ -23,7 +57,16 @@ class Psu(PddfPsu):
         Returns:
             bool: True if psu is present, False if not
         """
-        return True
+        output = self.pddf_obj.get_attr_name_output("PSU{}".format(self.psu_index), "psu_present")
+        if output is None:
+            # No presence signal described, the PSU is taken to be fixed
+            presence = True
+        else:
+            presence = output['status'].strip() == '1'
+        # A PSU that went missing and came back may be a different one,
+        # its FRU is then parsed again
+        update_psu_presence(self.psu_index, presence)
+        return presence
 
     def get_powergood_status(self):
         """
@@ -43,6 +86,96 @@ class Psu(PddfPsu):
         """
         return True
 
+    def _read_attrs(self, attrs):
+        """
+        Read PMBus attributes of this PSU together
+        @param attrs list of attribute names
+        @return dict of attribute name to its float value or None
+        """
+        device = "PSU{}".format(self.psu_index)
+        paths = {}
+        values = {}
+        for attr in attrs:
+            path = self.pddf_obj.get_path(device, attr)
+            if path:
+                paths[path] = attr
+            else:
+                # Not a plain sysfs attribute (e.g. BMC backed), read it the PDDF way
+                output = self.pddf_obj.get_attr_name_output(device, attr)
+                values[attr] = _to_float(output['status'] if output else None)
+
+        read, _ = fread_bulk((path, str) for path in paths)
+        for path, attr in paths.items():
+            values[attr] = _to_float(read.get(path))
+        return values
+
+    def get_snapshot(self, max_age=0):
+        """
+        Retrieves voltage, current, power, temperature, fan speeds and status
+        of the PSU, read in one batched pass so that they are coherent
+
+        Args:
+            max_age: seconds for which the previous snapshot may be reused,
+                     0 always reads the hardware
+        Returns:
+            A PsuSnapshot
+        """
+        snapshot = self._snapshot
+        if snapshot is not None and max_age and time.monotonic() - snapshot.timestamp < max_age:
+            return snapshot
+        if max_age:
+            # Published by the snapshot publisher process while fresh
+            shared = shm_snapshot.read_psu(self.psu_index)
+            if shared is not None:
+                return PsuSnapshot(*shared)
+
+        scaled_attrs = (PSU_VOLTAGE_ATTR, PSU_CURRENT_ATTR, PSU_POWER_ATTR, PSU_TEMPERATURE_ATTR)
+        fan_attrs = [PSU_FAN_RPM_ATTR.format(i) for i in range(1, self.num_psu_fans + 1)]
+        timestamp = time.monotonic()
+        values = self._read_attrs([name for name, _ in scaled_attrs] + fan_attrs)
+
+        voltage, current, power, temperature = [
+            values[name] / divisor if values[name] is not None else None
+            for name, divisor in scaled_attrs]
+        fan_rpm = tuple(int(values[attr]) if values[attr] is not None else None for attr in fan_attrs)
+
+        snapshot = PsuSnapshot(timestamp, voltage, current, power, temperature, fan_rpm,
+                               self.get_powergood_status())
+        self._snapshot = snapshot
+        return snapshot
+
+    def get_voltage(self):
+        """
+        Retrieves current PSU voltage output
+
+        Returns:
+            A float number, the output voltage in volts,
+            e.g. 12.1
+        """
+        voltage = self.get_snapshot(PSU_SNAPSHOT_MAX_AGE).voltage
+        return voltage if voltage is not None else 0.0
+
+    def get_current(self):
+        """
+        Retrieves present electric current supplied by PSU
+
+        Returns:
+            A float number, the electric current in amperes, e.g 15.4
+        """
+        current = self.get_snapshot(PSU_SNAPSHOT_MAX_AGE).current
+        return current if current is not None else 0.0
+
+    def get_temperature(self):
+        """
+        Retrieves current temperature reading from PSU
+
+        Returns:
+            A float number of current temperature in Celsius up to nearest thousandth
+            of one degree Celsius, e.g. 30.125
+        """
+        temperature = self.get_snapshot(PSU_SNAPSHOT_MAX_AGE).temperature
+        return temperature if temperature is not None else 0.0
+
     def get_power(self):
         """
         Retrieves current energy supplied by PSU
@@ -51,9 +184,14 @@ class Psu(PddfPsu):
             A float number, the power in watts,
             e.g. 302.6
         """
-
-        # power is returned in micro watts
-        return round(float(self.get_voltage()*self.get_current()), 2)
+        snapshot = self.get_snapshot(PSU_SNAPSHOT_MAX_AGE)
+        power = snapshot.power
+        if power is None:
+            # No output power sensor, derive it from the same sample
+            if snapshot.voltage is None or snapshot.current is None:
+                return 0.0
+            power = snapshot.voltage * snapshot.current
+        return round(float(power), 2)
 
     def get_mfr_id(self):
         """
@@ -89,7 +227,15 @@ class Psu(PddfPsu):
             A float number, the maximum power output in Watts.
             e.g. 1200.1
         """
-        return self.get_maximum_supplied_power()
+        # The support list is authoritative, the FRU power supply record
+        # only stands in for models it does not describe
+        model = lookup_psu_model(self.plugin_data, self.psu_fru)
+        capacity = model.capacity if model is not None else None
+        if capacity is None:
+            capacity = self.psu_fru.capacity
+        if capacity is None:
+            capacity = self.get_maximum_supplied_power()
+        return capacity
 
     def get_type(self):
         """
@@ -98,17 +244,14 @@ class Psu(PddfPsu):
         Returns:
             A string, the type of PSU (AC/DC)
         """
-        mfr = self.get_mfr_id()
-        model = self.get_model()
-        ptype = self.plugin_data['PSU']['valmap']['DEFAULT_TYPE']
-
-        if mfr and model :
-            for dev in self.plugin_data['PSU']['psu_support_list']:
-                if dev['Manufacturer'] == mfr and dev['Name'] == model:
-                    ptype = dev['Type']
-                    break
+        model = lookup_psu_model(self.plugin_data, self.psu_fru)
+        if model is not None and model.type:
+            return model.type
 
+        ptype = self.psu_fru.psu_type
+        if ptype:
+            return ptype
 
-        return ptype
+        return get_model_table(self.plugin_data).default_type
 
 
@@ -1,52 +1,361 @@
 #!/usr/bin/env python
 
+#############################################################################
+#
+# Module contains a parser for the IPMI FRU content of the PSU EEPROMs
+#
+#############################################################################
+
+try:
+    import os
+    from sonic_py_common import logger
+except ImportError as e:
+    raise ImportError(str(e) + "- required module not found")
+
+NOT_AVAILABLE = "not available"
+
+PSU_EEPROM_PATH = "/sys/bus/i2c/devices/2-00{}/eeprom"
+
+FRU_COMMON_HEADER_LEN = 8
+FRU_FORMAT_VERSION = 0x01
+FRU_AREA_UNIT = 8
+FRU_FIELD_END = 0xc1
+FRU_MULTIRECORD_HEADER_LEN = 5
+FRU_MULTIRECORD_EOL = 0x80
+
+""" Multirecord types """
+FRU_RECORD_POWER_SUPPLY = 0x00
+FRU_RECORD_DC_OUTPUT = 0x01
+
+BOARD_AREA_FIELDS = ('manufacturer', 'product_name', 'serial', 'part_number', 'fru_file_id')
+PRODUCT_AREA_FIELDS = ('manufacturer', 'product_name', 'part_number', 'version', 'serial',
+                       'asset_tag', 'fru_file_id')
+
+sonic_logger = logger.Logger()
+
+# PSU index -> (presence generation, {area name: parsed area}); one entry
+# per PSU, dropped when the PSU goes missing or comes back
+_area_memo = {}
+# PSU index -> number of presence changes seen
+_psu_generation = {}
+
+
+class FruError(Exception):
+    """Malformed FRU content"""
+
+
+def _checksum_ok(data):
+    return sum(data) & 0xff == 0
+
+
+def _decode_field(type_length, raw):
+    """
+    Decode a FRU type/length encoded field
+    """
+    encoding = type_length >> 6
+    if encoding == 0x3:
+        return raw.decode('utf-8', errors='replace')
+    if encoding == 0x0:
+        return raw.hex()
+    if encoding == 0x1:
+        # BCD plus
+        digits = "0123456789 -.???"
+        return ''.join(digits[b >> 4] + digits[b & 0xf] for b in raw)
+    # 6-bit packed ASCII, four characters per three bytes
+    bits = int.from_bytes(raw, 'little')
+    return ''.join(chr(((bits >> (6 * i)) & 0x3f) + 0x20) for i in range(len(raw) * 8 // 6))
+
+
+def _parse_fields(area, start, names):
+    """
+    Walk the type/length fields of an info area starting at <start>
+    @return dict of the named fields, plus 'custom' for any extra fields
+    """
+    fields = {'custom': []}
+    i = start
+    index = 0
+    while i < len(area) and area[i] != FRU_FIELD_END:
+        type_length = area[i]
+        length = type_length & 0x3f
+        if i + 1 + length > len(area):
+            raise FruError("field overruns area")
+        value = _decode_field(type_length, area[i + 1:i + 1 + length])
+        if index < len(names):
+            fields[names[index]] = value
+        else:
+            fields['custom'].append(value)
+        i += 1 + length
+        index += 1
+    return fields
+
+
+def _parse_power_supply_record(data):
+    """
+    Decode a Power Supply Information multirecord
+    """
+    if len(data) < 24:
+        raise FruError("short power supply record")
+
+    def word(i, signed=False):
+        return int.from_bytes(data[i:i + 2], 'little', signed=signed)
+
+    high_freq = data[15]
+    return {
+        'capacity': word(0) & 0x0fff,
+        'peak_va': word(2),
+        'inrush_current': data[4],
+        'inrush_interval': data[5],
+        'input_voltage_range1': (word(6, True) / 100.0, word(8, True) / 100.0),
+        'input_voltage_range2': (word(10, True) / 100.0, word(12, True) / 100.0),
+        'input_frequency_range': (data[14], high_freq),
+        'ac_dropout_tolerance': data[16],
+        'hot_swap': bool(data[17] & 0x10),
+        'autoswitch': bool(data[17] & 0x08),
+        'power_factor_correction': bool(data[17] & 0x04),
+        'predictive_fail': bool(data[17] & 0x02),
+        'peak_wattage': word(18) & 0x0fff,
+        # A supply without an input frequency is fed from DC
+        'type': 'AC' if high_freq else 'DC',
+    }
+
+
+def _parse_dc_output_record(data):
+    """
+    Decode a DC Output multirecord
+    """
+    if len(data) < 13:
+        raise FruError("short DC output record")
+
+    def word(i, signed=False):
+        return int.from_bytes(data[i:i + 2], 'little', signed=signed)
+
+    return {
+        'output_number': data[0] & 0x0f,
+        'standby': bool(data[0] & 0x80),
+        'nominal_voltage': word(1, True) / 100.0,
+        'max_negative_deviation': word(3, True) / 100.0,
+        'max_positive_deviation': word(5, True) / 100.0,
+        'ripple_noise': word(7),
+        'min_current': word(9) / 1000.0,
+        'max_current': word(11) / 1000.0,
+    }
+
+
 class PsuFru:
-    """PSU FRU class"""
-    eeprom = ""
-    mfr_id = "not available"
-    model = "not available"
-    serial = "not available"
-        
+    """
+    PSU FRU class. The EEPROM is read lazily, area by area, on first
+    access to a field.
+    """
+
     def __init__(self, psu_index):
         self.psu_index = psu_index
-        self.eeprom = "/sys/bus/i2c/devices/2-00{}/eeprom".format(49 + psu_index)
-        self._parse_fru_eeprom()
+        self.eeprom = PSU_EEPROM_PATH.format(49 + psu_index)
+        self.generation = _psu_generation.get(psu_index, 0)
+        self._header = None
+        self._fd = None
+
+    def _read(self, offset, length):
+        if self._fd is None:
+            self._fd = os.open(self.eeprom, os.O_RDONLY)
+        data = os.pread(self._fd, length, offset)
+        if len(data) != length:
+            raise FruError("short read at offset {}".format(offset))
+        return data
+
+    def _get_header(self):
+        """
+        Retrieves the area offsets from the common header
+
+        Returns:
+            A dict of area name to byte offset, empty if the EEPROM is blank
+            or unreadable
+        """
+        if self._header is not None:
+            return self._header
+
+        self._header = {}
+        try:
+            data = self._read(0, FRU_COMMON_HEADER_LEN)
+            # blank or erased EEPROM
+            if data[0] == 0xff:
+                return self._header
+            if data[0] & 0x0f != FRU_FORMAT_VERSION:
+                raise FruError("unsupported format version {}".format(data[0]))
+            if not _checksum_ok(data):
+                sonic_logger.log_warning("PSU{} FRU: bad common header checksum".format(self.psu_index))
+        except (IOError, OSError, FruError) as e:
+            sonic_logger.log_warning("PSU{} FRU: {}".format(self.psu_index, repr(e)))
+            return self._header
+
+        for name, i in (('board', 3), ('product', 4), ('multirecord', 5)):
+            if data[i]:
+                self._header[name] = data[i] * FRU_AREA_UNIT
+        return self._header
+
+    def _read_info_area(self, name, field_names, fields_start):
+        offset = self._get_header().get(name)
+        if offset is None:
+            return {}
+        length = self._read(offset + 1, 1)[0] * FRU_AREA_UNIT
+        area = self._read(offset, length)
+        if not _checksum_ok(area):
+            sonic_logger.log_warning("PSU{} FRU: bad {} area checksum".format(self.psu_index, name))
+        return _parse_fields(area, fields_start, field_names)
+
+    def _read_multirecord_area(self):
+        offset = self._get_header().get('multirecord')
+        if offset is None:
+            return {}
+        records = {'dc_outputs': []}
+        while True:
+            header = self._read(offset, FRU_MULTIRECORD_HEADER_LEN)
+            if not _checksum_ok(header):
+                raise FruError("bad multirecord header checksum")
+            data = self._read(offset + FRU_MULTIRECORD_HEADER_LEN, header[2])
+            if (sum(data) + header[3]) & 0xff:
+                raise FruError("bad multirecord data checksum")
+            if header[0] == FRU_RECORD_POWER_SUPPLY:
+                records['power_supply'] = data
+            elif header[0] == FRU_RECORD_DC_OUTPUT:
+                records['dc_outputs'].append(data)
+            if header[1] & FRU_MULTIRECORD_EOL:
+                break
+            offset += FRU_MULTIRECORD_HEADER_LEN + header[2]
+
+        parsed = {'dc_outputs': [_parse_dc_output_record(d) for d in records['dc_outputs']]}
+        if 'power_supply' in records:
+            parsed['power_supply'] = _parse_power_supply_record(records['power_supply'])
+        return parsed
 
-    def _parse_fru_eeprom(self):
+    def _memoized_areas(self):
         """
-        Parsing eeprom fru content of PSU
+        Retrieves the parsed areas of the PSU as it is present now, shared
+        by every PsuFru of the same presence generation
         """
+        entry = _area_memo.get(self.psu_index)
+        if entry is None or entry[0] != self.generation:
+            if self.generation != _psu_generation.get(self.psu_index, 0):
+                # This PSU is gone, do not let it replace the current entry
+                return {}
+            entry = _area_memo[self.psu_index] = (self.generation, {})
+        return entry[1]
+
+    def _get_area(self, name):
+        areas = self._memoized_areas()
+        area = areas.get(name)
+        if area is not None:
+            return area
         try:
-            with open(self.eeprom, 'rb') as eeprom:
-                data = eeprom.read()
-                 
-                # check if dummy content
-                if data[0] == 0xff:
-                    return
-                     
-                i = 11
-
-                data_len = (data[i]&0x3f)
-                i += 1
-                self.mfr_id = data[i:i+data_len].decode('utf-8')
-                i += data_len
-
-                data_len = (data[i]&0x3f)
-                i += 1
-                i += data_len
-
-                data_len = (data[i]&0x3f)
-                i += 1
-                self.model = data[i:i+data_len].decode('utf-8')
-                i += data_len
-
-                data_len = (data[i]&0x3f)
-                i += 1
-                i += data_len
-
-                data_len = (data[i]&0x3f)
-                i += 1
-                self.serial = data[i:i+data_len].decode('utf-8')
-        except Exception as e:
-            return
+            if name == 'board':
+                # version, length, language and 3 bytes of manufacturing date
+                area = self._read_info_area(name, BOARD_AREA_FIELDS, 6)
+            elif name == 'product':
+                # version, length, language
+                area = self._read_info_area(name, PRODUCT_AREA_FIELDS, 3)
+            else:
+                area = self._read_multirecord_area()
+        except (IOError, OSError, FruError) as e:
+            sonic_logger.log_warning("PSU{} FRU {} area: {}".format(self.psu_index, name, repr(e)))
+            area = {}
+        finally:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+        areas[name] = area
+        return area
+
+    @property
+    def mfr_id(self):
+        return self._get_area('product').get('manufacturer', NOT_AVAILABLE)
+
+    @property
+    def model(self):
+        return self._get_area('product').get('part_number', NOT_AVAILABLE)
+
+    @property
+    def serial(self):
+        return self._get_area('product').get('serial', NOT_AVAILABLE)
+
+    @property
+    def product_name(self):
+        return self._get_area('product').get('product_name', NOT_AVAILABLE)
+
+    @property
+    def revision(self):
+        return self._get_area('product').get('version', NOT_AVAILABLE)
+
+    @property
+    def board_info(self):
+        """
+        Retrieves the decoded board info area, empty if there is none
+        """
+        return self._get_area('board')
+
+    @property
+    def power_supply_info(self):
+        """
+        Retrieves the decoded Power Supply Information multirecord, or None
+        """
+        return self._get_area('multirecord').get('power_supply')
+
+    @property
+    def dc_outputs(self):
+        """
+        Retrieves the decoded DC Output multirecords
+        """
+        return self._get_area('multirecord').get('dc_outputs', [])
+
+    @property
+    def capacity(self):
+        """
+        Retrieves the rated output in watts from the multirecord area, or None
+        """
+        info = self.power_supply_info
+        if not info or not info['capacity']:
+            return None
+        return float(info['capacity'])
+
+    @property
+    def psu_type(self):
+        """
+        Retrieves 'AC' or 'DC' from the multirecord area, or None
+        """
+        info = self.power_supply_info
+        return info['type'] if info else None
+
+
+# One PsuFru per PSU index, shared by the Psu and its PSU fan objects
+_psu_fru_registry = {}
+_psu_presence = {}
+
+
+def get_psu_fru(psu_index):
+    """
+    Retrieves the shared PsuFru of PSU <psu_index>, parsing the EEPROM
+    only the first time it is requested
+    """
+    psu_fru = _psu_fru_registry.get(psu_index)
+    if psu_fru is None:
+        psu_fru = PsuFru(psu_index)
+        _psu_fru_registry[psu_index] = psu_fru
+    return psu_fru
+
+
+def update_psu_presence(psu_index, presence):
+    """
+    Record the presence of PSU <psu_index>. A change of presence means the
+    PSU may have been swapped, so its FRU data is parsed again on next use.
+    """
+    if _psu_presence.get(psu_index, presence) != presence:
+        _psu_generation[psu_index] = _psu_generation.get(psu_index, 0) + 1
+        _psu_fru_registry.pop(psu_index, None)
+        _area_memo.pop(psu_index, None)
+    _psu_presence[psu_index] = presence
+
 
+def invalidate_psu_fru_cache():
+    """
+    Forget every parsed FRU, e.g. after the EEPROM paths changed
+    """
+    _psu_fru_registry.clear()
+    _area_memo.clear()
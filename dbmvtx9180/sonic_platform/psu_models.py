@@ -0,0 +1,104 @@
+"""
+Module contains the table of supported PSU models, compiled once from the
+'psu_support_list' of the PDDF plugin data and shared by every Psu and PSU
+fan object of the process
+"""
+
+import threading
+from collections import namedtuple
+
+# Descriptor of a supported PSU model. max_speed is the PSU fan speed in
+# RPM; capacity is in watts, or None when the plugin data does not give it.
+PsuModel = namedtuple('PsuModel', ['manufacturer', 'name', 'type', 'direction', 'max_speed', 'capacity'])
+
+_table = None
+_table_source = None
+_table_lock = threading.Lock()
+
+
+class PsuModelError(Exception):
+    """Invalid PSU section of the plugin data"""
+
+
+def normalize_key(manufacturer, name):
+    """
+    Build the lookup key of a (manufacturer, name) pair. FRU fields are
+    space padded, so surrounding whitespace is not significant.
+    """
+    return ((manufacturer or '').strip(), (name or '').strip())
+
+
+class PsuModelTable(object):
+    """
+    Index of the PSU support list by normalized (manufacturer, name)
+    """
+
+    def __init__(self, psu_plugin_data):
+        """
+        @param psu_plugin_data the 'PSU' section of the PDDF plugin data
+        @raise PsuModelError if a PSU fan max speed is missing
+        """
+        valmap = psu_plugin_data.get('valmap', {})
+        self.default_type = valmap.get('DEFAULT_TYPE')
+        # Every PSU fan needs a max speed to report its speed as a percentage
+        self.default_max_speed = self._max_speed(valmap, 'PSU_FAN_MAX_SPEED')
+        self._models = {}
+        for dev in psu_plugin_data.get('psu_support_list', []):
+            key = normalize_key(dev.get('Manufacturer'), dev.get('Name'))
+            if key in self._models:
+                # The first entry wins, as with the linear scan
+                continue
+            max_speed = self.default_max_speed
+            if dev.get('MaxSpd') is not None:
+                max_speed = self._max_speed(valmap, dev['MaxSpd'])
+            capacity = dev.get('Capacity')
+            self._models[key] = PsuModel(key[0], key[1], dev.get('Type'), dev.get('Dir'), max_speed,
+                                         float(capacity) if capacity is not None else None)
+
+    @staticmethod
+    def _max_speed(valmap, name):
+        try:
+            return int(valmap[name])
+        except KeyError:
+            raise PsuModelError("PSU plugin data: valmap has no fan max speed '{}'".format(name))
+        except (TypeError, ValueError):
+            raise PsuModelError("PSU plugin data: fan max speed '{}' is not an integer: {}".format(
+                name, valmap[name]))
+
+    def __len__(self):
+        return len(self._models)
+
+    def lookup(self, manufacturer, name):
+        """
+        Retrieves the descriptor of a PSU model
+
+        Returns:
+            A PsuModel, or None if the model is not in the support list
+        """
+        return self._models.get(normalize_key(manufacturer, name))
+
+
+def get_model_table(plugin_data):
+    """
+    Retrieves the PSU model table of <plugin_data>, compiling it on first use
+    """
+    global _table, _table_source
+    psu_plugin_data = plugin_data['PSU']
+    table = _table
+    if table is None or _table_source is not psu_plugin_data:
+        with _table_lock:
+            if _table is None or _table_source is not psu_plugin_data:
+                _table = PsuModelTable(psu_plugin_data)
+                _table_source = psu_plugin_data
+            table = _table
+    return table
+
+
+def lookup_psu_model(plugin_data, fru):
+    """
+    Retrieves the descriptor of the PSU model described by <fru>
+
+    Returns:
+        A PsuModel, or None if the PSU is unknown or absent
+    """
+    return get_model_table(plugin_data).lookup(fru.mfr_id, fru.model)
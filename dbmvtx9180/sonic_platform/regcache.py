@@ -0,0 +1,107 @@
+"""
+Module contains a process-wide, time-bounded cache of device register
+values shared by every platform object in the process
+"""
+
+import os
+import time
+import weakref
+import threading
+
+""" Default freshness window of a cached register value, in seconds """
+DEFAULT_TTL = 1.0
+
+# Every RegisterCache, so that a forked child can release their locks
+_caches = weakref.WeakSet()
+
+
+def _after_fork_in_child():
+    for cache in list(_caches):
+        cache._lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+class RegisterCache(object):
+    """
+    Cache of register reads keyed by (start register, length). Every
+    register has a freshness window (TTL); a cached read of several
+    registers expires with the shortest TTL among them.
+    """
+
+    def __init__(self, default_ttl=DEFAULT_TTL):
+        self.default_ttl = default_ttl
+        self._ttl = {}
+        self._entries = {}
+        self._lock = threading.Lock()
+        _caches.add(self)
+        self.hits = 0
+        self.misses = 0
+
+    def set_ttl(self, reg, ttl):
+        """
+        Set the freshness window of register <reg>, in seconds.
+        A ttl of 0 disables caching for that register.
+        """
+        with self._lock:
+            self._ttl[reg] = ttl
+            self._entries.clear()
+
+    def get_ttl(self, reg, length=1):
+        """
+        Retrieves the freshness window of registers <reg>..<reg+length-1>
+        """
+        if not self._ttl:
+            return self.default_ttl
+        return min(self._ttl.get(r, self.default_ttl) for r in range(reg, reg + length))
+
+    def lookup(self, reg, length=1):
+        """
+        Retrieves the cached value of a read, or None if absent or stale
+        """
+        with self._lock:
+            entry = self._entries.get((reg, length))
+            if entry is not None and entry[0] > time.monotonic():
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            return None
+
+    def store(self, reg, length, value):
+        """
+        Record the result of a read of <length> registers at <reg>
+        """
+        ttl = self.get_ttl(reg, length)
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._entries[(reg, length)] = (time.monotonic() + ttl, value)
+
+    def invalidate(self, reg=None, length=1):
+        """
+        Drop cached reads overlapping registers <reg>..<reg+length-1>, or
+        every entry if reg is None
+        """
+        with self._lock:
+            if reg is None:
+                self._entries.clear()
+                return
+            for key in [k for k in self._entries if k[0] < reg + length and reg < k[0] + k[1]]:
+                del self._entries[key]
+
+    def get_stats(self):
+        """
+        Retrieves cache counters
+
+        Returns:
+            A dict with 'hits', 'misses' and 'entries'
+        """
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses,
+                    'entries': len(self._entries)}
+
+    def reset_stats(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
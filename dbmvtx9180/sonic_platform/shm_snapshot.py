@@ -0,0 +1,411 @@
+"""
+Module contains the cross-process sensor snapshot. One process (the
+publisher) reads the FPGA fan status, thermal and threshold register
+banks and every PSU at a fixed cadence and publishes them in a memory
+mapped file under /dev/shm. Every other process serves the Fan, Thermal
+and Psu getters from that file while it is fresh, and falls back to the
+hardware otherwise, so bus traffic does not grow with the number of pmon
+daemons.
+
+Layout, little-endian:
+
+    header   magic "SPSN", version u16, PSU count u16, sequence u32,
+             payload crc32 u32, pad u32, timestamp f64 (CLOCK_MONOTONIC),
+             max age f64 (seconds the payload may be served for)
+    banks    per PUBLISHED_BANKS entry: valid u8 + BANK_SLOT_SIZE - 1 bytes
+    psus     MAX_PSUS records: valid u8, status u8, pad 6 bytes, voltage,
+             current, power, temperature f64 (NaN if unknown),
+             MAX_PSU_FANS x fan rpm i32 (-1 if unknown)
+
+The sequence number is a seqlock: odd while the publisher writes. A reader
+copies the payload and accepts it only if the sequence is even, unchanged
+afterwards and the crc matches.
+
+The file is created exclusively with mode 0644. A reader only maps it if
+it is a regular file owned by root that neither group nor others can
+write, and reads the hardware otherwise.
+"""
+
+import os
+import mmap
+import stat
+import errno
+import math
+import time
+import zlib
+import fcntl
+import struct
+import threading
+
+from . import fpga
+
+SNAPSHOT_PATH = "/dev/shm/sonic-platform-snapshot"
+SNAPSHOT_MODE = 0o644
+# Readers only trust a snapshot file owned by this uid
+SNAPSHOT_OWNER_UID = 0
+
+""" Seconds between two publications """
+DEFAULT_PUBLISH_INTERVAL = 1.0
+# A snapshot is served for this many publish intervals, covering a late publisher
+MAX_AGE_INTERVALS = 2
+# Readers look for a missing snapshot file at most this often
+REOPEN_INTERVAL = 5.0
+READ_RETRIES = 4
+
+SNAPSHOT_MAGIC = b'SPSN'
+SNAPSHOT_VERSION = 3
+
+PUBLISHED_BANKS = (fpga.FAN_STATUS_BANK, fpga.THERMAL_BANK, fpga.THERMAL_THRESHOLD_BANK)
+BANK_SLOT_SIZE = 48
+MAX_PSUS = 4
+MAX_PSU_FANS = 2
+
+_HEADER = struct.Struct('<4sHHIIIdd')
+_SEQ_OFFSET = 8
+_PSU_RECORD = struct.Struct('<BBHxxxxdddd' + 'i' * MAX_PSU_FANS)
+_BANKS_OFFSET = _HEADER.size
+_PSUS_OFFSET = _BANKS_OFFSET + BANK_SLOT_SIZE * len(PUBLISHED_BANKS)
+SNAPSHOT_SIZE = _PSUS_OFFSET + _PSU_RECORD.size * MAX_PSUS
+
+
+def _pack_float(value):
+    return float('nan') if value is None else value
+
+
+def _unpack_float(value):
+    return None if math.isnan(value) else value
+
+
+def _is_trusted(st, uid):
+    # Nobody but the owner can have written the contents
+    return stat.S_ISREG(st.st_mode) and st.st_uid == uid and not st.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+
+
+class SnapshotPublisher(object):
+    """
+    Thread publishing the sensors of a Chassis. Only one publisher can hold
+    the snapshot file at a time.
+    """
+
+    def __init__(self, chassis, interval=DEFAULT_PUBLISH_INTERVAL, path=None):
+        self.interval = interval
+        self.path = path or SNAPSHOT_PATH
+        self._psus = list(chassis.get_all_psus())[:MAX_PSUS]
+        self._fd = None
+        self._mm = None
+        self._seq = 0
+        self._stop_event = threading.Event()
+        self._thread = None
+        self.publications = 0
+
+    def open(self):
+        """
+        Create or take over the snapshot file
+        @return False if another publisher holds it
+        """
+        if self._mm is not None:
+            return True
+        fd = self._open_file()
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except (IOError, OSError):
+            os.close(fd)
+            return False
+        # Resized in place, never unlinked, so readers keep a valid mapping
+        os.ftruncate(fd, SNAPSHOT_SIZE)
+        # Creation mode was narrowed by the umask
+        os.fchmod(fd, SNAPSHOT_MODE)
+        self._fd = fd
+        self._mm = mmap.mmap(fd, SNAPSHOT_SIZE)
+        self._seq = _HEADER.unpack_from(self._mm)[3] & ~1
+        return True
+
+    def _open_file(self):
+        """
+        Open the snapshot file, creating it exclusively if missing. A file
+        this process did not create for itself, e.g. planted by another
+        user or writable by others, is unlinked and created afresh.
+        @return file descriptor opened for reading and writing
+        """
+        flags = os.O_RDWR | os.O_NOFOLLOW
+        # Retried when another process removes or replaces the file meanwhile
+        for _ in range(3):
+            try:
+                return os.open(self.path, flags | os.O_CREAT | os.O_EXCL, SNAPSHOT_MODE)
+            except OSError as e:
+                if e.errno != errno.EEXIST:
+                    raise
+            try:
+                fd = os.open(self.path, flags)
+            except OSError as e:
+                if e.errno == errno.ENOENT:
+                    continue
+                # ELOOP for a symlink in place of the file
+                if e.errno != errno.ELOOP:
+                    raise
+            else:
+                if _is_trusted(os.fstat(fd), os.geteuid()):
+                    return fd
+                os.close(fd)
+            try:
+                os.unlink(self.path)
+            except OSError as e:
+                if e.errno != errno.ENOENT:
+                    raise
+        raise OSError(errno.EEXIST, "Cannot create {}".format(self.path))
+
+    def close(self):
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        if self._fd is not None:
+            # Also releases the writer lock
+            os.close(self._fd)
+            self._fd = None
+
+    def start(self):
+        """
+        Start publishing in the background
+        @return False if another publisher is active
+        """
+        if self._thread is not None:
+            return True
+        if not self.open():
+            return False
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="snapshot-publisher")
+        self._thread.daemon = True
+        self._thread.start()
+        return True
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop_event.set()
+            self._thread.join()
+            self._thread = None
+        self.close()
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def _read_payload(self):
+        payload = bytearray(SNAPSHOT_SIZE - _BANKS_OFFSET)
+        for i, bank in enumerate(PUBLISHED_BANKS):
+            try:
+                data = fpga.read_bank(bank, cached=False)
+            except IOError:
+                continue
+            offset = i * BANK_SLOT_SIZE
+            payload[offset] = 1
+            payload[offset + 1:offset + 1 + bank.length] = data
+
+        for i, psu in enumerate(self._psus):
+            try:
+                snapshot = psu.get_snapshot()
+            except Exception:
+                continue
+            fans = [rpm if rpm is not None else -1 for rpm in snapshot.fan_rpm[:MAX_PSU_FANS]]
+            fans += [-1] * (MAX_PSU_FANS - len(fans))
+            _PSU_RECORD.pack_into(payload, _PSUS_OFFSET - _BANKS_OFFSET + i * _PSU_RECORD.size,
+                                  1, 1 if snapshot.status else 0, 0,
+                                  _pack_float(snapshot.voltage), _pack_float(snapshot.current),
+                                  _pack_float(snapshot.power), _pack_float(snapshot.temperature), *fans)
+        return bytes(payload)
+
+    def publish(self):
+        """
+        Read the hardware once and publish the result
+        """
+        timestamp = time.monotonic()
+        payload = self._read_payload()
+        mm = self._mm
+        self._seq += 1
+        struct.pack_into('<I', mm, _SEQ_OFFSET, self._seq)
+        mm[_BANKS_OFFSET:] = payload
+        self._seq += 1
+        _HEADER.pack_into(mm, 0, SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(self._psus), self._seq,
+                          zlib.crc32(payload), 0, timestamp, self.interval * MAX_AGE_INTERVALS)
+        self.publications += 1
+
+    def _run(self):
+        deadline = time.monotonic()
+        while not self._stop_event.is_set():
+            try:
+                self.publish()
+            except Exception:
+                # A failed sweep only leaves the snapshot to go stale
+                pass
+            deadline += self.interval
+            self._stop_event.wait(max(0, deadline - time.monotonic()))
+
+
+class SnapshotReader(object):
+    """
+    Read side of the snapshot file. Decoded contents are kept until the
+    publisher bumps the sequence number.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or SNAPSHOT_PATH
+        self._mm = None
+        self._next_open = 0.0
+        self._seq = None
+        self._header = None
+        self._payload = None
+
+    def close(self):
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        self._seq = None
+
+    def _map(self):
+        if self._mm is not None:
+            return self._mm
+        now = time.monotonic()
+        if now < self._next_open:
+            return None
+        self._next_open = now + REOPEN_INTERVAL
+        try:
+            fd = os.open(self.path, os.O_RDONLY | os.O_NOFOLLOW)
+        except OSError:
+            return None
+        try:
+            st = os.fstat(fd)
+            if st.st_size < SNAPSHOT_SIZE or not _is_trusted(st, SNAPSHOT_OWNER_UID):
+                return None
+            self._mm = mmap.mmap(fd, SNAPSHOT_SIZE, access=mmap.ACCESS_READ)
+        finally:
+            os.close(fd)
+        return self._mm
+
+    def _load(self):
+        """
+        @return (header, payload) of a consistent, fresh snapshot or None
+        """
+        mm = self._map()
+        if mm is None:
+            return None
+
+        for _ in range(READ_RETRIES):
+            seq = struct.unpack_from('<I', mm, _SEQ_OFFSET)[0]
+            if seq & 1:
+                continue
+            if seq != self._seq:
+                header = _HEADER.unpack_from(mm)
+                payload = mm[_BANKS_OFFSET:SNAPSHOT_SIZE]
+                if struct.unpack_from('<I', mm, _SEQ_OFFSET)[0] != seq:
+                    continue
+                if header[0] != SNAPSHOT_MAGIC or header[1] != SNAPSHOT_VERSION or \
+                        zlib.crc32(payload) != header[4]:
+                    continue
+                self._seq, self._header, self._payload = seq, header, payload
+            break
+        else:
+            return None
+
+        if self._seq is None or time.monotonic() - self._header[6] > self._header[7]:
+            return None
+        return self._header, self._payload
+
+    def read_bank(self, bank):
+        """
+        Retrieves the published contents of an FPGA bank, or of a bank
+        that lies within a published one
+
+        Returns:
+            bytes of bank.length, or None if not published or stale
+        """
+        for i, published in enumerate(PUBLISHED_BANKS):
+            if bank.base in published and bank.base + bank.length <= published.base + published.length:
+                break
+        else:
+            return None
+        loaded = self._load()
+        if loaded is None:
+            return None
+        offset = i * BANK_SLOT_SIZE
+        payload = loaded[1]
+        if not payload[offset]:
+            return None
+        start = offset + 1 + published.offset(bank.base)
+        return payload[start:start + bank.length]
+
+    def read_psu(self, psu_index):
+        """
+        Retrieves the published readings of PSU <psu_index> (1-based)
+
+        Returns:
+            A tuple (timestamp, voltage, current, power, temperature,
+            fan_rpm, status) as in PsuSnapshot, or None if not published or
+            stale
+        """
+        loaded = self._load()
+        if loaded is None:
+            return None
+        header, payload = loaded
+        if not 0 < psu_index <= min(header[2], MAX_PSUS):
+            return None
+        record = _PSU_RECORD.unpack_from(payload, _PSUS_OFFSET - _BANKS_OFFSET +
+                                         (psu_index - 1) * _PSU_RECORD.size)
+        if not record[0]:
+            return None
+        fans = tuple(rpm if rpm >= 0 else None for rpm in record[7:])
+        return (header[6], _unpack_float(record[3]), _unpack_float(record[4]),
+                _unpack_float(record[5]), _unpack_float(record[6]), fans, bool(record[1]))
+
+
+_reader = None
+
+
+def attach_reader(path=None):
+    """
+    Serve FPGA bank reads and PSU snapshots of this process from the
+    published snapshot whenever it is fresh
+    """
+    global _reader
+    if _reader is None:
+        _reader = SnapshotReader(path)
+        fpga.bank_source = _reader.read_bank
+    return _reader
+
+
+def detach_reader():
+    global _reader
+    if _reader is not None:
+        fpga.bank_source = None
+        _reader.close()
+        _reader = None
+
+
+def read_psu(psu_index):
+    """
+    Retrieves the published readings of a PSU if a reader is attached,
+    see SnapshotReader.read_psu()
+    """
+    reader = _reader
+    return reader.read_psu(psu_index) if reader is not None else None
+
+
+def main():
+    """
+    Run the publisher for the platform chassis until interrupted
+    """
+    from sonic_platform.platform import Platform
+    chassis = Platform().get_chassis()
+    publisher = SnapshotPublisher(chassis)
+    if not publisher.start():
+        print("Another snapshot publisher is already running")
+        return 1
+    try:
+        while publisher.is_running():
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    publisher.stop()
+    return 0
+
+
+if __name__ == '__main__':
+    import sys
+    sys.exit(main())
@@ -3,12 +3,11 @@
 
 try:
     from sonic_platform_pddf_base.pddf_thermal import PddfThermal
-    from sonic_py_common.general import getstatusoutput_noshell, getstatusoutput_noshell_pipe
+    from sonic_platform import fpga
 except ImportError as e:
     raise ImportError(str(e) + "- required module not found")
 
-FPGA_I2C_BUS_NUM=1
-FPGA_DEV_ADDR=0x32
+FPGA_TEMP_HIGH_THRESHOLD_REG=0x50
 
 temp_sensor_reg_offset_map={'temp1_input': 0x40,
                             'temp2_input': 0x41,
@@ -23,8 +22,16 @@ class Thermal(PddfThermal):
 
     def __init__(self, index, pddf_data=None, pddf_plugin_data=None, is_psu_thermal=False, psu_index=0):
         PddfThermal.__init__(self, index, pddf_data, pddf_plugin_data, is_psu_thermal, psu_index)
-        self.minimum_thermal = self.get_temperature()
-        self.maximum_thermal = self.get_temperature()
+        # Seeded by the first get_minimum_recorded()/get_maximum_recorded()
+        self.minimum_thermal = None
+        self.maximum_thermal = None
+        self._stats = None
+
+    def set_stats(self, stats):
+        """
+        Attach the ThermalStats kept by a ThermalSampler, or None to detach
+        """
+        self._stats = stats
 
     def get_presence(self):
         """
@@ -72,15 +79,31 @@ class Thermal(PddfThermal):
             A float, temperature value in celcius
         """
 
-        cmdstatus, temperature = getstatusoutput_noshell(['i2cget', '-f', '-y', str(FPGA_I2C_BUS_NUM), str(FPGA_DEV_ADDR), str(reg_offset)])
-        if cmdstatus != 0:
+        try:
+            bank = fpga.read_bank(fpga.THERMAL_BANK)
+        except IOError:
             print("Error reading reg {}".format(hex(reg_offset)))
             return 0
 
-        temperature_float = float(int(temperature, 16))
+        temperature_float = float(bank[fpga.THERMAL_BANK.offset(reg_offset)])
 
         return temperature_float
 
+    def get_threshold_from_fpga(self, reg_offset):
+        """
+        Retrieves a temperature threshold by fpga read
+
+        Returns:
+            An integer, threshold value in celcius
+        """
+        try:
+            bank = fpga.read_bank(fpga.THERMAL_THRESHOLD_BANK)
+        except IOError:
+            print("Error reading reg {}".format(hex(reg_offset)))
+            return 0
+
+        return bank[fpga.THERMAL_THRESHOLD_BANK.offset(reg_offset)]
+
     def get_temperature(self):
         '''
         Read temperature value from FPGA
@@ -119,12 +142,7 @@ class Thermal(PddfThermal):
         if self.is_psu_thermal:
             return notimplementederror
         else:
-            cmdstatus, temperature = getstatusoutput_noshell(['i2cget', '-f', '-y', str(FPGA_I2C_BUS_NUM), str(FPGA_DEV_ADDR), str(0x50)])
-            if cmdstatus != 0:
-                print("Error reading reg {}".format(hex(reg_offset)))
-                return 0
-
-            return int(temperature, 16)
+            return self.get_threshold_from_fpga(FPGA_TEMP_HIGH_THRESHOLD_REG)
 
 
     def get_high_critical_threshold(self):
@@ -137,12 +155,7 @@ class Thermal(PddfThermal):
         if self.is_psu_thermal:
             return notimplementederror
         else:
-            cmdstatus, temperature = getstatusoutput_noshell(['i2cget', '-f', '-y', str(FPGA_I2C_BUS_NUM), str(FPGA_DEV_ADDR), str(0x50)])
-            if cmdstatus != 0:
-                print("Error reading reg {}".format(hex(reg_offset)))
-                return 0
-
-            return int(temperature, 16)
+            return self.get_threshold_from_fpga(FPGA_TEMP_HIGH_THRESHOLD_REG)
 
     def get_low_critical_threshold(self):
         """
@@ -188,8 +201,13 @@ class Thermal(PddfThermal):
             A float number, the minimum recorded temperature of thermal in Celsius
             up to nearest thousandth of one degree Celsius, e.g. 30.125
         """
+        if self._stats is not None and self._stats.count:
+            return self._stats.minimum
+
         tmp = self.get_temperature()
-        if tmp < self.minimum_thermal:
+        if tmp is None:
+            return self.minimum_thermal
+        if self.minimum_thermal is None or tmp < self.minimum_thermal:
             self.minimum_thermal = tmp
         return self.minimum_thermal
 
@@ -200,8 +218,13 @@ class Thermal(PddfThermal):
             A float number, the maximum recorded temperature of thermal in Celsius
             up to nearest thousandth of one degree Celsius, e.g. 30.125
         """
+        if self._stats is not None and self._stats.count:
+            return self._stats.maximum
+
         tmp = self.get_temperature()
-        if tmp > self.maximum_thermal:
+        if tmp is None:
+            return self.maximum_thermal
+        if self.maximum_thermal is None or tmp > self.maximum_thermal:
             self.maximum_thermal = tmp
         return self.maximum_thermal
 
@@ -0,0 +1,149 @@
+"""
+Module contains an opt-in background sampler that reads every Thermal at
+a fixed cadence and keeps rolling statistics per sensor
+"""
+
+import time
+import array
+import threading
+
+from sonic_py_common import logger
+
+""" Seconds between two sweeps of all sensors """
+DEFAULT_SAMPLE_INTERVAL = 5
+""" Number of samples kept per sensor """
+DEFAULT_SAMPLE_WINDOW = 120
+
+sonic_logger = logger.Logger()
+
+
+class ThermalStats(object):
+    """
+    Rolling statistics of one sensor. Samples are kept in a fixed size
+    ring buffer; all-time min/max and the window sum are updated on every
+    sample so the accessors never touch hardware.
+    """
+
+    def __init__(self, window=DEFAULT_SAMPLE_WINDOW):
+        self._ring = array.array('d', [0.0] * window)
+        self._next = 0
+        self._sum = 0.0
+        self._lock = threading.Lock()
+        self.count = 0
+        self.minimum = None
+        self.maximum = None
+        self.last = None
+        self.timestamp = None
+
+    def add(self, value):
+        """
+        Record a new temperature sample
+        """
+        with self._lock:
+            if self.count == len(self._ring):
+                self._sum -= self._ring[self._next]
+            else:
+                self.count += 1
+            self._ring[self._next] = value
+            self._next = (self._next + 1) % len(self._ring)
+            self._sum += value
+
+            if self.minimum is None or value < self.minimum:
+                self.minimum = value
+            if self.maximum is None or value > self.maximum:
+                self.maximum = value
+            self.last = value
+            self.timestamp = time.time()
+
+    def get_window_stats(self):
+        """
+        Retrieves statistics over the samples currently in the window
+
+        Returns:
+            A dict with 'min', 'max', 'mean', 'last', 'count' and 'timestamp',
+            or None if no sample has been taken yet
+        """
+        with self._lock:
+            if not self.count:
+                return None
+            samples = self._ring[:self.count]
+            return {
+                'min': min(samples),
+                'max': max(samples),
+                'mean': self._sum / self.count,
+                'last': self.last,
+                'count': self.count,
+                'timestamp': self.timestamp,
+            }
+
+
+class ThermalSampler(object):
+    """
+    Thread that samples a list of Thermal objects and attaches a
+    ThermalStats to each of them
+    """
+
+    def __init__(self, thermals, interval=DEFAULT_SAMPLE_INTERVAL, window=DEFAULT_SAMPLE_WINDOW):
+        self.interval = interval
+        self._thermals = list(thermals)
+        self._stats = []
+        for thermal in self._thermals:
+            stats = ThermalStats(window)
+            thermal.set_stats(stats)
+            self._stats.append(stats)
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="thermal-sampler")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stop sampling and detach the statistics from the sensors
+        """
+        if self._thread is not None:
+            self._stop_event.set()
+            self._thread.join()
+            self._thread = None
+        for thermal in self._thermals:
+            thermal.set_stats(None)
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def sample(self):
+        """
+        Read every sensor once and record the results
+        """
+        for thermal, stats in zip(self._thermals, self._stats):
+            try:
+                value = thermal.get_temperature()
+            except Exception as e:
+                sonic_logger.log_warning("Failed to sample {} - {}".format(thermal.get_name(), repr(e)))
+                continue
+            if value is not None:
+                stats.add(value)
+
+    def _run(self):
+        deadline = time.monotonic()
+        while not self._stop_event.is_set():
+            self.sample()
+            # Keep a fixed cadence regardless of how long the sweep took
+            deadline += self.interval
+            self._stop_event.wait(max(0, deadline - time.monotonic()))
+
+    def get_statistics(self):
+        """
+        Retrieves the windowed statistics of every sampled sensor
+
+        Returns:
+            A dict of sensor name to the dict returned by
+            ThermalStats.get_window_stats()
+        """
+        return dict((thermal.get_name(), stats.get_window_stats())
+                    for thermal, stats in zip(self._thermals, self._stats))
@@ -2,16 +2,48 @@
 Basic utility funtions
 """
 
-from sonic_py_common import device_info
-from sonic_py_common.logger import Logger
+import os
+import time
+import errno
+import threading
 
-logger = Logger()
+from . import instrumentation
 
+# Created on first use, see _log_error()
+logger = None
 
-def fread(file_path, target_type, default='', raise_exception=False, log_func=logger.log_error):
+""" Threads used by fread_bulk() to overlap slow attribute reads """
+BULK_READ_WORKERS = 8
+
+_bulk_executor = None
+_bulk_executor_lock = threading.Lock()
+
+
+def _after_fork_in_child():
+    # The workers of the parent do not exist in the child, work queued to
+    # the inherited pool would never run
+    global _bulk_executor, _bulk_executor_lock
+    _bulk_executor = None
+    _bulk_executor_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+def _log_error(msg):
+    global logger
+    if logger is None:
+        from sonic_py_common.logger import Logger
+        logger = Logger()
+    logger.log_error(msg)
+
+
+def fread(file_path, target_type, default='', raise_exception=False, log_func=_log_error):
     """
     Read content from file and convert to target type
     """
+    start = time.perf_counter() if instrumentation.is_enabled() else None
+    error = False
     try:
         with open(file_path, 'r') as f:
             value = f.read()
@@ -20,25 +52,159 @@ def fread(file_path, target_type, default='', raise_exception=False, log_func=lo
             else:
                 value = target_type(value.strip())
     except (ValueError, IOError) as e:
+        error = True
         if log_func:
             log_func('Failed to read from file {} - {}'.format(file_path, repr(e)))
         if not raise_exception:
             value = default
         else:
             raise e
+    finally:
+        if start is not None:
+            instrumentation.record(instrumentation.KIND_SYSFS, file_path, time.perf_counter() - start, error)
 
     return value
 
 
-def fread_str(file_path, default='', raise_exception=False, log_func=logger.log_error):
+def fread_str(file_path, default='', raise_exception=False, log_func=_log_error):
     """
     Read string content from file
     """
     return fread(file_path=file_path, target_type=str, default=default, raise_exception=raise_exception, log_func=log_func)
 
 
-def fread_int(file_path, default=0, raise_exception=False, log_func=logger.log_error):
+def fread_int(file_path, default=0, raise_exception=False, log_func=_log_error):
     """
     Read content from file and cast it to integer
     """
     return fread(file_path=file_path, target_type=int, default=default, raise_exception=raise_exception, log_func=log_func)
+
+
+def _get_bulk_executor():
+    global _bulk_executor
+    if _bulk_executor is None:
+        from concurrent.futures import ThreadPoolExecutor
+        with _bulk_executor_lock:
+            if _bulk_executor is None:
+                _bulk_executor = ThreadPoolExecutor(max_workers=BULK_READ_WORKERS)
+    return _bulk_executor
+
+
+def _open_converted(file_path, target_type):
+    with open(file_path, 'r') as f:
+        return target_type(f.read().strip())
+
+
+def _read_converted(file_path, target_type):
+    return instrumentation.timed(instrumentation.KIND_SYSFS, file_path, _open_converted, file_path, target_type)
+
+
+def fread_bulk(requests):
+    """
+    Read several files concurrently and convert each to its target type.
+    Reads are spread over a shared thread pool, so a batch of slow
+    attributes (e.g. PMBus-backed hwmon files) costs about one read.
+
+    Args:
+        requests: iterable of (file_path, target_type) tuples
+    Returns:
+        A tuple (values, errors) of dicts keyed by file path; a path is in
+        values if it was read and converted, otherwise in errors with the
+        repr of the exception, whatever its type. Nothing is raised or
+        logged.
+    """
+    requests = list(requests)
+    values = {}
+    errors = {}
+    if len(requests) == 1:
+        file_path, target_type = requests[0]
+        try:
+            values[file_path] = _read_converted(file_path, target_type)
+        except Exception as e:
+            # target_type may raise anything, not only ValueError
+            errors[file_path] = repr(e)
+        return values, errors
+
+    executor = _get_bulk_executor()
+    futures = [(file_path, executor.submit(_read_converted, file_path, target_type))
+               for file_path, target_type in requests]
+    for file_path, future in futures:
+        try:
+            values[file_path] = future.result()
+        except Exception as e:
+            errors[file_path] = repr(e)
+    return values, errors
+
+
+class SysfsAttr(object):
+    """
+    Sysfs attribute that stays open between reads. Every read is a single
+    pread() at offset 0; the file is reopened transparently if it went
+    away (e.g. the driver was rebound).
+    """
+
+    # Errors meaning the open descriptor no longer refers to a live attribute
+    REOPEN_ERRNOS = (errno.ENODEV, errno.ENOENT, errno.EBADF, errno.ESTALE)
+
+    def __init__(self, file_path, size=4096):
+        self.file_path = file_path
+        self.size = size
+        self._fd = None
+
+    def close(self):
+        if self._fd is not None:
+            try:
+                os.close(self._fd)
+            except OSError:
+                pass
+            self._fd = None
+
+    def __del__(self):
+        self.close()
+
+    def read_raw(self):
+        """
+        Read the attribute content
+        @return the content as a string, raises IOError on failure
+        """
+        return instrumentation.timed(instrumentation.KIND_SYSFS, self.file_path, self._pread)
+
+    def _pread(self):
+        for retry in (False, True):
+            if self._fd is None:
+                self._fd = os.open(self.file_path, os.O_RDONLY)
+            try:
+                return os.pread(self._fd, self.size, 0).decode()
+            except OSError as e:
+                self.close()
+                if retry or e.errno not in self.REOPEN_ERRNOS:
+                    raise
+
+    def read(self, target_type, default='', raise_exception=False, log_func=_log_error):
+        """
+        Read the attribute and convert it to target type, with the same
+        error handling as fread()
+        """
+        try:
+            value = target_type(self.read_raw().strip())
+        except (ValueError, IOError) as e:
+            if log_func:
+                log_func('Failed to read from file {} - {}'.format(self.file_path, repr(e)))
+            if not raise_exception:
+                value = default
+            else:
+                raise e
+
+        return value
+
+    def read_str(self, default='', raise_exception=False, log_func=_log_error):
+        """
+        Read string content of the attribute
+        """
+        return self.read(str, default=default, raise_exception=raise_exception, log_func=log_func)
+
+    def read_int(self, default=0, raise_exception=False, log_func=_log_error):
+        """
+        Read the attribute and cast it to integer
+        """
+        return self.read(int, default=default, raise_exception=raise_exception, log_func=log_func)
@@ -4,8 +4,10 @@ provides access to hardware watchdog
 """
 
 import os
+import time
 import fcntl
 import array
+import threading
 
 from sonic_platform_base.watchdog_base import WatchdogBase
 from sonic_py_common import logger
@@ -36,6 +38,11 @@ WD_SYSFS_PATH = "/sys/class/watchdog/watchdog1/"
 
 WD_COMMON_ERROR = -1
 
+""" Keepalive jitter histogram bucket upper bounds, in milliseconds """
+KEEPALIVE_JITTER_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+""" Default number of keepalives per timeout period """
+KEEPALIVE_PER_TIMEOUT = 3
+
 sonic_logger = logger.Logger()
 
 
@@ -54,7 +61,18 @@ class WatchdogImplBase(WatchdogBase):
 
         self.watchdog_path = wd_device_path
         self._watchdog = None
+        self._keepalive_thread = None
+        self._keepalive_stop = threading.Event()
+        # Interval passed to start_keepalive(), None to follow the timeout
+        self._keepalive_requested = None
+        self._keepalive_interval = None
+        self._timeout_attr = utils.SysfsAttr(WD_SYSFS_PATH + 'timeout')
+        self._timeleft_attr = utils.SysfsAttr(WD_SYSFS_PATH + 'timeleft')
+        self._state_attr = utils.SysfsAttr(WD_SYSFS_PATH + 'state')
         self.timeout = self._gettimeout()
+        # Armed state as set through this object, None until first known
+        self._armed = None
+        self._reset_keepalive_stats()
 
     @property
     def watchdog(self):
@@ -70,6 +88,7 @@ class WatchdogImplBase(WatchdogBase):
         Close watchdog
         """
 
+        self.stop_keepalive()
         if self._watchdog is not None:
             os.close(self._watchdog)
 
@@ -83,8 +102,10 @@ class WatchdogImplBase(WatchdogBase):
         """
         sonic_logger.log_info(" Debug disarm watchdog ")
 
+        self.stop_keepalive()
         try:
             self._disablewatchdog()
+            self._armed = False
             self.timeout = 0
         except IOError:
             return False
@@ -117,8 +138,7 @@ class WatchdogImplBase(WatchdogBase):
         @return watchdog timeout
         """
 
-        file_path = WD_SYSFS_PATH + 'timeout'
-        return utils.fread_int(file_path)
+        return self._timeout_attr.read_int()
 
     def _gettimeleft(self):
         """
@@ -126,8 +146,12 @@ class WatchdogImplBase(WatchdogBase):
         @return time left in seconds
         """
 
-        file_path = WD_SYSFS_PATH + 'timeleft'
-        return utils.fread_int(file_path)
+        if self._watchdog is not None:
+            req = array.array('I', [0])
+            fcntl.ioctl(self._watchdog, WDIOC_GETTIMELEFT, req, True)
+            return int(req[0])
+
+        return self._timeleft_attr.read_int()
 
 
     def arm(self, seconds):
@@ -142,15 +166,22 @@ class WatchdogImplBase(WatchdogBase):
             return ret
 
         try:
-            if self.timeout != seconds:
+            timeout_changed = self.timeout != seconds
+            if timeout_changed:
                 self.timeout = self._settimeout(seconds)
             if self.is_armed():
                 self._keepalive()
             else:
                 self._enablewatchdog()
+                self._armed = True
             ret = self.timeout
         except IOError:
-            pass
+            return ret
+
+        if timeout_changed and self._keepalive_thread is not None:
+            # The running cadence was derived from the old timeout
+            self.stop_keepalive()
+            self.start_keepalive(self._keepalive_requested)
 
         return ret
 
@@ -174,15 +205,111 @@ class WatchdogImplBase(WatchdogBase):
         Implements is_armed WatchdogBase API
         """
 
-        file_path = WD_SYSFS_PATH + 'state'
-        return utils.fread_str(file_path) == 'active'
+        # The device only has one opener, so once this object holds the
+        # handle its own record of the state is authoritative
+        if self._armed is None or self._watchdog is None:
+            self._armed = self._state_attr.read_str() == 'active'
+        return self._armed
 
     def get_remaining_time(self):
         """
         Implements get_remaining_time WatchdogBase API
         """
         if self.is_armed():
-            return self._gettimeleft()
+            try:
+                return self._gettimeleft()
+            except IOError:
+                return WD_COMMON_ERROR
         else:
             return -1
 
+    def _reset_keepalive_stats(self):
+        self._jitter_histogram = [0] * (len(KEEPALIVE_JITTER_BUCKETS_MS) + 1)
+        self._keepalive_count = 0
+        self._keepalive_errors = 0
+        self._max_jitter = 0.0
+
+    def _record_jitter(self, jitter):
+        jitter_ms = jitter * 1000
+        for i, bound in enumerate(KEEPALIVE_JITTER_BUCKETS_MS):
+            if jitter_ms <= bound:
+                self._jitter_histogram[i] += 1
+                break
+        else:
+            self._jitter_histogram[-1] += 1
+        self._max_jitter = max(self._max_jitter, jitter)
+
+    def _keepalive_loop(self, interval):
+        deadline = time.monotonic() + interval
+        while not self._keepalive_stop.wait(max(0, deadline - time.monotonic())):
+            now = time.monotonic()
+            try:
+                self._keepalive()
+                self._keepalive_count += 1
+            except IOError:
+                self._keepalive_errors += 1
+            self._record_jitter(now - deadline)
+            deadline += interval
+            if deadline < now:
+                # Fell more than a period behind; restart the cadence
+                deadline = now + interval
+
+    def start_keepalive(self, interval=None):
+        """
+        Start feeding the armed watchdog from a dedicated thread on the
+        already open handle
+
+        Args:
+            interval: seconds between keepalives, by default a third of
+                      the armed timeout. arm() with another timeout
+                      restarts the thread with the new cadence.
+        Returns:
+            A boolean, True if the keepalive thread is running
+        """
+        if self._keepalive_thread is not None:
+            return True
+        if not self.is_armed() or self.timeout <= 0:
+            return False
+        self._keepalive_requested = interval
+        default_interval = float(self.timeout) / KEEPALIVE_PER_TIMEOUT
+        if interval is None or interval >= self.timeout:
+            # An interval reaching the timeout would let the watchdog fire
+            interval = default_interval
+
+        self._reset_keepalive_stats()
+        self._keepalive_interval = interval
+        self._keepalive_stop.clear()
+        self._keepalive_thread = threading.Thread(target=self._keepalive_loop, args=(interval,),
+                                                  name="watchdog-keepalive")
+        self._keepalive_thread.daemon = True
+        self._keepalive_thread.start()
+        return True
+
+    def stop_keepalive(self):
+        if self._keepalive_thread is not None:
+            self._keepalive_stop.set()
+            self._keepalive_thread.join()
+            self._keepalive_thread = None
+            self._keepalive_interval = None
+
+    def get_keepalive_stats(self):
+        """
+        Retrieves the keepalive jitter statistics
+
+        Returns:
+            A dict with the current keepalive interval in seconds (None
+            if not running), the keepalive and error counts, the jitter
+            histogram as a list of (upper bound in ms, count) with None as
+            the open-ended bucket, and the maximum jitter in seconds and as
+            a fraction of the armed timeout
+        """
+        bounds = list(KEEPALIVE_JITTER_BUCKETS_MS) + [None]
+        return {
+            'interval': self._keepalive_interval,
+            'keepalives': self._keepalive_count,
+            'errors': self._keepalive_errors,
+            'jitter_histogram_ms': list(zip(bounds, self._jitter_histogram)),
+            'max_jitter': self._max_jitter,
+            'max_jitter_fraction': self._max_jitter / self.timeout if self.timeout > 0 else 0.0,
+        }
+
@@ -0,0 +1,167 @@
+"""
+Module contains the wake-up sources used by Chassis.get_change_event to
+learn about transceiver insertion/removal without waiting for the next
+polling tick.
+
+A source is only used when the 'XCVR' section of the PDDF plugin data
+describes one; otherwise get_change_event relies on polling alone:
+
+    "XCVR": {
+        "presence_notify_paths": ["/sys/.../xcvr_present", ...],
+        "presence_uevent_match": ["SUBSYSTEM=i2c", ...]
+    }
+
+'presence_notify_paths' lists sysfs attributes whose driver calls
+sysfs_notify() on a presence change. Without it, 'presence_uevent_match'
+lists strings of which a kernel uevent must contain one to wake the
+poller. An unfiltered uevent listener is never set up, since unrelated
+uevents would keep waking it.
+"""
+
+import os
+import time
+import errno
+import select
+import socket
+
+""" Netlink protocol and multicast group of kernel uevents """
+NETLINK_KOBJECT_UEVENT = 15
+UEVENT_KERNEL_GROUP = 1
+UEVENT_BUFFER_SIZE = 64 * 1024
+
+
+class PollingEventSource(object):
+    """
+    Fallback source without any notification: waiting is a plain sleep
+    """
+
+    def wait(self, timeout):
+        """
+        Block until a change may have happened or <timeout> seconds pass
+        @return True if woken by a notification, False on timeout
+        """
+        if timeout > 0:
+            time.sleep(timeout)
+        return False
+
+    def close(self):
+        pass
+
+
+class FdEventSource(object):
+    """
+    Source built on file descriptors that poll() reports ready when a
+    change may have happened, e.g. a pipe, an eventfd or a GPIO line
+    """
+
+    def __init__(self, fds, events=select.POLLIN):
+        self._fds = list(fds)
+        self._poller = select.poll()
+        for fd in self._fds:
+            self._poller.register(fd, events)
+
+    def _drain(self, fd):
+        """
+        Consume a notification so that the descriptor is not ready again
+        """
+        try:
+            os.read(fd, UEVENT_BUFFER_SIZE)
+        except OSError as e:
+            if e.errno != errno.EAGAIN:
+                raise
+
+    def wait(self, timeout):
+        ready = self._poller.poll(max(0, int(timeout * 1000)))
+        for fd, _ in ready:
+            self._drain(fd)
+        return bool(ready)
+
+    def close(self):
+        for fd in self._fds:
+            self._poller.unregister(fd)
+        self._fds = []
+
+
+class SysfsEventSource(FdEventSource):
+    """
+    Source watching sysfs attributes whose driver calls sysfs_notify()
+    when the value changes (interrupt-driven presence attributes)
+    """
+
+    def __init__(self, paths):
+        fds = [os.open(path, os.O_RDONLY | os.O_NONBLOCK) for path in paths]
+        for fd in fds:
+            # sysfs only reports a change relative to the last read
+            os.pread(fd, 4096, 0)
+        FdEventSource.__init__(self, fds, select.POLLPRI | select.POLLERR)
+
+    def _drain(self, fd):
+        os.pread(fd, 4096, 0)
+
+    def close(self):
+        fds = self._fds
+        FdEventSource.close(self)
+        for fd in fds:
+            os.close(fd)
+
+
+class UeventSource(FdEventSource):
+    """
+    Source listening to kernel uevents, optionally only those whose
+    payload contains one of <match> (e.g. 'SUBSYSTEM=i2c')
+    """
+
+    def __init__(self, match=None):
+        self._match = [m.encode() for m in (match or [])]
+        self._matched = False
+        self._sock = socket.socket(socket.AF_NETLINK, socket.SOCK_DGRAM | socket.SOCK_NONBLOCK,
+                                   NETLINK_KOBJECT_UEVENT)
+        try:
+            self._sock.bind((0, UEVENT_KERNEL_GROUP))
+        except OSError:
+            self._sock.close()
+            raise
+        FdEventSource.__init__(self, [self._sock.fileno()])
+
+    def _drain(self, fd):
+        self._matched = False
+        while True:
+            try:
+                msg = self._sock.recv(UEVENT_BUFFER_SIZE)
+            except (BlockingIOError, InterruptedError):
+                return
+            if not self._match or any(m in msg for m in self._match):
+                self._matched = True
+
+    def wait(self, timeout):
+        deadline = time.monotonic() + timeout
+        while True:
+            if FdEventSource.wait(self, timeout) and self._matched:
+                return True
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                return False
+
+    def close(self):
+        FdEventSource.close(self)
+        self._sock.close()
+
+
+def create_event_source(xcvr_plugin_data):
+    """
+    Build the wake-up source configured by the 'XCVR' plugin data.
+    'presence_notify_paths' selects sysfs attributes to watch, otherwise
+    'presence_uevent_match' selects the kernel uevents to listen to.
+    Without either, or when the source cannot be set up, waiting is
+    plain polling.
+    """
+    paths = xcvr_plugin_data.get('presence_notify_paths')
+    match = xcvr_plugin_data.get('presence_uevent_match')
+    try:
+        if paths:
+            return SysfsEventSource(paths)
+        if match:
+            return UeventSource(match)
+    except (IOError, OSError):
+        pass
+    return PollingEventSource()
@@ -0,0 +1,155 @@
+"""
+Module contains the adaptive presence poller behind
+Chassis.get_change_event. While the ports are idle the polling interval
+backs off exponentially up to a ceiling well above the 1 second period of
+the fixed polling it replaces. A port change is only reported once the
+new state has held for the port's debounce window; a port that returns to
+its reported state within the window is counted as a suppressed flap and
+never reported.
+
+Debouncing is tracked per port. A port in its first debounce window is
+confirmed at the fast floor rate. A port that keeps flapping gets ever
+longer windows, sampled only XCVR_POLL_FLAP_SAMPLES times each, so it
+does not hold the scans of the other ports at the floor rate.
+
+Worst-case detection latency of a quiet port is max_interval + debounce,
+2.3 seconds with the defaults. A platform needing faster detection lowers
+poll_max_interval, at the cost of more idle bus traffic.
+"""
+
+import time
+
+from .xcvr_presence import iter_changed
+
+""" Defaults of the 'XCVR' plugin data keys poll_min_interval,
+poll_max_interval and poll_debounce, in seconds """
+XCVR_POLL_MIN_INTERVAL = 0.1
+XCVR_POLL_MAX_INTERVAL = 2.0
+XCVR_POLL_DEBOUNCE = 0.3
+# Growth of the polling interval per idle poll, and of the debounce window
+# per suppressed flap of a port
+XCVR_POLL_BACKOFF = 2.0
+# Samples taken of a flapping port within each of its debounce windows
+XCVR_POLL_FLAP_SAMPLES = 4
+# Timed waits have millisecond granularity and may return slightly early
+TIMER_SLACK = 0.005
+
+
+class AdaptivePoller(object):
+    """
+    Debounces successive presence bitmaps and paces the scans producing
+    them
+    """
+
+    def __init__(self, min_interval=XCVR_POLL_MIN_INTERVAL, max_interval=XCVR_POLL_MAX_INTERVAL,
+                 debounce=XCVR_POLL_DEBOUNCE, backoff=XCVR_POLL_BACKOFF):
+        self.min_interval = min_interval
+        self.max_interval = max(min_interval, max_interval)
+        self.debounce = debounce
+        self.backoff = backoff
+        self.interval = min_interval
+        self._reported = None
+        # port index -> time its raw state first differed from the reported one
+        self._pending = {}
+        # port index -> [suppressed flaps in a row, time of the last one]
+        self._flaps = {}
+        self.polls = 0
+        self.events = 0
+        self.suppressed_flaps = 0
+
+    def _window(self, index):
+        flaps = self._flaps.get(index)
+        if flaps is None:
+            return self.debounce
+        return max(self.debounce, min(self.debounce * self.backoff ** flaps[0], self.max_interval))
+
+    def update(self, bitmap, now=None):
+        """
+        Feed the result of a presence scan
+
+        Args:
+            bitmap: integer presence bitmap, bit N set when port index N
+                    is present
+            now: time.monotonic() of the scan (optional)
+        Returns:
+            A list of (port index, present) for the changes that outlasted
+            the debounce window. The first scan only sets the baseline.
+        """
+        if now is None:
+            now = time.monotonic()
+        self.polls += 1
+        if self._reported is None:
+            self._reported = bitmap
+            return []
+
+        for index, _ in iter_changed(self._reported, bitmap):
+            self._pending.setdefault(index, now)
+
+        changes = []
+        for index in sorted(self._pending):
+            present = bool(bitmap >> index & 1)
+            if present == bool(self._reported >> index & 1):
+                del self._pending[index]
+                flaps = self._flaps.setdefault(index, [0, now])
+                flaps[0] += 1
+                flaps[1] = now
+                self.suppressed_flaps += 1
+            elif now - self._pending[index] >= self._window(index) - TIMER_SLACK:
+                del self._pending[index]
+                self._flaps.pop(index, None)
+                self._reported ^= 1 << index
+                changes.append((index, present))
+        self.events += len(changes)
+
+        # A port forgets its flaps once it stayed quiet for a whole ceiling
+        for index in [i for i, f in self._flaps.items()
+                      if i not in self._pending and now - f[1] >= self.max_interval]:
+            del self._flaps[index]
+
+        if any(index not in self._flaps for index in self._pending):
+            self.interval = self.min_interval
+        else:
+            self.interval = min(self.interval * self.backoff, self.max_interval)
+        return changes
+
+    def next_wait(self, now=None):
+        """
+        Retrieves the seconds to wait before the next scan
+        """
+        if not self._pending:
+            return self.interval
+        if now is None:
+            now = time.monotonic()
+        wait = self.interval
+        for index, start in self._pending.items():
+            window = self._window(index)
+            if index in self._flaps:
+                wait = min(wait, max(self.min_interval, window / XCVR_POLL_FLAP_SAMPLES))
+            wait = min(wait, max(0, start + window - now))
+        return wait
+
+    def get_stats(self):
+        """
+        Retrieves poller counters
+
+        Returns:
+            A dict with 'polls', 'events', 'suppressed_flaps', the current
+            'interval', the number of 'pending' ports and of ports
+            currently 'flapping'
+        """
+        return {'polls': self.polls, 'events': self.events, 'suppressed_flaps': self.suppressed_flaps,
+                'interval': self.interval, 'pending': len(self._pending), 'flapping': len(self._flaps)}
+
+    def reset_stats(self):
+        self.polls = 0
+        self.events = 0
+        self.suppressed_flaps = 0
+
+
+def create_poller(xcvr_plugin_data):
+    """
+    Build a poller configured by the 'XCVR' plugin data
+    """
+    return AdaptivePoller(float(xcvr_plugin_data.get('poll_min_interval', XCVR_POLL_MIN_INTERVAL)),
+                          float(xcvr_plugin_data.get('poll_max_interval', XCVR_POLL_MAX_INTERVAL)),
+                          float(xcvr_plugin_data.get('poll_debounce', XCVR_POLL_DEBOUNCE)))
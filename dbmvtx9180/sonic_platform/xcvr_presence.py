@@ -0,0 +1,202 @@
+"""
+Module contains the bulk transceiver presence scanner. Presence of all
+ports is held as one integer bitmap (bit N set = port index N present).
+
+By default presence comes from the drivers' xcvr_present attributes,
+read in bulk. Setting 'presence_source' to 'register' in the XCVR plugin
+data instead reads the CPLD/FPGA presence registers directly, with one
+SMBus block read per register group, through the bus scheduler and its
+cross-process bus lock. The address is claimed normally and never
+forced: a group whose device is held by a kernel driver (EBUSY) is read
+from the sysfs attributes from then on.
+"""
+
+import errno
+import functools
+
+from .i2c_dev import SmbusDevice, I2C_SMBUS_BLOCK_MAX
+from .i2c_scheduler import get_scheduler, PRIORITY_PRESENCE
+from .utils import fread_bulk
+
+""" Values of the 'presence_source' XCVR plugin data key """
+PRESENCE_SOURCE_REGISTER = 'register'
+PRESENCE_SOURCE_SYSFS = 'sysfs'
+
+# Claim the address normally, never from a bound driver
+_default_device_factory = functools.partial(SmbusDevice, force=False)
+
+
+def _to_int(value):
+    return int(value, 0) if isinstance(value, str) else int(value)
+
+
+def resolve_presence_register(pddf_obj, port_index):
+    """
+    Look up the register behind the 'xcvr_present' attribute of a port in
+    the PDDF device data
+
+    Returns:
+        A tuple (bus, addr, offset, mask, cmpval), or None if the attribute
+        is not described as a plain register bit
+    """
+    try:
+        data = pddf_obj.data
+        device = 'PORT{}'.format(port_index + 1)
+        ctrl = None
+        for itf in data[device]['i2c']['interface']:
+            if itf.get('itf') == 'control':
+                ctrl = itf['dev']
+        if ctrl is None:
+            return None
+        for attr in data[ctrl]['i2c']['attr_list']:
+            if attr.get('attr_name') != 'xcvr_present':
+                continue
+            topo = data[attr['attr_devname']]['i2c']['topo_info']
+            addr = attr.get('attr_devaddr', topo['dev_addr'])
+            return (_to_int(topo['parent_bus']), _to_int(addr), _to_int(attr['attr_offset']),
+                    _to_int(attr['attr_mask']), _to_int(attr['attr_cmpval']))
+    except (KeyError, TypeError, ValueError, AttributeError):
+        pass
+    return None
+
+
+class _RegisterGroup(object):
+    """
+    Presence bits that live in a window of registers of one device
+    """
+
+    def __init__(self, bus, addr):
+        self.bus = bus
+        self.addr = addr
+        # (port index, offset, bit mask, expected masked value)
+        self.ports = []
+
+    def window(self):
+        offsets = [p[1] for p in self.ports]
+        return min(offsets), max(offsets) - min(offsets) + 1
+
+
+class PresenceScanner(object):
+    """
+    Reads the presence of every port in the fewest bus transactions the
+    PDDF description allows. Ports whose presence is not a plain register
+    bit are read from their xcvr_present attributes in bulk, or through
+    Sfp.get_presence() if those are not plain sysfs files either.
+    """
+
+    def __init__(self, sfp_list, pddf_obj, device_factory=None, source=PRESENCE_SOURCE_SYSFS):
+        """
+        @param device_factory callable(bus, addr) returning the SMBus
+               device of a presence register group
+        @param source PRESENCE_SOURCE_REGISTER or PRESENCE_SOURCE_SYSFS
+        """
+        self._sfp_list = sfp_list
+        self._pddf_obj = pddf_obj
+        self._device_factory = device_factory or _default_device_factory
+        self._devices = {}
+        self._groups = []
+        self._fallback = []
+
+        groups = {}
+        for index in range(len(sfp_list)):
+            reg = None
+            if source == PRESENCE_SOURCE_REGISTER:
+                reg = resolve_presence_register(pddf_obj, index)
+            if reg is None:
+                self._fallback.append(index)
+                continue
+            bus, addr, offset, mask, cmpval = reg
+            group = groups.get((bus, addr))
+            if group is None:
+                group = groups[(bus, addr)] = _RegisterGroup(bus, addr)
+            group.ports.append((index, offset, 1 << mask, cmpval))
+
+        for group in groups.values():
+            # Split groups too wide for one block read into windows that fit
+            sub = None
+            for port in sorted(group.ports, key=lambda p: p[1]):
+                if sub is None or port[1] - sub.ports[0][1] >= I2C_SMBUS_BLOCK_MAX:
+                    sub = _RegisterGroup(group.bus, group.addr)
+                    self._groups.append(sub)
+                sub.ports.append(port)
+
+    def _get_device(self, bus, addr):
+        device = self._devices.get((bus, addr))
+        if device is None:
+            device = self._devices[(bus, addr)] = self._device_factory(bus, addr)
+        return device
+
+    def _scan_group(self, group):
+        start, length = group.window()
+        device = self._get_device(group.bus, group.addr)
+        if length == 1:
+            read = lambda: bytes([device.read_byte_data(start)])
+        else:
+            read = lambda: device.read_i2c_block_data(start, length)
+        regs = get_scheduler(group.bus).run(read, PRIORITY_PRESENCE,
+                                            ('presence', group.addr, start, length))
+        bitmap = 0
+        for index, offset, mask, cmpval in group.ports:
+            if regs[offset - start] & mask == cmpval:
+                bitmap |= 1 << index
+        return bitmap
+
+    def _presence_path(self, index):
+        try:
+            return self._pddf_obj.get_path('PORT{}'.format(index + 1), 'xcvr_present')
+        except Exception:
+            return None
+
+    def _scan_ports(self, indices):
+        paths = {}
+        slow = []
+        for index in indices:
+            path = self._presence_path(index)
+            if path:
+                paths[path] = index
+            else:
+                slow.append(index)
+
+        bitmap = 0
+        values, errors = fread_bulk((path, int) for path in paths)
+        for path, index in paths.items():
+            if path in values:
+                if values[path] == 1:
+                    bitmap |= 1 << index
+            else:
+                slow.append(index)
+        for index in slow:
+            if self._sfp_list[index].get_presence():
+                bitmap |= 1 << index
+        return bitmap
+
+    def scan(self):
+        """
+        Read the presence of every port
+
+        Returns:
+            An integer bitmap, bit N set when port index N is present
+        """
+        bitmap = self._scan_ports(self._fallback)
+        for group in list(self._groups):
+            try:
+                bitmap |= self._scan_group(group)
+            except (IOError, OSError) as e:
+                if e.errno == errno.EBUSY:
+                    # A driver is bound to the device, keep off its address
+                    self._groups.remove(group)
+                    self._fallback.extend(p[0] for p in group.ports)
+                bitmap |= self._scan_ports([p[0] for p in group.ports])
+        return bitmap
+
+
+def iter_changed(old_bitmap, new_bitmap):
+    """
+    Yield (port index, present) for every port whose bit differs, in
+    time proportional to the number of changed ports
+    """
+    changed = old_bitmap ^ new_bitmap
+    while changed:
+        low = changed & -changed
+        yield low.bit_length() - 1, bool(new_bitmap & low)
+        changed ^= low
@@ -0,0 +1,27 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from sonic_platform import i2c_scheduler
+from sonic_platform.i2c_scheduler import BusScheduler
+
+
+class _LocalScheduler(BusScheduler):
+    """
+    Bus scheduler without the lock file under /run, unless given one
+    """
+
+    def __init__(self, bus, lock_path=None):
+        BusScheduler.__init__(self, bus, lock_path)
+
+
+@pytest.fixture(autouse=True)
+def isolated_schedulers(monkeypatch):
+    """
+    Give every test its own bus schedulers
+    """
+    monkeypatch.setattr(i2c_scheduler, '_schedulers', {})
+    monkeypatch.setattr(i2c_scheduler, 'BusScheduler', _LocalScheduler)
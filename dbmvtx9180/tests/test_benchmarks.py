@@ -0,0 +1,111 @@
+"""
+Invariants measured by the benchmarks, checked on every test run against
+the fake platform
+"""
+
+import os
+import sys
+
+import pytest
+
+pytest.importorskip('sonic_platform_base')
+pytest.importorskip('sonic_platform_pddf_base')
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'benchmarks'))
+
+import bench_api
+from fakes import FakePlatform, IoCounter
+
+from sonic_platform import fpga
+
+ITERATIONS = 20
+
+# Getters served from the register cache once warm
+CACHED_PREFIXES = ('Fan.', 'PsuFan.', 'Thermal.', 'Component[')
+
+
+def _run(cold):
+    results = {}
+    with FakePlatform() as platform:
+        chassis = platform.create_chassis()
+        wdt = platform.create_watchdog()
+        for name, func in bench_api._methods(chassis, wdt):
+            if not cold:
+                # Fill the caches outside of the measurement
+                func()
+            results[name] = bench_api.measure(func, platform, ITERATIONS, cold)
+    return results
+
+
+@pytest.fixture(scope='module')
+def warm_results():
+    return _run(cold=False)
+
+
+@pytest.fixture(scope='module')
+def cold_results():
+    return _run(cold=True)
+
+
+def test_every_method_benchmarked(warm_results):
+    assert not [name for name, result in warm_results.items() if 'error' in result]
+    assert any(name.startswith('Fan.') for name in warm_results)
+    for name in ('Watchdog.arm', 'Watchdog.disarm', 'Watchdog.get_remaining_time(armed)'):
+        assert name in warm_results
+
+
+def test_watchdog_armed_against_fake_device():
+    with FakePlatform() as platform:
+        wdt = platform.create_watchdog()
+        assert wdt.arm(bench_api.WATCHDOG_TIMEOUT) == bench_api.WATCHDOG_TIMEOUT
+        assert wdt._keepalive_thread is None
+        assert 0 < wdt.get_remaining_time() <= bench_api.WATCHDOG_TIMEOUT
+        assert wdt.disarm()
+        assert wdt.get_remaining_time() == -1
+
+
+@pytest.mark.parametrize('results', ['warm_results', 'cold_results'])
+def test_no_process_spawns(request, results):
+    spawning = [name for name, result in request.getfixturevalue(results).items()
+                if result['spawns_per_call']]
+    assert spawning == []
+
+
+def test_cached_getters_do_no_io(warm_results):
+    slow = [name for name, result in warm_results.items()
+            if name.startswith(CACHED_PREFIXES) and result['io_ops_per_call']]
+    assert slow == []
+
+
+def test_cold_fpga_getters_read_one_bank(cold_results):
+    for name, result in cold_results.items():
+        if name.startswith(('Fan.', 'Thermal.')):
+            assert result['fpga_transactions_per_call'] <= 1, name
+
+
+def test_register_cache_hit_rate():
+    with FakePlatform() as platform:
+        chassis = platform.create_chassis()
+        fans = chassis.get_all_fans()
+        thermals = chassis.get_all_thermals()
+        fpga.cache.invalidate()
+        start = fpga.cache.get_stats()
+        for _ in range(ITERATIONS):
+            for fan in fans:
+                fan.get_speed_rpm()
+                fan.get_status()
+            for thermal in thermals:
+                thermal.get_temperature()
+        stats = fpga.cache.get_stats()
+        hits = stats['hits'] - start['hits']
+        misses = stats['misses'] - start['misses']
+        assert hits / float(hits + misses) >= 0.95
+
+
+def test_chassis_construction_does_no_io():
+    with FakePlatform() as platform:
+        platform.create_chassis()
+        counter = IoCounter(platform.fpga_device)
+        with counter:
+            platform.create_chassis()
+        assert counter.as_dict() == {'opens': 0, 'ioctls': 0, 'fpga_transactions': 0, 'spawns': 0, 'io_ops': 0}
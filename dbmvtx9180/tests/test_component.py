@@ -0,0 +1,86 @@
+import importlib
+import os
+import sys
+
+import pytest
+
+pytest.importorskip('sonic_platform_base')
+pytest.importorskip('sonic_platform_pddf_base')
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'benchmarks'))
+
+from fakes import FakeFlashFpga, FakePlatform, FAKE_REGISTER_MAP, FPGA_REGISTERS
+
+from sonic_platform import component, fpga
+from sonic_platform.regcache import RegisterCache, DEFAULT_TTL
+
+NUM_PAGES = 8
+
+
+@pytest.fixture
+def platform():
+    with FakePlatform() as platform:
+        platform.fpga_device = FakeFlashFpga((NUM_PAGES + 1) * FAKE_REGISTER_MAP['page_size'], registers=FPGA_REGISTERS)
+        fpga.set_device(platform.fpga_device)
+        yield platform
+
+
+@pytest.fixture
+def image(tmp_path):
+    path = tmp_path / 'fpga.bin'
+    path.write_bytes(os.urandom(NUM_PAGES * FAKE_REGISTER_MAP['page_size']))
+    return str(path)
+
+
+def _component(platform, name):
+    return [c for c in platform.create_chassis().get_all_components() if c.get_name() == name][0]
+
+
+def test_version_ttl_installed_by_component(monkeypatch):
+    monkeypatch.setattr(fpga, 'cache', RegisterCache())
+    importlib.reload(component)
+    assert fpga.cache.get_ttl(component.FPGA_FW_VERSION_REG_OFFSET) == DEFAULT_TTL
+
+    component.Component(0)
+    assert fpga.cache.get_ttl(component.FPGA_FW_VERSION_REG_OFFSET) == DEFAULT_TTL
+    component.Component(1)
+    assert fpga.cache.get_ttl(component.FPGA_FW_VERSION_REG_OFFSET) == component.FPGA_FW_VERSION_CACHE_TTL
+
+
+def test_install_clears_version_caches(platform, image):
+    sysfpga = _component(platform, 'SysFPGA')
+    assert sysfpga.get_firmware_version() == '0x12'
+    assert os.path.exists(component.FW_VERSION_CACHE_PATH)
+
+    # The new image reports another version once programmed
+    platform.fpga_device.regs[component.FPGA_FW_VERSION_REG_OFFSET] = 0x13
+    assert sysfpga.get_firmware_version() == '0x12'
+
+    assert sysfpga.install_firmware(image) is True
+    assert not os.path.exists(component.FW_VERSION_CACHE_PATH)
+    assert fpga.cache.lookup(component.FPGA_FW_VERSION_REG_OFFSET) is None
+    assert sysfpga.get_firmware_version() == '0x13'
+
+
+def test_other_process_sees_new_version(platform):
+    sysfpga = _component(platform, 'SysFPGA')
+    assert sysfpga.get_firmware_version() == '0x12'
+    platform.fpga_device.regs[component.FPGA_FW_VERSION_REG_OFFSET] = 0x13
+
+    # An install in another process drops the versions recorded under /run
+    pid = os.fork()
+    if pid == 0:
+        component.invalidate_fw_version_cache()
+        os._exit(0)
+    os.waitpid(pid, 0)
+
+    assert sysfpga.get_firmware_version() == '0x13'
+
+
+def test_versions_served_from_run_cache(platform):
+    sysfpga = _component(platform, 'SysFPGA')
+    assert sysfpga.get_firmware_version() == '0x12'
+    start = platform.fpga_device.transactions
+    fpga.cache.invalidate()
+    assert sysfpga.get_firmware_version() == '0x12'
+    assert platform.fpga_device.transactions == start
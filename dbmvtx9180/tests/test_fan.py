@@ -0,0 +1,60 @@
+import os
+import sys
+
+import pytest
+
+pytest.importorskip('sonic_platform_base')
+pytest.importorskip('sonic_platform_pddf_base')
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'benchmarks'))
+
+from fakes import FakePlatform
+
+from sonic_platform import fpga
+
+
+@pytest.fixture
+def platform():
+    with FakePlatform() as platform:
+        yield platform
+
+
+def test_status_record(platform):
+    # Fan 1 stopped, fan 2 faulted
+    platform.fpga_device.regs[0x20:0x22] = b'\x00\x00'
+    platform.fpga_device.regs[0x04] = 0b10
+    fans = platform.create_chassis().get_all_fan_drawers()[0].get_all_fans()
+    assert [fan.fan_index for fan in fans] == [1, 2]
+    records = [fan.get_status_record() for fan in fans]
+    assert [r.presence for r in records] == [False, True]
+    assert [r.fault for r in records] == [False, True]
+    assert [r.speed_rpm for r in records] == [0, 0x2ee0]
+    assert [fan.get_status() for fan in fans] == [False, False]
+
+
+def test_status_record_read_error(platform):
+    platform.fpga_device.fail_regs = {fpga.FAN_STATUS_BANK.base}
+    fan = platform.create_chassis().get_all_fans()[0]
+    with pytest.raises(IOError):
+        fan.get_status_record()
+    # The platform API getters report the fan as absent and stopped
+    assert fan.get_presence() is False
+    assert fan.get_status() is False
+    assert fan.get_speed_rpm() == 0
+
+
+def test_drawer_records_from_one_read(platform):
+    drawer = platform.create_chassis().get_all_fan_drawers()[0]
+    start = platform.fpga_device.transactions
+    records = drawer.get_status_records()
+    assert len(records) == len(drawer.get_all_fans())
+    assert platform.fpga_device.transactions - start == 1
+
+
+def test_drawer_read_error(platform):
+    platform.fpga_device.fail_regs = {fpga.FAN_STATUS_BANK.base}
+    drawer = platform.create_chassis().get_all_fan_drawers()[0]
+    with pytest.raises(IOError):
+        drawer.get_status_records()
+    assert drawer.get_presence() is False
+    assert drawer.get_status() is False
@@ -0,0 +1,109 @@
+import errno
+
+import pytest
+
+from sonic_platform import fpga
+from sonic_platform.i2c_dev import FakeSmbusDevice, SmbusDevice, SysfsRegisterDevice, I2C_SMBUS_BLOCK_MAX
+
+
+class SmbusOnlyDevice(FakeSmbusDevice):
+    """
+    Adapter without plain I2C transfers, limited to SMBus block reads
+    """
+
+    def supports_i2c(self):
+        return False
+
+    def read_i2c_data(self, reg, length):
+        raise AssertionError("I2C_RDWR used on an SMBus-only adapter")
+
+
+@pytest.fixture
+def registers():
+    return dict((reg, reg) for reg in range(256))
+
+
+def _install(device):
+    saved = fpga.set_device(device)
+    return saved
+
+
+def test_status_bank_in_one_transfer(registers):
+    device = FakeSmbusDevice(registers)
+    saved = _install(device)
+    try:
+        bank = fpga.read_bank(fpga.FAN_STATUS_BANK, cached=False)
+    finally:
+        fpga.set_device(saved)
+    assert fpga.FAN_STATUS_BANK.length > I2C_SMBUS_BLOCK_MAX
+    assert device.transactions == 1
+    assert bytes(bank) == bytes(range(0x04, 0x04 + fpga.FAN_STATUS_BANK.length))
+
+
+def test_status_bank_chunked_without_i2c(registers):
+    device = SmbusOnlyDevice(registers)
+    saved = _install(device)
+    try:
+        bank = fpga.read_bank(fpga.FAN_STATUS_BANK, cached=False)
+    finally:
+        fpga.set_device(saved)
+    assert device.transactions == 2
+    assert bytes(bank) == bytes(range(0x04, 0x04 + fpga.FAN_STATUS_BANK.length))
+
+
+def test_read_error_propagates(registers):
+    device = FakeSmbusDevice(registers, fail_regs={0x04})
+    saved = _install(device)
+    try:
+        with pytest.raises(IOError):
+            fpga.read_bank(fpga.FAN_STATUS_BANK, cached=False)
+        # Nothing is cached from a failed read
+        with pytest.raises(IOError):
+            fpga.read_bank(fpga.FAN_STATUS_BANK)
+    finally:
+        fpga.set_device(saved)
+
+
+class FakePddf(object):
+
+    def __init__(self, attrs):
+        self.data = {'SYSSTATUS': {'attr_list': attrs}}
+
+
+def test_resolve_sysfs_registers():
+    pddf = FakePddf([
+        {'attr_name': 'fpga_temp1', 'attr_devaddr': '0x32', 'attr_offset': '0x40', 'attr_mask': '0xff'},
+        # Not a whole register, or another device
+        {'attr_name': 'fpga_alarm', 'attr_devaddr': '0x32', 'attr_offset': '0x41', 'attr_mask': '0x1'},
+        {'attr_name': 'cpld_ver', 'attr_devaddr': '0x60', 'attr_offset': '0x40', 'attr_mask': '0xff'},
+    ])
+    assert fpga.resolve_sysfs_registers(pddf) == {0x40: fpga.PDDF_SYSSTATUS_PATH.format('fpga_temp1')}
+    assert fpga.resolve_sysfs_registers(object()) == {}
+
+
+def test_busy_address_read_through_sysfs(tmp_path, monkeypatch):
+    registers = {}
+    for reg, value in ((0x40, '0x1e'), (0x41, '0x20')):
+        path = tmp_path / hex(reg)
+        path.write_text(value + '\n')
+        registers[reg] = str(path)
+
+    def open_handle(device):
+        assert not device.force
+        raise IOError(errno.EBUSY, 'Device or resource busy')
+
+    monkeypatch.setattr(SmbusDevice, 'open_handle', open_handle)
+    monkeypatch.setattr(fpga, 'sysfs_registers', registers)
+    saved = fpga.set_device(None)
+    try:
+        device = fpga.get_device()
+        assert isinstance(device, SysfsRegisterDevice)
+        assert fpga.read_block(0x40, 2) == b'\x1e\x20'
+        assert fpga.read_byte(0x41, cached=False) == 0x20
+        # Registers the driver does not expose, and writes, fail
+        with pytest.raises(IOError):
+            fpga.read_block(0x40, 3)
+        with pytest.raises(IOError):
+            fpga.write_byte(0x40, 0)
+    finally:
+        fpga.set_device(saved)
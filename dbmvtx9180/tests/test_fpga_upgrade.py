@@ -0,0 +1,85 @@
+import os
+import sys
+
+import pytest
+
+pytest.importorskip('sonic_platform_base')
+pytest.importorskip('sonic_platform_pddf_base')
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'benchmarks'))
+
+from fakes import FakeFlashFpga, FAKE_REGISTER_MAP, FakePlatform
+
+from sonic_platform import fpga
+from sonic_platform.fpga_upgrade import FpgaProgrammer, FpgaUpgradeError, get_register_map
+
+NUM_PAGES = 40
+
+
+@pytest.fixture
+def image(tmp_path):
+    data = os.urandom(NUM_PAGES * FAKE_REGISTER_MAP['page_size'] - 7)
+    path = tmp_path / 'fpga.bin'
+    path.write_bytes(data)
+    return str(path), data
+
+
+@pytest.fixture
+def device():
+    device = FakeFlashFpga((NUM_PAGES + 1) * FAKE_REGISTER_MAP['page_size'])
+    saved = fpga.set_device(device)
+    yield device
+    fpga.set_device(saved)
+
+
+def _programmer(tmp_path):
+    return FpgaProgrammer(get_register_map({'FPGA': {'upgrade': FAKE_REGISTER_MAP}}),
+                          state_path=str(tmp_path / 'state.json'))
+
+
+def test_no_register_map():
+    assert get_register_map({}) is None
+    assert get_register_map({'FPGA': {}}) is None
+    with pytest.raises(ValueError):
+        get_register_map({'FPGA': {'upgrade': {'page_size': 128}}})
+
+
+def test_program_and_verify(tmp_path, image, device):
+    path, data = image
+    assert _programmer(tmp_path).program(path) == NUM_PAGES
+    assert bytes(device.flash[:len(data)]) == data
+    assert not device.upgrade_mode
+    assert not os.path.exists(str(tmp_path / 'state.json'))
+
+
+def test_interrupted_upgrade_leaves_upgrade_mode_and_resumes(tmp_path, image, device):
+    path, data = image
+    device.fail_after_pages = 20
+    with pytest.raises(IOError):
+        _programmer(tmp_path).program(path)
+    assert not device.upgrade_mode
+
+    device.fail_after_pages = None
+    assert _programmer(tmp_path).program(path) == NUM_PAGES - 20
+    assert bytes(device.flash[:len(data)]) == data
+    assert not device.upgrade_mode
+
+
+def test_verification_failure_leaves_upgrade_mode(tmp_path, image, device, monkeypatch):
+    path, _ = image
+    programmer = _programmer(tmp_path)
+    monkeypatch.setattr(programmer, '_read_page', lambda page: b'')
+    with pytest.raises(FpgaUpgradeError):
+        programmer.program(path)
+    assert not device.upgrade_mode
+
+
+def test_install_firmware_unsupported_without_register_map(image, capsys):
+    path, _ = image
+    with FakePlatform() as platform:
+        platform.plugin_data = dict(platform.plugin_data)
+        del platform.plugin_data['FPGA']
+        component = [c for c in platform.create_chassis().get_all_components()
+                     if c.get_name() == 'SysFPGA'][0]
+        assert component.install_firmware(path) is False
+    assert 'not supported' in capsys.readouterr().out
@@ -0,0 +1,105 @@
+import os
+import signal
+import threading
+
+import pytest
+
+from sonic_platform import fpga
+from sonic_platform import i2c_scheduler
+from sonic_platform.i2c_dev import FakeSmbusDevice
+
+# Seconds a forked child may take before it counts as deadlocked
+CHILD_TIMEOUT = 5
+
+
+def _in_child(func):
+    """
+    Run <func> in a forked child; it passes if func returns True in time
+    """
+    pid = os.fork()
+    if pid == 0:
+        code = 1
+        try:
+            signal.alarm(CHILD_TIMEOUT)
+            code = 0 if func() else 1
+        finally:
+            os._exit(code)
+    _, status = os.waitpid(pid, 0)
+    return os.WIFEXITED(status) and os.WEXITSTATUS(status) == 0
+
+
+@pytest.fixture
+def scheduler(tmp_path):
+    bus = 1000
+    scheduler = i2c_scheduler.BusScheduler(bus, lock_path=str(tmp_path / 'bus{}.lock'))
+    i2c_scheduler._schedulers[bus] = scheduler
+    return scheduler
+
+
+@pytest.fixture
+def fake_fpga():
+    device = FakeSmbusDevice({0x00: 0x12, 0x20: 0x2e})
+    saved = fpga.set_device(device)
+    yield device
+    fpga.set_device(saved)
+
+
+def test_run_in_priority_order(scheduler):
+    order = []
+    gate = threading.Event()
+    blocker = scheduler.submit(gate.wait)
+    futures = [scheduler.submit(lambda p=p: order.append(p), p)
+               for p in (i2c_scheduler.PRIORITY_INVENTORY, i2c_scheduler.PRIORITY_PRESENCE,
+                         i2c_scheduler.PRIORITY_THERMAL)]
+    gate.set()
+    blocker.result()
+    for future in futures:
+        future.result()
+    assert order == [i2c_scheduler.PRIORITY_PRESENCE, i2c_scheduler.PRIORITY_THERMAL,
+                     i2c_scheduler.PRIORITY_INVENTORY]
+
+
+def test_identical_reads_coalesce(scheduler):
+    gate = threading.Event()
+    blocker = scheduler.submit(gate.wait)
+    first = scheduler.submit(lambda: 1, key='read')
+    second = scheduler.submit(lambda: 2, key='read')
+    gate.set()
+    blocker.result()
+    assert first is second
+    assert second.result() == 1
+    assert scheduler.get_metrics()['coalesced'] == 1
+
+
+def test_run_after_fork(scheduler):
+    assert scheduler.run(lambda: 'parent') == 'parent'
+    assert _in_child(lambda: scheduler.run(lambda: 'child') == 'child')
+    # The parent's worker is unaffected
+    assert scheduler.run(lambda: 'parent') == 'parent'
+
+
+def test_fork_while_worker_busy(scheduler):
+    started = threading.Event()
+    gate = threading.Event()
+
+    def busy():
+        started.set()
+        gate.wait()
+
+    future = scheduler.submit(busy)
+    started.wait()
+    # The child also waits for the parent's transaction, through the bus lock file
+    release = threading.Timer(0.2, gate.set)
+    release.start()
+    try:
+        assert _in_child(lambda: scheduler.run(lambda: True))
+    finally:
+        release.cancel()
+        gate.set()
+    future.result()
+
+
+def test_fpga_read_after_fork(fake_fpga):
+    assert fpga.read_byte(0x00, cached=False) == 0x12
+    assert _in_child(lambda: fpga.read_byte(0x20, cached=False) == 0x2e and
+                     fpga.read_bank(fpga.FAN_STATUS_BANK, cached=False)[fpga.FAN_STATUS_BANK.offset(0x20)] == 0x2e)
@@ -0,0 +1,109 @@
+import json
+import os
+import threading
+import time
+
+import pytest
+
+from sonic_platform import instrumentation
+
+INTERVAL = 0.05
+
+
+def _wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(INTERVAL / 5)
+    return True
+
+
+def _dead_pid():
+    pid = os.fork()
+    if pid == 0:
+        os._exit(0)
+    os.waitpid(pid, 0)
+    return pid
+
+
+@pytest.fixture
+def dump_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(instrumentation, 'CONTROL_PATH', str(tmp_path / 'control'))
+    monkeypatch.setattr(instrumentation, 'DUMP_PATH', str(tmp_path / 'dumps' / 'instrumentation-{pid}.json'))
+    monkeypatch.setattr(instrumentation, 'CHECK_INTERVAL', INTERVAL)
+    instrumentation.follow_control_file()
+    instrumentation.reset()
+    yield tmp_path / 'dumps'
+    instrumentation.disable()
+    instrumentation.is_enabled()
+    _wait_for(lambda: instrumentation._dump_thread is None)
+    instrumentation.follow_control_file()
+    instrumentation.reset()
+
+
+def test_off_by_default(dump_dir):
+    assert not instrumentation.is_enabled()
+    assert instrumentation._dump_thread is None
+
+
+def test_dump_off_the_caller_path(dump_dir, monkeypatch):
+    callers = []
+    monkeypatch.setattr(instrumentation, 'dump_json', lambda: callers.append(threading.current_thread()))
+    instrumentation.enable()
+    deadline = time.monotonic() + INTERVAL * 5
+    while time.monotonic() < deadline:
+        assert instrumentation.is_enabled()
+        time.sleep(INTERVAL / 10)
+    assert callers
+    assert threading.current_thread() not in callers
+
+
+def test_dump_written_and_thread_stops(dump_dir):
+    instrumentation.enable()
+    assert instrumentation.is_enabled()
+    instrumentation.record(instrumentation.KIND_FPGA, '0x20+14', 0.0002)
+    path = dump_dir / 'instrumentation-{}.json'.format(os.getpid())
+    assert _wait_for(path.exists)
+    with open(str(path)) as f:
+        data = json.load(f)
+    assert data['pid'] == os.getpid()
+    assert data['stats']['fpga']['0x20+14']['count'] == 1
+
+    instrumentation.disable()
+    assert not instrumentation.is_enabled()
+    assert _wait_for(lambda: instrumentation._dump_thread is None)
+
+
+def test_follows_control_file(dump_dir, tmp_path):
+    (tmp_path / 'control').write_text('')
+    instrumentation._next_check = 0.0
+    assert instrumentation.is_enabled()
+    assert instrumentation._dump_thread is not None
+    os.remove(str(tmp_path / 'control'))
+    assert _wait_for(lambda: instrumentation._dump_thread is None)
+    assert not instrumentation.is_enabled()
+
+
+def test_dumps_of_exited_processes_pruned(dump_dir):
+    dump_dir.mkdir()
+    dead = _dead_pid()
+    for name in ('instrumentation-{}.json'.format(dead), 'instrumentation-{}.json.tmp'.format(dead),
+                 'instrumentation-1.json', 'unrelated.json'):
+        (dump_dir / name).write_text('{}')
+
+    instrumentation.dump_json()
+    assert sorted(os.listdir(str(dump_dir))) == sorted([
+        'instrumentation-1.json', 'instrumentation-{}.json'.format(os.getpid()), 'unrelated.json'])
+
+
+def test_forked_child_starts_afresh(dump_dir):
+    instrumentation.enable()
+    assert instrumentation.is_enabled()
+    instrumentation.record(instrumentation.KIND_SYSFS, '/sys/x', 0.001)
+    pid = os.fork()
+    if pid == 0:
+        ok = instrumentation._dump_thread is None and instrumentation.dump() == {}
+        os._exit(0 if ok else 1)
+    _, status = os.waitpid(pid, 0)
+    assert os.WIFEXITED(status) and os.WEXITSTATUS(status) == 0
@@ -0,0 +1,111 @@
+import os
+import sys
+
+import pytest
+
+pytest.importorskip('sonic_platform_base')
+pytest.importorskip('sonic_platform_pddf_base')
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'benchmarks'))
+
+from fakes import FakePlatform
+
+
+@pytest.fixture
+def platform():
+    with FakePlatform() as platform:
+        yield platform
+
+
+def test_presence_from_sysfs(platform):
+    psu = platform.create_chassis().get_all_psus()[0]
+    assert psu.get_presence()
+    platform.set_psu_presence(1, False)
+    assert not psu.get_presence()
+
+
+def test_fru_cached_while_present(platform):
+    psu = platform.create_chassis().get_all_psus()[0]
+    assert psu.get_presence()
+    assert psu.get_serial() == "SN0001"
+    platform.set_psu_fru(1, serial="SN0099")
+    assert psu.get_presence()
+    assert psu.get_serial() == "SN0001"
+
+
+def test_fru_parsed_again_after_swap(platform):
+    psu = platform.create_chassis().get_all_psus()[0]
+    assert psu.get_presence()
+    assert psu.get_serial() == "SN0001"
+
+    # PSU pulled, then a different one inserted
+    platform.set_psu_presence(1, False)
+    assert not psu.get_presence()
+    platform.set_psu_fru(1, serial="SN0099")
+    platform.set_psu_presence(1, True)
+    assert psu.get_presence()
+
+    assert psu.get_serial() == "SN0099"
+    # The other PSU is untouched
+    assert platform.create_chassis().get_all_psus()[1].get_serial() == "SN0002"
+
+
+def test_no_presence_attribute(platform):
+    os.remove(os.path.join(platform.root, 'PSU1', 'psu_present'))
+    psu = platform.create_chassis().get_all_psus()[0]
+    assert psu.get_presence()
+
+
+def _plugin_data(platform, **entry):
+    plugin_data = dict(platform.plugin_data)
+    psu = dict(plugin_data['PSU'])
+    psu['psu_support_list'] = [dict(psu['psu_support_list'][0], **entry)]
+    plugin_data['PSU'] = psu
+    return plugin_data
+
+
+def test_model_table_before_fru(platform):
+    # The FRU power supply record says 1300 W AC
+    platform.plugin_data = _plugin_data(platform, Type='DC', Capacity='1600')
+    psu = platform.create_chassis().get_all_psus()[0]
+    assert psu.get_type() == 'DC'
+    assert psu.get_capacity() == 1600.0
+
+
+def test_fru_when_model_unknown(platform):
+    platform.plugin_data = _plugin_data(platform, Type='DC', Capacity='1600')
+    platform.set_psu_fru(1, model="DPS-9999")
+    psu = platform.create_chassis().get_all_psus()[0]
+    assert psu.get_type() == 'AC'
+    assert psu.get_capacity() == 1300.0
+
+
+def test_fru_when_model_has_no_capacity(platform):
+    psu = platform.create_chassis().get_all_psus()[0]
+    assert psu.get_type() == 'AC'
+    assert psu.get_capacity() == 1300.0
+
+
+def test_fru_memo_per_presence_generation(platform):
+    from sonic_platform import psu_fru
+    psus = platform.create_chassis().get_all_psus()
+    for psu in psus:
+        assert psu.get_presence()
+        psu.get_serial()
+
+    # Another PsuFru of the same PSU generation does no I/O
+    eeprom = psu_fru.get_psu_fru(1).eeprom
+    os.rename(eeprom, eeprom + '.saved')
+    assert psu_fru.PsuFru(1).serial == "SN0001"
+    os.rename(eeprom + '.saved', eeprom)
+
+    # Swaps replace the entry of their PSU, the memo stays one entry per PSU
+    for serial in ("SN0099", "SN0100", "SN0101"):
+        platform.set_psu_presence(1, False)
+        assert not psus[0].get_presence()
+        assert 1 not in psu_fru._area_memo
+        platform.set_psu_fru(1, serial=serial)
+        platform.set_psu_presence(1, True)
+        assert psus[0].get_presence()
+        assert psus[0].get_serial() == serial
+    assert len(psu_fru._area_memo) <= len(psus)
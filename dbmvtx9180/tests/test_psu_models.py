@@ -0,0 +1,79 @@
+import pytest
+
+from sonic_platform.psu_models import PsuModelTable, PsuModelError, get_model_table, lookup_psu_model, \
+    normalize_key
+
+PSU_PLUGIN_DATA = {
+    'valmap': {'PSU_FAN_MAX_SPEED': '18000', 'PSU_FAN_MAX_SPEED_B': '21000', 'DEFAULT_TYPE': 'AC'},
+    'psu_support_list': [
+        {'Manufacturer': 'DELTA', 'Name': 'DPS-1300AB-6', 'MaxSpd': 'PSU_FAN_MAX_SPEED',
+         'Dir': 'exhaust', 'Type': 'AC', 'Capacity': '1300'},
+        {'Manufacturer': 'DELTA', 'Name': 'DPS-1300AB-6 ', 'MaxSpd': 'PSU_FAN_MAX_SPEED_B',
+         'Dir': 'intake', 'Type': 'DC'},
+        {'Manufacturer': 'ACBEL', 'Name': 'FSJ038', 'Dir': 'intake', 'Type': 'DC'},
+    ],
+}
+
+
+class FakeFru(object):
+
+    def __init__(self, mfr_id, model):
+        self.mfr_id = mfr_id
+        self.model = model
+
+
+def test_normalize_key():
+    assert normalize_key('DELTA', 'DPS-1300AB-6') == ('DELTA', 'DPS-1300AB-6')
+    # FRU fields are space padded
+    assert normalize_key(' DELTA  ', 'DPS-1300AB-6   ') == ('DELTA', 'DPS-1300AB-6')
+    assert normalize_key(None, None) == ('', '')
+    # Case is significant
+    assert normalize_key('delta', 'x') != normalize_key('DELTA', 'x')
+
+
+def test_lookup():
+    table = PsuModelTable(PSU_PLUGIN_DATA)
+    assert len(table) == 2
+    assert table.default_type == 'AC'
+    assert table.default_max_speed == 18000
+
+    model = table.lookup('DELTA    ', 'DPS-1300AB-6    ')
+    assert model.type == 'AC'
+    assert model.direction == 'exhaust'
+    assert model.max_speed == 18000
+    assert model.capacity == 1300.0
+
+    # Without MaxSpd the default speed applies, without Capacity it is unknown
+    model = table.lookup('ACBEL', 'FSJ038')
+    assert model.max_speed == 18000
+    assert model.capacity is None
+
+    assert table.lookup('DELTA', 'DPS-2000') is None
+    assert table.lookup('', '') is None
+
+
+def test_first_entry_wins():
+    # The padded duplicate of the DELTA entry is ignored
+    model = PsuModelTable(PSU_PLUGIN_DATA).lookup('DELTA', 'DPS-1300AB-6')
+    assert model.type == 'AC'
+    assert model.max_speed == 18000
+
+
+def test_table_compiled_once():
+    plugin_data = {'PSU': PSU_PLUGIN_DATA}
+    table = get_model_table(plugin_data)
+    assert get_model_table(plugin_data) is table
+    assert get_model_table({'PSU': dict(PSU_PLUGIN_DATA)}) is not table
+    assert lookup_psu_model({'PSU': PSU_PLUGIN_DATA}, FakeFru('ACBEL ', 'FSJ038 ')).type == 'DC'
+
+
+@pytest.mark.parametrize('valmap, entry', [
+    # No default PSU fan speed
+    ({'DEFAULT_TYPE': 'AC'}, {'Manufacturer': 'ACBEL', 'Name': 'FSJ038'}),
+    # An entry naming a speed the valmap lacks
+    ({'PSU_FAN_MAX_SPEED': '18000'}, {'Manufacturer': 'ACBEL', 'Name': 'FSJ038', 'MaxSpd': 'PSU_FAN_MAX_SPEED_X'}),
+    ({'PSU_FAN_MAX_SPEED': 'fast'}, {'Manufacturer': 'ACBEL', 'Name': 'FSJ038'}),
+])
+def test_missing_max_speed_rejected(valmap, entry):
+    with pytest.raises(PsuModelError):
+        PsuModelTable({'valmap': valmap, 'psu_support_list': [entry]})
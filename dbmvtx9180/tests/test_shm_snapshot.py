@@ -0,0 +1,307 @@
+import os
+import signal
+import struct
+import time
+from collections import namedtuple
+
+import pytest
+
+from sonic_platform import fpga
+from sonic_platform import shm_snapshot
+from sonic_platform.i2c_dev import FakeSmbusDevice
+
+FAN_STATUS_BANK = fpga.FAN_STATUS_BANK
+THERMAL_BANK = fpga.THERMAL_BANK
+THERMAL_THRESHOLD_BANK = fpga.THERMAL_THRESHOLD_BANK
+
+# Seconds a forked child may take before it counts as hung
+CHILD_TIMEOUT = 10
+
+Snapshot = namedtuple('Snapshot', ['timestamp', 'voltage', 'current', 'power', 'temperature', 'fan_rpm', 'status'])
+
+
+class FakePsu(object):
+
+    def __init__(self, device):
+        self.device = device
+
+    def get_snapshot(self):
+        # Derived from the same register as the banks, to check coherence
+        value = self.device.regs[FAN_STATUS_BANK.base]
+        return Snapshot(time.monotonic(), float(value), 1.5, None, 30.0, (value * 100, None), True)
+
+
+class FakeChassis(object):
+
+    def __init__(self, psus):
+        self.psus = psus
+
+    def get_all_psus(self):
+        return self.psus
+
+
+def _fork(func):
+    pid = os.fork()
+    if pid == 0:
+        code = 1
+        try:
+            signal.alarm(CHILD_TIMEOUT)
+            code = 0 if func() else 1
+        finally:
+            os._exit(code)
+    return pid
+
+
+def _wait(pid):
+    _, status = os.waitpid(pid, 0)
+    return os.WIFEXITED(status) and os.WEXITSTATUS(status) == 0
+
+
+def _fill(device, value):
+    for bank in shm_snapshot.PUBLISHED_BANKS:
+        device.regs[bank.base:bank.base + bank.length] = bytes([value]) * bank.length
+
+
+@pytest.fixture
+def device():
+    device = FakeSmbusDevice()
+    _fill(device, 1)
+    saved = fpga.set_device(device)
+    yield device
+    fpga.set_device(saved)
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / 'snapshot')
+
+
+def _publisher(device, path, interval=1.0):
+    return shm_snapshot.SnapshotPublisher(FakeChassis([FakePsu(device), FakePsu(device)]), interval, path)
+
+
+def _seq(path):
+    with open(path, 'rb') as f:
+        return struct.unpack_from('<I', f.read(), shm_snapshot._SEQ_OFFSET)[0]
+
+
+def _poke(path, offset, data):
+    with open(path, 'r+b') as f:
+        f.seek(offset)
+        f.write(data)
+
+
+def test_round_trip(device, path):
+    publisher = _publisher(device, path)
+    assert publisher.open()
+    _fill(device, 7)
+    publisher.publish()
+
+    reader = shm_snapshot.SnapshotReader(path)
+    assert bytes(reader.read_bank(FAN_STATUS_BANK)) == b'\x07' * FAN_STATUS_BANK.length
+    assert bytes(reader.read_bank(THERMAL_BANK)) == b'\x07' * THERMAL_BANK.length
+    assert bytes(reader.read_bank(THERMAL_THRESHOLD_BANK)) == b'\x07'
+    timestamp, voltage, current, power, temperature, fan_rpm, status = reader.read_psu(2)
+    assert (voltage, current, power, temperature, fan_rpm, status) == (7.0, 1.5, None, 30.0, (700, None), True)
+    assert reader.read_psu(3) is None
+    publisher.close()
+
+
+def test_fresh_snapshot_not_decoded_again(device, path):
+    publisher = _publisher(device, path)
+    assert publisher.open()
+    publisher.publish()
+    reader = shm_snapshot.SnapshotReader(path)
+    first = reader.read_bank(FAN_STATUS_BANK)
+    assert reader._load()[1] is reader._payload
+    assert reader.read_bank(FAN_STATUS_BANK) == first
+    publisher.close()
+
+
+def test_torn_write_rejected(device, path):
+    publisher = _publisher(device, path)
+    assert publisher.open()
+    publisher.publish()
+    reader = shm_snapshot.SnapshotReader(path)
+    assert reader.read_bank(FAN_STATUS_BANK) is not None
+
+    # Publisher stopped between the two sequence updates
+    seq = _seq(path)
+    _poke(path, shm_snapshot._SEQ_OFFSET, struct.pack('<I', seq + 1))
+    assert reader.read_bank(FAN_STATUS_BANK) is None
+    assert reader.read_psu(1) is None
+
+    # Payload changed under an even sequence: the crc does not match
+    _poke(path, shm_snapshot._SEQ_OFFSET, struct.pack('<I', seq + 2))
+    _poke(path, shm_snapshot._BANKS_OFFSET + 1, b'\x55')
+    assert reader.read_bank(FAN_STATUS_BANK) is None
+
+    # The next complete publication is served again
+    publisher.close()
+    assert publisher.open()
+    _fill(device, 9)
+    publisher.publish()
+    assert bytes(reader.read_bank(FAN_STATUS_BANK)) == b'\x09' * FAN_STATUS_BANK.length
+    publisher.close()
+
+
+def test_stale_snapshot(device, path):
+    publisher = _publisher(device, path, interval=0.02)
+    assert publisher.open()
+    publisher.publish()
+    reader = shm_snapshot.SnapshotReader(path)
+    assert reader.read_psu(1) is not None
+    time.sleep(0.02 * shm_snapshot.MAX_AGE_INTERVALS + 0.02)
+    assert reader.read_bank(FAN_STATUS_BANK) is None
+    assert reader.read_psu(1) is None
+    publisher.close()
+
+
+def test_other_version_rejected(device, path):
+    publisher = _publisher(device, path)
+    assert publisher.open()
+    publisher.publish()
+    _poke(path, 4, struct.pack('<H', shm_snapshot.SNAPSHOT_VERSION + 1))
+    assert shm_snapshot.SnapshotReader(path).read_bank(FAN_STATUS_BANK) is None
+    publisher.close()
+
+
+def test_no_snapshot_file(path):
+    reader = shm_snapshot.SnapshotReader(path)
+    assert reader.read_bank(FAN_STATUS_BANK) is None
+    assert reader.read_psu(1) is None
+
+
+def test_forked_writer_and_readers(device, path):
+    """
+    Readers in other processes only ever see whole publications while a
+    writer process publishes back to back
+    """
+    publications = 300
+    last = (publications - 1) % 250 + 1
+    # Created up front so that no reader waits for REOPEN_INTERVAL
+    publisher = _publisher(device, path)
+    assert publisher.open()
+    publisher.publish()
+    publisher.close()
+
+    def writer():
+        publisher = _publisher(device, path)
+        if not publisher.open():
+            return False
+        for i in range(publications):
+            _fill(device, i % 250 + 1)
+            publisher.publish()
+        publisher.close()
+        return True
+
+    def reader():
+        reader = shm_snapshot.SnapshotReader(path)
+        seen = set()
+        deadline = time.monotonic() + CHILD_TIMEOUT / 2.0
+        while time.monotonic() < deadline and last not in seen:
+            data = reader.read_bank(FAN_STATUS_BANK)
+            if data is not None:
+                if len(set(bytes(data))) != 1:
+                    return False
+                seen.add(data[0])
+            psu = reader.read_psu(1)
+            if psu is not None and psu[5][0] != psu[1] * 100:
+                return False
+        return last in seen
+
+    readers = [_fork(reader) for _ in range(4)]
+    writer_pid = _fork(writer)
+    assert _wait(writer_pid)
+    assert all([_wait(pid) for pid in readers])
+
+
+def test_publisher_crash_and_restart(device, path):
+    publisher = _publisher(device, path)
+
+    def crashed_publisher():
+        if not publisher.open():
+            return False
+        publisher.publish()
+        # Dies between the two sequence updates, with the writer lock held
+        seq = publisher._seq + 1
+        struct.pack_into('<I', publisher._mm, shm_snapshot._SEQ_OFFSET, seq)
+        os.kill(os.getpid(), signal.SIGKILL)
+
+    pid = _fork(crashed_publisher)
+    os.waitpid(pid, 0)
+    crashed_seq = _seq(path)
+    assert crashed_seq & 1
+
+    reader = shm_snapshot.SnapshotReader(path)
+    assert reader.read_bank(FAN_STATUS_BANK) is None
+
+    # The lock died with the publisher, a new one takes over
+    assert publisher.open()
+    _fill(device, 42)
+    publisher.publish()
+    assert _seq(path) > crashed_seq and not _seq(path) & 1
+    assert bytes(reader.read_bank(FAN_STATUS_BANK)) == b'\x2a' * FAN_STATUS_BANK.length
+    publisher.close()
+
+
+def test_single_publisher(device, path):
+    publisher = _publisher(device, path)
+    assert publisher.open()
+
+    def second_publisher():
+        return not _publisher(device, path).open()
+
+    assert _wait(_fork(second_publisher))
+    publisher.close()
+    assert _wait(_fork(lambda: _publisher(device, path).open()))
+
+
+def test_file_created_with_fixed_mode(device, path):
+    umask = os.umask(0o077)
+    try:
+        publisher = _publisher(device, path)
+        assert publisher.open()
+    finally:
+        os.umask(umask)
+    assert os.stat(path).st_mode & 0o777 == shm_snapshot.SNAPSHOT_MODE
+    publisher.close()
+
+
+def test_untrusted_file_replaced(device, path, tmp_path):
+    # Held open, so that its inode is not reused by the new file
+    planted = open(path, 'wb')
+    planted.write(b'\0' * shm_snapshot.SNAPSHOT_SIZE)
+    planted.flush()
+    os.chmod(path, 0o666)
+    publisher = _publisher(device, path)
+    assert publisher.open()
+    assert os.stat(path).st_ino != os.fstat(planted.fileno()).st_ino
+    assert os.stat(path).st_mode & 0o777 == shm_snapshot.SNAPSHOT_MODE
+    publisher.close()
+    planted.close()
+
+    # A symlink is removed, its target left alone
+    target = tmp_path / 'target'
+    target.write_bytes(b'keep')
+    os.unlink(path)
+    os.symlink(str(target), path)
+    assert publisher.open()
+    assert not os.path.islink(path)
+    assert target.read_bytes() == b'keep'
+    publisher.close()
+
+
+def test_reader_rejects_untrusted_file(device, path, monkeypatch):
+    publisher = _publisher(device, path)
+    assert publisher.open()
+    publisher.publish()
+    monkeypatch.setattr(shm_snapshot, 'SNAPSHOT_OWNER_UID', os.geteuid())
+    assert shm_snapshot.SnapshotReader(path).read_bank(FAN_STATUS_BANK) is not None
+
+    os.chmod(path, 0o646)
+    assert shm_snapshot.SnapshotReader(path).read_bank(FAN_STATUS_BANK) is None
+    os.chmod(path, 0o644)
+    monkeypatch.setattr(shm_snapshot, 'SNAPSHOT_OWNER_UID', os.geteuid() + 1)
+    assert shm_snapshot.SnapshotReader(path).read_bank(FAN_STATUS_BANK) is None
+    publisher.close()
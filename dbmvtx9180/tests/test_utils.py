@@ -0,0 +1,73 @@
+import os
+import time
+import signal
+
+import pytest
+
+from sonic_platform import utils
+
+# Seconds a forked child may take before it counts as deadlocked
+CHILD_TIMEOUT = 5
+
+
+def _in_child(func):
+    """
+    Run <func> in a forked child; it passes if func returns True in time
+    """
+    pid = os.fork()
+    if pid == 0:
+        code = 1
+        try:
+            signal.alarm(CHILD_TIMEOUT)
+            code = 0 if func() else 1
+        finally:
+            os._exit(code)
+    _, status = os.waitpid(pid, 0)
+    return os.WIFEXITED(status) and os.WEXITSTATUS(status) == 0
+
+
+def _write(tmp_path, name, value):
+    path = tmp_path / name
+    path.write_text(value)
+    return str(path)
+
+
+def test_fread_bulk_after_fork(tmp_path):
+    paths = [_write(tmp_path, 'attr{}'.format(i), '{}\n'.format(i)) for i in range(2)]
+    requests = [(path, int) for path in paths]
+    # Start the pool's workers in the parent
+    assert utils.fread_bulk(requests)[0] == dict((path, i) for i, path in enumerate(paths))
+    # Let the workers go idle: the pool then hands the child's reads to
+    # them instead of starting new ones
+    time.sleep(0.1)
+
+    def child():
+        values, errors = utils.fread_bulk(requests)
+        return values == dict((path, i) for i, path in enumerate(paths)) and not errors
+
+    assert _in_child(child)
+
+
+def _bad_converter(value):
+    raise TypeError("cannot convert {}".format(value))
+
+
+@pytest.mark.parametrize('count', [1, 3])
+def test_fread_bulk_errors_per_file(tmp_path, count):
+    good = [(_write(tmp_path, 'good{}'.format(i), ' {}\n'.format(i)), int) for i in range(count)]
+    binary = tmp_path / 'binary'
+    binary.write_bytes(b'\xff\xfe\x00')
+    bad = [
+        (str(tmp_path / 'missing'), int),
+        (_write(tmp_path, 'text', 'abc'), int),
+        (str(binary), str),
+        (_write(tmp_path, 'other', '1'), _bad_converter),
+    ]
+    for request in bad:
+        values, errors = utils.fread_bulk(good + [request])
+        assert values == dict((path, i) for i, (path, _) in enumerate(good))
+        assert list(errors) == [request[0]]
+
+    values, errors = utils.fread_bulk(bad[-1:])
+    assert values == {}
+    assert 'TypeError' in errors[bad[-1][0]]
@@ -0,0 +1,78 @@
+import pytest
+
+pytest.importorskip('sonic_platform_base')
+pytest.importorskip('sonic_py_common')
+
+from sonic_platform import watchdog
+
+
+class FakeWatchdog(watchdog.WatchdogImplBase):
+    """
+    Watchdog whose ioctls are recorded instead of issued
+    """
+
+    def __init__(self):
+        self.calls = []
+        watchdog.WatchdogImplBase.__init__(self, '/dev/null')
+
+    def _gettimeout(self):
+        return 0
+
+    def _settimeout(self, seconds):
+        self.calls.append(('settimeout', seconds))
+        return seconds
+
+    def _enablewatchdog(self):
+        self.calls.append(('enable',))
+
+    def _disablewatchdog(self):
+        self.calls.append(('disable', self._keepalive_thread))
+
+    def _keepalive(self):
+        self.calls.append(('keepalive',))
+
+    def is_armed(self):
+        return bool(self._armed)
+
+
+@pytest.fixture
+def wd():
+    wd = FakeWatchdog()
+    yield wd
+    wd.stop_keepalive()
+
+
+def test_keepalive_follows_shorter_timeout(wd):
+    assert wd.arm(180) == 180
+    assert wd.start_keepalive()
+    assert wd.get_keepalive_stats()['interval'] == 60
+
+    assert wd.arm(30) == 30
+    assert wd._keepalive_thread is not None
+    assert wd.get_keepalive_stats()['interval'] == 10
+
+
+def test_rearm_with_same_timeout_keeps_thread(wd):
+    wd.arm(30)
+    wd.start_keepalive()
+    thread = wd._keepalive_thread
+    wd.arm(30)
+    assert wd._keepalive_thread is thread
+
+
+def test_explicit_interval_kept_unless_too_long(wd):
+    wd.arm(180)
+    wd.start_keepalive(20)
+    assert wd.get_keepalive_stats()['interval'] == 20
+    wd.arm(90)
+    assert wd.get_keepalive_stats()['interval'] == 20
+    wd.arm(15)
+    assert wd.get_keepalive_stats()['interval'] == 5
+
+
+def test_disarm_stops_keepalive_first(wd):
+    wd.arm(30)
+    wd.start_keepalive()
+    assert wd.disarm()
+    assert ('disable', None) in wd.calls
+    assert wd.get_keepalive_stats()['interval'] is None
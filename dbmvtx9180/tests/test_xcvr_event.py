@@ -0,0 +1,33 @@
+from sonic_platform import xcvr_event
+from sonic_platform.xcvr_event import create_event_source, PollingEventSource, SysfsEventSource
+
+
+def test_polling_without_configuration(monkeypatch):
+    def no_uevents(*args, **kwargs):
+        raise AssertionError("uevent listener set up without a filter")
+
+    monkeypatch.setattr(xcvr_event, 'UeventSource', no_uevents)
+    assert isinstance(create_event_source({}), PollingEventSource)
+    assert isinstance(create_event_source({'presence_notify_paths': [], 'presence_uevent_match': []}),
+                      PollingEventSource)
+
+
+def test_uevents_only_with_a_filter(monkeypatch):
+    created = []
+    monkeypatch.setattr(xcvr_event, 'UeventSource', lambda match: created.append(match) or match)
+    assert create_event_source({'presence_uevent_match': ['SUBSYSTEM=i2c']}) == ['SUBSYSTEM=i2c']
+    assert created == [['SUBSYSTEM=i2c']]
+
+
+def test_notify_paths_preferred(tmp_path):
+    path = tmp_path / 'xcvr_present'
+    path.write_text('0\n')
+    source = create_event_source({'presence_notify_paths': [str(path)],
+                                  'presence_uevent_match': ['SUBSYSTEM=i2c']})
+    assert isinstance(source, SysfsEventSource)
+    source.close()
+
+
+def test_polling_when_source_fails(tmp_path):
+    source = create_event_source({'presence_notify_paths': [str(tmp_path / 'missing')]})
+    assert isinstance(source, PollingEventSource)
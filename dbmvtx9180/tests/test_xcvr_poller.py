@@ -0,0 +1,159 @@
+import pytest
+
+from sonic_platform.xcvr_poller import AdaptivePoller, create_poller, TIMER_SLACK, \
+    XCVR_POLL_MIN_INTERVAL, XCVR_POLL_MAX_INTERVAL, XCVR_POLL_DEBOUNCE
+
+
+class FakeClock(object):
+    """
+    Drives a poller on simulated time: every tick scans the current bitmap
+    and then sleeps for next_wait()
+    """
+
+    def __init__(self, poller, bitmap=0):
+        self.poller = poller
+        self.bitmap = bitmap
+        self.now = 0.0
+        self.reported = []
+
+    def tick(self):
+        for index, present in self.poller.update(self.bitmap, self.now):
+            self.reported.append((self.now, index, present))
+        wait = self.poller.next_wait(self.now)
+        self.now += wait
+        return wait
+
+    def run_until(self, t):
+        while self.now < t:
+            self.tick()
+
+
+# Scans per minute of polling at a fixed 1 second period
+FIXED_POLL_SCANS_PER_MINUTE = 60
+
+
+def test_defaults():
+    assert XCVR_POLL_MAX_INTERVAL > 1.0
+    poller = AdaptivePoller()
+    assert poller.min_interval == XCVR_POLL_MIN_INTERVAL
+    assert poller.max_interval == XCVR_POLL_MAX_INTERVAL
+    assert poller.debounce == XCVR_POLL_DEBOUNCE
+
+
+def test_configured_by_plugin_data():
+    poller = create_poller({'poll_min_interval': '0.2', 'poll_max_interval': '5', 'poll_debounce': 0})
+    assert (poller.min_interval, poller.max_interval, poller.debounce) == (0.2, 5.0, 0.0)
+    # The ceiling never drops below the floor
+    assert AdaptivePoller(0.5, 0.1).max_interval == 0.5
+
+
+def test_backoff_while_idle():
+    clock = FakeClock(AdaptivePoller(0.1, 1.0, 0.3))
+    waits = [clock.tick() for _ in range(8)]
+    assert waits == pytest.approx([0.1, 0.2, 0.4, 0.8, 1.0, 1.0, 1.0, 1.0])
+    assert clock.reported == []
+
+
+def test_change_resets_interval():
+    clock = FakeClock(AdaptivePoller(0.1, 1.0, 0.3))
+    clock.run_until(10.0)
+    assert clock.poller.interval == 1.0
+    clock.bitmap = 0b100
+    clock.tick()
+    assert clock.poller.interval == 0.1
+
+
+def test_idle_detection_latency():
+    # A change right after an idle scan is reported within max_interval + debounce
+    for offset in (0.001, 0.5, 0.999):
+        clock = FakeClock(AdaptivePoller(0.1, 1.0, 0.3))
+        clock.run_until(20.0)
+        changed_at = clock.now + offset
+        while clock.now < changed_at:
+            clock.tick()
+        clock.bitmap = 0b1000
+        clock.run_until(changed_at + 5.0)
+        assert clock.reported[0][1:] == (3, True)
+        assert clock.reported[0][0] - changed_at <= 1.0 + 0.3 + TIMER_SLACK
+
+
+def test_change_reported_after_debounce():
+    poller = AdaptivePoller(0.1, 1.0, 0.3)
+    assert poller.update(0b00, 0.0) == []
+    assert poller.update(0b10, 1.0) == []
+    # Scans are paced to end exactly at the debounce deadline
+    assert poller.next_wait(1.0) == pytest.approx(0.1)
+    assert poller.next_wait(1.25) == pytest.approx(0.05)
+    assert poller.update(0b10, 1.2) == []
+    assert poller.update(0b10, 1.3) == [(1, True)]
+    assert poller.get_stats()['events'] == 1
+    assert poller.get_stats()['pending'] == 0
+
+
+def test_flap_suppressed():
+    poller = AdaptivePoller(0.1, 1.0, 0.3)
+    poller.update(0b10, 0.0)
+    assert poller.update(0b00, 1.0) == []
+    assert poller.update(0b10, 1.1) == []
+    assert poller.update(0b10, 2.0) == []
+    stats = poller.get_stats()
+    assert stats['suppressed_flaps'] == 1
+    assert stats['events'] == 0
+
+
+def test_bounce_settles_once():
+    clock = FakeClock(AdaptivePoller(0.1, 1.0, 0.3), bitmap=0)
+    clock.tick()
+    # Contact bounce faster than the scans, settling on present
+    for present in (1, 0, 1, 0, 1):
+        clock.bitmap = present << 5
+        clock.now += 0.03
+        clock.tick()
+    clock.run_until(5.0)
+    assert [r[1:] for r in clock.reported] == [(5, True)]
+
+
+def test_zero_debounce_reports_immediately():
+    poller = AdaptivePoller(0.1, 1.0, 0)
+    poller.update(0b0, 0.0)
+    assert poller.update(0b1, 0.5) == [(0, True)]
+
+
+def test_idle_scans_below_fixed_polling():
+    clock = FakeClock(AdaptivePoller())
+    clock.run_until(600.0)
+    scans_per_minute = clock.poller.polls * 60.0 / 600.0
+    assert scans_per_minute <= FIXED_POLL_SCANS_PER_MINUTE / 1.5
+
+
+def test_flapping_port_does_not_hold_fast_rate():
+    clock = FakeClock(AdaptivePoller())
+    clock.tick()
+    flap_until = 60.0
+    next_flap = clock.now
+    while clock.now < flap_until:
+        if clock.now >= next_flap:
+            clock.bitmap ^= 1 << 7
+            next_flap = clock.now + 0.13
+        clock.tick()
+    polls = clock.poller.polls
+    assert clock.poller.get_stats()['flapping'] == 1
+    # Well below the floor rate of one scan per XCVR_POLL_MIN_INTERVAL
+    assert polls < 0.5 * flap_until / XCVR_POLL_MIN_INTERVAL
+    assert clock.reported == []
+
+
+def test_quiet_port_debounced_beside_flapping_port():
+    clock = FakeClock(AdaptivePoller())
+    clock.tick()
+    for _ in range(20):
+        clock.bitmap ^= 1 << 7
+        clock.now += 0.13
+        clock.tick()
+    changed_at = clock.now
+    clock.bitmap |= 1 << 3
+    clock.run_until(changed_at + 5.0)
+    quiet = [r for r in clock.reported if r[1] == 3]
+    assert [r[1:] for r in quiet] == [(3, True)]
+    # The quiet port gets the plain debounce window, not the flapping one
+    assert quiet[0][0] - changed_at <= XCVR_POLL_DEBOUNCE + XCVR_POLL_MIN_INTERVAL + TIMER_SLACK
@@ -0,0 +1,144 @@
+import errno
+
+import pytest
+
+from sonic_platform import xcvr_presence
+from sonic_platform.i2c_dev import FakeSmbusDevice
+from sonic_platform.xcvr_presence import PresenceScanner, iter_changed
+
+BUS = 5
+CPLD_ADDR = 0x40
+
+
+class FakeSfp(object):
+
+    def __init__(self, present=False):
+        self.present = present
+        self.calls = 0
+
+    def get_presence(self):
+        self.calls += 1
+        return self.present
+
+
+class FakePddf(object):
+    """
+    PDDF device data with an xcvr_present register bit per port, given as
+    {port index: (offset, bit, cmpval)}, and sysfs paths per port index
+    """
+
+    def __init__(self, registers, paths=None):
+        self.data = {'CPLD1': {'i2c': {'topo_info': {'parent_bus': hex(BUS), 'dev_addr': hex(CPLD_ADDR)}}}}
+        self.paths = paths or {}
+        for index, (offset, bit, cmpval) in registers.items():
+            port, ctrl = 'PORT{}'.format(index + 1), 'PORT{}-CTRL'.format(index + 1)
+            self.data[port] = {'i2c': {'interface': [{'itf': 'control', 'dev': ctrl}]}}
+            self.data[ctrl] = {'i2c': {'attr_list': [
+                {'attr_name': 'xcvr_present', 'attr_devname': 'CPLD1', 'attr_offset': hex(offset),
+                 'attr_mask': hex(bit), 'attr_cmpval': hex(cmpval)}]}}
+
+    def get_path(self, device, attr):
+        return self.paths.get(int(device[len('PORT'):]) - 1)
+
+
+class BusySmbusDevice(FakeSmbusDevice):
+    """
+    Device whose address is claimed by a kernel driver
+    """
+
+    def _access(self, reg, length):
+        self.transactions += 1
+        raise IOError(errno.EBUSY, 'Device or resource busy')
+
+
+def _scanner(registers, regs, num_ports, paths=None, sfps=None, device=None,
+             source=xcvr_presence.PRESENCE_SOURCE_REGISTER):
+    device = device or FakeSmbusDevice(regs)
+    sfps = sfps or [FakeSfp() for _ in range(num_ports)]
+    scanner = PresenceScanner(sfps, FakePddf(registers, paths), device_factory=lambda bus, addr: device,
+                              source=source)
+    return scanner, device, sfps
+
+
+def test_default_device_does_not_force():
+    assert xcvr_presence._default_device_factory(BUS, CPLD_ADDR).force is False
+
+
+def test_sysfs_is_the_default_source():
+    scanner = PresenceScanner([FakeSfp()], FakePddf({0: (0x10, 0, 0)}))
+    assert scanner._groups == []
+
+
+def test_resolve_presence_register():
+    pddf = FakePddf({0: (0x10, 3, 0)})
+    assert xcvr_presence.resolve_presence_register(pddf, 0) == (BUS, CPLD_ADDR, 0x10, 3, 0)
+    assert xcvr_presence.resolve_presence_register(pddf, 1) is None
+
+
+def test_mask_and_cmpval_decoding():
+    # Port 0 active low on bit 0, port 1 active high on bit 1 (cmpval is the masked value)
+    registers = {0: (0x10, 0, 0x00), 1: (0x10, 1, 0x02), 2: (0x11, 7, 0x80)}
+    scanner, _, _ = _scanner(registers, {0x10: 0b10, 0x11: 0x7f}, 3)
+    assert scanner.scan() == 0b011
+
+    scanner, _, _ = _scanner(registers, {0x10: 0b01, 0x11: 0x80}, 3)
+    assert scanner.scan() == 0b100
+
+
+def test_group_split_into_block_windows():
+    # 0x10 and 0x2f share one 32 byte window, 0x30 needs a second one
+    registers = {0: (0x10, 0, 0), 1: (0x2f, 0, 0), 2: (0x30, 0, 0)}
+    scanner, device, _ = _scanner(registers, {}, 3)
+    assert sorted(group.window() for group in scanner._groups) == [(0x10, 0x20), (0x30, 1)]
+    assert scanner.scan() == 0b111
+    assert device.transactions == 2
+
+
+def test_ports_without_register_read_sysfs_in_bulk(tmp_path):
+    paths = {}
+    for index, value in ((1, '1'), (2, '0')):
+        path = tmp_path / 'PORT{}_xcvr_present'.format(index + 1)
+        path.write_text(value + '\n')
+        paths[index] = str(path)
+    # Port 3 has neither a register nor a plain attribute
+    sfps = [FakeSfp(), FakeSfp(), FakeSfp(), FakeSfp(present=True)]
+    scanner, _, sfps = _scanner({0: (0x10, 0, 1)}, {0x10: 1}, 4, paths=paths, sfps=sfps)
+    assert scanner.scan() == 0b1011
+    assert [sfp.calls for sfp in sfps] == [0, 0, 0, 1]
+
+
+def test_sysfs_source_skips_registers(tmp_path):
+    path = tmp_path / 'PORT1_xcvr_present'
+    path.write_text('1\n')
+    scanner, device, _ = _scanner({0: (0x10, 0, 0)}, {0x10: 1}, 1, paths={0: str(path)},
+                                  source=xcvr_presence.PRESENCE_SOURCE_SYSFS)
+    assert scanner.scan() == 0b1
+    assert device.transactions == 0
+
+
+def test_busy_group_moves_to_sysfs(tmp_path):
+    path = tmp_path / 'PORT1_xcvr_present'
+    path.write_text('1\n')
+    scanner, device, _ = _scanner({0: (0x10, 0, 0)}, None, 1, paths={0: str(path)},
+                                  device=BusySmbusDevice())
+    assert scanner.scan() == 0b1
+    assert scanner.scan() == 0b1
+    # The driver's address is not tried again
+    assert device.transactions == 1
+
+
+def test_failed_group_falls_back_per_port():
+    sfps = [FakeSfp(present=True), FakeSfp()]
+    scanner, device, _ = _scanner({0: (0x10, 0, 0), 1: (0x11, 0, 0)}, {}, 2, sfps=sfps)
+    device.fail_regs = {0x10}
+    assert scanner.scan() == 0b01
+    assert [sfp.calls for sfp in sfps] == [1, 1]
+
+
+@pytest.mark.parametrize('old, new, expected', [
+    (0, 0, []),
+    (0b0101, 0b0110, [(0, False), (1, True)]),
+    (1 << 60, 0, [(60, False)]),
+])
+def test_iter_changed(old, new, expected):
+    assert list(iter_changed(old, new)) == expected